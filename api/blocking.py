@@ -0,0 +1,16 @@
+from fastapi import HTTPException
+from typing import Any, Callable
+
+from services.executor import ExecutorOverloaded, io_executor
+
+
+async def run_blocking(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """เรียกโค้ด sync (scrape / Supabase) ใน io_executor แทนการ block event loop"""
+    try:
+        return await io_executor.run(fn, *args, **kwargs)
+    except ExecutorOverloaded:
+        raise HTTPException(
+            status_code=503,
+            detail="ระบบกำลังประมวลผลคำขอจำนวนมาก กรุณาลองใหม่อีกครั้ง",
+            headers={"Retry-After": "1"}
+        )
@@ -1,101 +1,14 @@
 from fastapi import APIRouter, HTTPException
-from datetime import datetime, timedelta
-import requests
-import json
-import os
-from typing import Dict, Any
+from datetime import datetime
+from api.blocking import run_blocking
+from services.backfill import backfill_engine
+from services.cron_jobs import cron_jobs
+from config import SERVERLESS
 
 router = APIRouter()
 
-class LotteryCronService:
-    def __init__(self):
-        self.base_url = "https://lotto-six-roan.vercel.app"
-        # หรือใช้ localhost สำหรับ development
-        # self.base_url = "http://127.0.0.1:8000"
-
-    def get_next_lottery_date(self) -> str:
-        """คำนวณวันที่หวยออกถัดไป (1 หรือ 16)"""
-        today = datetime.now()
-
-        if today.day < 1:
-            return f"{today.year}-{today.month:02d}-01"
-        elif today.day < 16:
-            return f"{today.year}-{today.month:02d}-16"
-        else:
-            # ไปเดือนถัดไป วันที่ 1
-            next_month = today + timedelta(days=32)
-            next_month = next_month.replace(day=1)
-            return f"{next_month.year}-{next_month.month:02d}-01"
-
-    def get_current_lottery_date(self) -> str:
-        """วันที่หวยงวดปัจจุบัน"""
-        today = datetime.now()
-
-        if today.day >= 16:
-            return f"{today.year}-{today.month:02d}-16"
-        else:
-            return f"{today.year}-{today.month:02d}-01"
-
-    def check_lottery_data_exists(self, date: str) -> Dict[str, Any]:
-        """เช็คว่ามีข้อมูลหวยงวดนั้นแล้วหรือไม่"""
-        try:
-            response = requests.get(f"{self.base_url}/lottery/{date}", timeout=30)
-
-            if response.status_code == 200:
-                data = response.json()
-                # เช็คว่ามีข้อมูลครบถ้วน (มีรางวัลมากกว่า 100 รายการ)
-                total_prizes = (
-                    len(data.get('second_prizes', [])) +
-                    len(data.get('third_prizes', [])) +
-                    len(data.get('fourth_prizes', [])) +
-                    len(data.get('fifth_prizes', [])) +
-                    (1 if data.get('first_prize') else 0) +
-                    (1 if data.get('fourth_prize_1') else 0) +
-                    len(data.get('nearby_prizes', []))
-                )
-
-                return {
-                    "exists": total_prizes > 100,  # ถือว่าครบถ้วนถ้ามีมากกว่า 100 รางวัล
-                    "total_prizes": total_prizes,
-                    "data": data
-                }
-            else:
-                return {"exists": False, "total_prizes": 0}
-
-        except Exception as e:
-            print(f"Error checking lottery data: {e}")
-            return {"exists": False, "total_prizes": 0, "error": str(e)}
-
-    def scrape_lottery_data(self, date: str) -> Dict[str, Any]:
-        """เรียก API เพื่อ scrape ข้อมูลหวย"""
-        try:
-            # ใช้ check API เพื่อ trigger การ scrape
-            response = requests.post(
-                f"{self.base_url}/lottery/check",
-                json={"number": "000000", "draw_date": date},
-                timeout=60
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-                return {
-                    "success": "draw_number" in result and result["draw_number"] is not None,
-                    "message": result.get("message", ""),
-                    "data": result
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": f"HTTP {response.status_code}: {response.text}"
-                }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Error scraping: {str(e)}"
-            }
-
-cron_service = LotteryCronService()
+# งาน cron รันใน process นี้เลย (ไม่ต้องเรียก API ที่ deploy ไว้ผ่าน HTTP)
+cron_service = cron_jobs
 
 @router.get("/cron/status", tags=["Cron"])
 async def cron_status():
@@ -103,57 +16,24 @@ async def cron_status():
     current_date = cron_service.get_current_lottery_date()
     next_date = cron_service.get_next_lottery_date()
 
-    current_exists = cron_service.check_lottery_data_exists(current_date)
+    current_exists = await run_blocking(cron_service.check_lottery_data_exists, current_date)
 
     return {
         "current_lottery_date": current_date,
         "next_lottery_date": next_date,
         "current_data_exists": current_exists["exists"],
         "current_total_prizes": current_exists.get("total_prizes", 0),
+        "current_missing": current_exists.get("missing", {}),
         "timestamp": datetime.now().isoformat()
     }
 
 @router.post("/cron/scrape-current", tags=["Cron"])
-async def scrape_current_lottery():
-    """ใช้สำหรับ cron job - scrape งวดปัจจุบัน"""
-    current_date = cron_service.get_current_lottery_date()
-
-    # เช็คว่ามีข้อมูลแล้วหรือไม่
-    exists_check = cron_service.check_lottery_data_exists(current_date)
-
-    if exists_check["exists"]:
-        return {
-            "status": "already_exists",
-            "date": current_date,
-            "total_prizes": exists_check["total_prizes"],
-            "message": f"ข้อมูลงวด {current_date} มีอยู่แล้ว ({exists_check['total_prizes']} รางวัล)"
-        }
-
-    # ยังไม่มีข้อมูล ให้ scrape
-    print(f"🔄 เริ่ม scrape ข้อมูลงวด {current_date}")
-    scrape_result = cron_service.scrape_lottery_data(current_date)
-
-    if scrape_result["success"]:
-        # เช็คอีกครั้งว่า scrape สำเร็จจริงหรือไม่
-        verification = cron_service.check_lottery_data_exists(current_date)
-
-        return {
-            "status": "success" if verification["exists"] else "partial_success",
-            "date": current_date,
-            "total_prizes": verification.get("total_prizes", 0),
-            "message": f"Scrape สำเร็จ! ได้ข้อมูล {verification.get('total_prizes', 0)} รางวัล",
-            "scrape_details": scrape_result
-        }
-    else:
-        return {
-            "status": "failed",
-            "date": current_date,
-            "message": f"Scrape ไม่สำเร็จ: {scrape_result['message']}",
-            "scrape_details": scrape_result
-        }
+async def scrape_current_lottery(force: bool = False):
+    """ใช้สำหรับ cron job - scrape งวดปัจจุบัน (ผลมีจำนวนรางวัลแต่ละประเภท เวลาแต่ละขั้น และขนาดหน้าที่ดาวน์โหลด)"""
+    return await run_blocking(cron_service.scrape_current, force)
 
 @router.post("/cron/scrape-date/{date}", tags=["Cron"])
-async def scrape_specific_date(date: str):
+async def scrape_specific_date(date: str, force: bool = False):
     """Scrape ข้อมูลงวดวันที่ระบุ"""
     try:
         # Validate date format
@@ -161,63 +41,87 @@ async def scrape_specific_date(date: str):
     except ValueError:
         raise HTTPException(status_code=400, detail="รูปแบบวันที่ไม่ถูกต้อง ใช้ YYYY-MM-DD")
 
-    # เช็คว่ามีข้อมูลแล้วหรือไม่
-    exists_check = cron_service.check_lottery_data_exists(date)
-
-    if exists_check["exists"]:
-        return {
-            "status": "already_exists",
-            "date": date,
-            "total_prizes": exists_check["total_prizes"],
-            "message": f"ข้อมูลงวด {date} มีอยู่แล้ว"
-        }
-
-    # Scrape ข้อมูล
-    print(f"🔄 เริ่ม scrape ข้อมูลงวด {date}")
-    scrape_result = cron_service.scrape_lottery_data(date)
-
-    if scrape_result["success"]:
-        verification = cron_service.check_lottery_data_exists(date)
-        return {
-            "status": "success" if verification["exists"] else "partial_success",
-            "date": date,
-            "total_prizes": verification.get("total_prizes", 0),
-            "message": f"Scrape สำเร็จ! ได้ข้อมูล {verification.get('total_prizes', 0)} รางวัล"
-        }
-    else:
-        return {
-            "status": "failed",
-            "date": date,
-            "message": f"Scrape ไม่สำเร็จ: {scrape_result['message']}"
-        }
+    return await run_blocking(cron_service.scrape_draw, date, force)
 
 @router.get("/cron/check-missing", tags=["Cron"])
-async def check_missing_dates():
-    """เช็คว่ามีงวดไหนยังไม่มีข้อมูลบ้าง (3 เดือนย้อนหลัง)"""
-    missing_dates = []
+async def check_missing_dates(start_date: str = None, end_date: str = None, repair: bool = False):
+    """เช็คว่ามีงวดไหนยังไม่มีหรือยังไม่ครบบ้าง (ค่าเริ่มต้น 3 เดือนย้อนหลัง) repair=true จะ scrape งวดที่ขาดเบื้องหลัง"""
+    today = datetime.now()
+    end_date = end_date or today.strftime('%Y-%m-%d')
+    if start_date is None:
+        # ต้นเดือนของ 2 เดือนก่อน (รวมเดือนนี้เป็น 3 เดือน)
+        year, month = divmod(today.year * 12 + today.month - 1 - 2, 12)
+        start_date = f"{year}-{month + 1:02d}-01"
+    try:
+        if datetime.strptime(start_date, '%Y-%m-%d') > datetime.strptime(end_date, '%Y-%m-%d'):
+            raise HTTPException(status_code=400, detail="วันที่เริ่มต้องไม่เกินวันที่สิ้นสุด")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="รูปแบบวันที่ไม่ถูกต้อง ใช้ YYYY-MM-DD")
 
-    # เช็ค 3 เดือนย้อนหลัง
-    current = datetime.now()
+    # ปฏิทินงวดทั้งช่วงเทียบกับงวดที่ครบในฐานข้อมูล (query เดียว)
+    audit = await run_blocking(cron_service.find_missing_draws, start_date, end_date)
+    if audit is None:
+        raise HTTPException(status_code=503, detail="ไม่สามารถเชื่อมต่อฐานข้อมูลได้")
 
-    for month_offset in range(3):
-        check_date = current - timedelta(days=month_offset * 30)
+    result = {
+        "missing_dates": audit["missing"],
+        "total_missing": len(audit["missing"]),
+        "total_checked": audit["checked"],
+        "checked_period": f"{start_date} ถึง {end_date}"
+    }
 
-        # วันที่ 1 และ 16 ของเดือนนั้น
-        for day in [1, 16]:
-            lottery_date = f"{check_date.year}-{check_date.month:02d}-{day:02d}"
+    if repair:
+        # ใช้ pool ของ backfill (จำกัดจำนวน request พร้อมกันและ rate) ดูความคืบหน้าที่ GET /cron/backfill
+        repair_dates = [missing["date"] for missing in audit["missing"]]
+        if not repair_dates:
+            result["repair"] = "nothing_to_repair"
+        elif SERVERLESS:
+            # serverless: thread เบื้องหลังหยุดเมื่อส่ง response จึงซ่อมให้เสร็จใน request นี้ (ช่วงสั้น ๆ เท่านั้น)
+            try:
+                result["repair_report"] = await run_blocking(
+                    backfill_engine.run, start_date, end_date, draw_dates=repair_dates,
+                    resume=False, skip_existing=False
+                )
+                result["repair"] = "done"
+            except RuntimeError:
+                result["repair"] = "backfill_running"
+        elif backfill_engine.start_background(start_date, end_date, draw_dates=repair_dates,
+                                              resume=False, skip_existing=False):
+            result["repair"] = "started"
+        else:
+            result["repair"] = "backfill_running"
 
-            # เช็คไม่เกินวันปัจจุบัน
-            if datetime.strptime(lottery_date, '%Y-%m-%d').date() <= current.date():
-                exists_check = cron_service.check_lottery_data_exists(lottery_date)
+    return result
 
-                if not exists_check["exists"]:
-                    missing_dates.append({
-                        "date": lottery_date,
-                        "total_prizes": exists_check.get("total_prizes", 0)
-                    })
+@router.post("/cron/backfill", tags=["Cron"], status_code=202)
+async def start_backfill(start_date: str, end_date: str = None, resume: bool = True, force: bool = False):
+    """เริ่ม backfill ผลหวยย้อนหลังทุกงวดระหว่างสองวันที่ (รันเบื้องหลัง ดูสถานะที่ GET /cron/backfill) force=true ดึงใหม่ทุกงวดโดยไม่ใช้ความคืบหน้าเดิม"""
+    end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+    try:
+        if datetime.strptime(start_date, '%Y-%m-%d') > datetime.strptime(end_date, '%Y-%m-%d'):
+            raise HTTPException(status_code=400, detail="วันที่เริ่มต้องไม่เกินวันที่สิ้นสุด")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="รูปแบบวันที่ไม่ถูกต้อง ใช้ YYYY-MM-DD")
+
+    if SERVERLESS:
+        # instance serverless หยุดหลังส่ง response thread ของ backfill จะตายกลางทาง
+        raise HTTPException(
+            status_code=501,
+            detail="backfill เบื้องหลังใช้บน serverless ไม่ได้ ให้รัน python backfill.py บนเครื่องที่รันค้างได้ "
+                   "หรือใช้ /cron/check-missing?repair=true ทีละช่วงสั้น ๆ"
+        )
+
+    if not backfill_engine.start_background(start_date, end_date, resume=resume, skip_existing=not force):
+        raise HTTPException(status_code=409, detail="มี backfill กำลังรันอยู่")
 
     return {
-        "missing_dates": missing_dates,
-        "total_missing": len(missing_dates),
-        "checked_period": "3 เดือนย้อนหลัง"
-    }
\ No newline at end of file
+        "status": "started",
+        "start_date": start_date,
+        "end_date": end_date,
+        "message": f"เริ่ม backfill งวด {start_date} ถึง {end_date}"
+    }
+
+@router.get("/cron/backfill", tags=["Cron"])
+async def backfill_status():
+    """สถานะและความเร็ว (งวด/วินาที) ของ backfill ล่าสุด"""
+    return backfill_engine.status()
@@ -7,6 +7,8 @@ import re
 import requests
 import json
 from datetime import datetime
+from api.blocking import run_blocking
+from services.draw_calendar import draw_calendar
 
 # LINE Bot credentials (จะตั้งใน environment variables)
 LINE_CHANNEL_ACCESS_TOKEN = os.getenv('LINE_CHANNEL_ACCESS_TOKEN')
@@ -41,7 +43,8 @@ async def line_webhook(request: Request):
         signature = request.headers.get('X-Line-Signature', '')
         body = await request.body()
 
-        handler.handle(body.decode('utf-8'), signature)
+        # handler เรียก API ตรวจหวยและ reply แบบ sync ให้รันนอก event loop
+        await run_blocking(handler.handle, body.decode('utf-8'), signature)
         return {"status": "OK"}
 
     except InvalidSignatureError:
@@ -111,11 +114,13 @@ def extract_date_from_message(message):
     # ISO format
     iso_match = re.search(r'\b(\d{4}-\d{2}-\d{2})\b', message)
     if iso_match:
-        date_str = iso_match.group(1)
-        # Validate that it's 1st or 16th
-        day = int(date_str.split('-')[2])
-        if day in [1, 16]:
-            return date_str
+        # วันหวยออก หรือวันที่ 1/16 ที่เลื่อนไปออกวันอื่น
+        try:
+            resolved = draw_calendar.resolve(iso_match.group(1))
+        except ValueError:
+            resolved = None
+        if resolved:
+            return resolved
 
     # Thai format (16/7/68 or 16/07/2568)
     thai_match = re.search(r'\b(\d{1,2})/(\d{1,2})/(\d{2,4})\b', message)
@@ -131,15 +136,15 @@ def extract_date_from_message(message):
         if year > 2500:  # 2568 -> 2025
             year = year - 543
 
-        if day in [1, 16]:
-            return f"{year:04d}-{month:02d}-{day:02d}"
+        try:
+            resolved = draw_calendar.resolve(f"{year:04d}-{month:02d}-{day:02d}")
+        except ValueError:
+            resolved = None
+        if resolved:
+            return resolved
 
     # Default to latest draw date
-    today = datetime.now()
-    if today.day >= 16:
-        return f"{today.year}-{today.month:02d}-16"
-    else:
-        return f"{today.year}-{today.month:02d}-01"
+    return draw_calendar.current()
 
 def check_lottery_number(number, date):
     """Call lottery API to check number"""
@@ -150,7 +155,8 @@ def check_lottery_number(number, date):
             "draw_date": date
         }
 
-        response = requests.post(api_url, json=payload, timeout=30)
+        # LINE ต้องตอบผลในข้อความเดียว จึงรอ scrape แทนการรับ 202
+        response = requests.post(api_url, json=payload, params={"async_scrape": "false"}, timeout=30)
         response.raise_for_status()
 
         return response.json()
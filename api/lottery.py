@@ -3,9 +3,9 @@
 API สำหรับดึงข้อมูลลอตเตอรี่ตามวันที่งวด
 """
 
-import requests
-from bs4 import BeautifulSoup
-import re
+from services.html_parser import load_page
+from services.draw_parser import draw_parser
+from services.http_client import interactive_client
 from datetime import date, datetime
 import logging
 import os
@@ -25,10 +25,7 @@ logger = logging.getLogger(__name__)
 class LotteryAPI:
     def __init__(self):
         """เริ่มต้น Lottery API"""
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.session = interactive_client
         
         # เชื่อมต่อ Supabase
         try:
@@ -54,20 +51,20 @@ class LotteryAPI:
             url = f"https://news.sanook.com/lotto/check/{day:02d}{month:02d}{year}/"
             logger.info(f"กำลังดึงข้อมูลจาก: {url}")
             
-            response = self.session.get(url, timeout=15)
+            response = self.session.get(url)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            page = load_page(response.content)
             
             # แยกข้อมูล
-            lottery_data = self._parse_lottery_data(soup, draw_date)
+            lottery_data = self._parse_lottery_data(page, draw_date)
             return lottery_data
             
         except Exception as e:
             logger.error(f"ไม่สามารถดึงข้อมูลได้: {e}")
             return None
 
-    def _parse_lottery_data(self, soup, draw_date):
+    def _parse_lottery_data(self, page, draw_date):
         """แยกข้อมูลลอตเตอรี่จาก HTML"""
         try:
             # ข้อมูลงวด
@@ -89,44 +86,9 @@ class LotteryAPI:
                 'fifth_prize_3': ''
             }
             
-            # หาข้อมูลจาก HTML
-            # หารางวัลที่ 1
-            prize_elements = soup.find_all(['span', 'div', 'td', 'strong'], string=re.compile(r'\d{6}'))
-            for element in prize_elements:
-                text = element.get_text().strip()
-                if re.match(r'\d{6}', text):
-                    lottery_data['first_prize'] = text
-                    break
-            
-            # หาเลขหน้า 3 ตัว
-            front3_elements = soup.find_all(['span', 'div', 'td'], string=re.compile(r'\d{3}'))
-            front3_numbers = []
-            for element in front3_elements:
-                text = element.get_text().strip()
-                if re.match(r'\d{3}', text):
-                    front3_numbers.append(text)
-            if len(front3_numbers) >= 2:
-                lottery_data['second_prize_1'] = front3_numbers[0]
-                lottery_data['second_prize_2'] = front3_numbers[1]
-            
-            # หาเลขท้าย 3 ตัว
-            last3_elements = soup.find_all(['span', 'div', 'td'], string=re.compile(r'\d{3}'))
-            last3_numbers = []
-            for element in last3_elements:
-                text = element.get_text().strip()
-                if re.match(r'\d{3}', text):
-                    last3_numbers.append(text)
-            if len(last3_numbers) >= 2:
-                lottery_data['third_prize_1'] = last3_numbers[0]
-                lottery_data['third_prize_2'] = last3_numbers[1]
-            
-            # หาเลขท้าย 2 ตัว
-            last2_elements = soup.find_all(['span', 'div', 'td'], string=re.compile(r'\d{2}'))
-            for element in last2_elements:
-                text = element.get_text().strip()
-                if re.match(r'\d{2}', text):
-                    lottery_data['fourth_prize_1'] = text
-                    break
+            # รางวัลหลักจาก parser กลาง (JSON-LD -> CSS -> ข้อความ) เฉพาะ key ที่ตารางนี้มี
+            prizes = draw_parser.extract(page)
+            lottery_data.update({key: value for key, value in prizes.items() if key in lottery_data})
             
             return lottery_data
             
@@ -1,12 +1,25 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from datetime import datetime
+from typing import Optional
+import json
 from models.schemas import (
     LotteryCheckRequest,
     LotteryCheckResponse,
+    LotteryBatchCheckRequest,
+    LotteryBatchCheckResponse,
     LotteryDrawData,
     HealthResponse
 )
 from services.lottery_service import LotteryService
+from services.executor import io_executor
+from services.draw_parser import draw_parser
+from services.draw_calendar import draw_calendar
+from services.http_cache import draw_responses
+from services.negative_cache import negative_cache
+from services.scrape_jobs import ASYNC_SCRAPE_ON_MISS, SCRAPE_JOB_RETRY_AFTER, scrape_jobs
+from api.blocking import run_blocking
+from config import SERVERLESS
 
 # Create router
 router = APIRouter()
@@ -14,6 +27,9 @@ router = APIRouter()
 # Initialize lottery service (ใช้ logic เดิมที่ copy มาแล้ว)
 lottery_service = LotteryService()
 
+# batch ที่มีผลลัพธ์มากกว่านี้จะตอบกลับแบบ stream (NDJSON ทีละบรรทัด)
+BATCH_STREAM_THRESHOLD = 500
+
 
 @router.get("/", tags=["Root"])
 async def root():
@@ -24,8 +40,13 @@ async def root():
         "docs": "/docs",
         "endpoints": {
             "check_lottery": "POST /lottery/check",
+            "check_lottery_batch": "POST /lottery/check/batch",
             "get_lottery": "GET /lottery/{draw_date}",
-            "health": "GET /health"
+            "lottery_completeness": "GET /lottery/{draw_date}/completeness",
+            "scrape_job": "GET /jobs/{job_id}",
+            "health": "GET /health",
+            "executor_health": "GET /health/executor",
+            "parser_health": "GET /health/parser"
         }
     }
 
@@ -40,38 +61,88 @@ async def health_check():
     )
 
 
+@router.get("/health/executor", tags=["Health"])
+async def executor_health():
+    """Thread pool metrics for blocking scrape/database calls"""
+    return io_executor.metrics()
+
+
+@router.get("/health/negative-cache", tags=["Health"])
+async def negative_cache_health():
+    """Scrapes skipped for draws known to have no result yet, by reason"""
+    return negative_cache.metrics()
+
+
+@router.get("/health/parser", tags=["Health"])
+async def parser_health():
+    """Hit rate and average time of each parsing strategy (JSON-LD -> CSS -> text)"""
+    return draw_parser.metrics()
+
+
+def load_lottery_data(draw_date: str):
+    """ดึงข้อมูลงวดจากฐานข้อมูล ถ้าไม่มีให้ scrape แล้วบันทึก (sync, รันใน io_executor)"""
+    existing_data = lottery_service.get_from_database(draw_date)
+    if existing_data:
+        return existing_data
+
+    # If not in database, scrape from website and save
+    # (concurrent requests for the same draw share one scrape)
+    return lottery_service.scrape_and_save(draw_date)
+
+
+@router.get("/lottery/{draw_date}/completeness", tags=["Lottery"])
+async def get_lottery_completeness(draw_date: str):
+    """Per-tier prize counts and a complete flag from one aggregate query (no prize payload)"""
+    try:
+        datetime.strptime(draw_date, '%Y-%m-%d')
+    except ValueError:
+        raise HTTPException(status_code=400, detail="รูปแบบวันที่ไม่ถูกต้อง ใช้ YYYY-MM-DD")
+
+    completeness = await run_blocking(lottery_service.get_draw_completeness, draw_date)
+    if completeness is None:
+        raise HTTPException(status_code=503, detail="ไม่สามารถเชื่อมต่อฐานข้อมูลได้")
+    return completeness
+
+
 @router.get("/lottery/{draw_date}", tags=["Lottery"])
-async def get_lottery_data(draw_date: str):
-    """Get lottery data for specific date"""
+async def get_lottery_data(draw_date: str, request: Request):
+    """Get lottery data for specific date (ETag / Cache-Control, 304 on If-None-Match)"""
     try:
         # Validate date format
         try:
-            date_obj = datetime.strptime(draw_date, '%Y-%m-%d')
+            datetime.strptime(draw_date, '%Y-%m-%d')
         except ValueError:
             raise HTTPException(
                 status_code=400,
                 detail="รูปแบบวันที่ไม่ถูกต้อง ใช้ YYYY-MM-DD"
             )
 
-        # Validate lottery date (must be 1st or 16th)
-        if date_obj.day not in [1, 16]:
-            raise HTTPException(
-                status_code=400,
-                detail=f"หวยออกเฉพาะวันที่ 1 และ 16 ของทุกเดือน ไม่ใช่วันที่ {date_obj.day}"
-            )
+        # Validate lottery date (1st/16th, or the day a moved draw was held)
+        date_error = draw_calendar.validation_error(draw_date)
+        if date_error:
+            raise HTTPException(status_code=400, detail=date_error)
+
+        # Complete past draws never change, serve them from memory
+        cached = draw_responses.get(draw_date)
+        if cached is None:
+            # Database first, then scrape (runs off the event loop)
+            lottery_data = await run_blocking(load_lottery_data, draw_date)
+            if lottery_data:
+                cached = draw_responses.build(draw_date, lottery_data)
 
-        # Try to get from database first
-        existing_data = lottery_service.get_from_database(draw_date)
-        if existing_data:
-            return existing_data
-
-        # If not in database, scrape from website
-        lottery_data = lottery_service.get_lottery_by_date(draw_date)
-        if lottery_data:
-            # Save to database
-            lottery_service.save_to_database(lottery_data)
-            return lottery_data
+        if cached:
+            if cached.not_modified(request.headers.get("if-none-match")):
+                return Response(status_code=304, headers=cached.headers)
+            return Response(content=cached.body, media_type="application/json", headers=cached.headers)
         else:
+            # Known miss (not drawn yet / not published / no page): tell clients when to retry
+            miss = negative_cache.peek(draw_date)
+            if miss:
+                raise HTTPException(
+                    status_code=404,
+                    detail=miss.message,
+                    headers={"Retry-After": str(miss.retry_after())}
+                )
             raise HTTPException(
                 status_code=404,
                 detail="ไม่พบข้อมูลหวยสำหรับวันที่ที่ระบุ"
@@ -86,12 +157,27 @@ async def get_lottery_data(draw_date: str):
         )
 
 
-@router.post("/lottery/check", response_model=LotteryCheckResponse, tags=["Lottery"])
-async def check_lottery_number(request: LotteryCheckRequest):
-    """Check if a 6-digit number won any prizes"""
+@router.post("/lottery/check", response_model=LotteryCheckResponse, tags=["Lottery"],
+             responses={202: {"description": "Draw not stored yet, scrape job queued (poll GET /jobs/{job_id})"}})
+async def check_lottery_number(request: LotteryCheckRequest, async_scrape: Optional[bool] = None):
+    """Check if a 6-digit number won any prizes (async_scrape=true answers 202 instead of waiting on a scrape, except on serverless)"""
     try:
+        use_async = ASYNC_SCRAPE_ON_MISS if async_scrape is None else async_scrape
+        # serverless: thread ของคิวไม่รอดหลังส่ง response จึง scrape รอผลเสมอ
+        if use_async and not SERVERLESS and lottery_service.db.supabase:
+            # Memory/database only; a miss that could still be scraped becomes a background job
+            index = await run_blocking(lottery_service.get_prize_index, request.draw_date, False)
+            if index is None and not negative_cache.peek(request.draw_date):
+                job = scrape_jobs.submit(request.draw_date, lottery_service.scrape_and_save)
+                return JSONResponse(
+                    status_code=202,
+                    content=dict(job.to_dict(), status_url=f"/jobs/{job.id}",
+                                 message="กำลังดึงผลรางวัลงวดนี้ กรุณาลองใหม่อีกครั้ง"),
+                    headers={"Retry-After": str(SCRAPE_JOB_RETRY_AFTER), "Location": f"/jobs/{job.id}"}
+                )
+
         # Check the number using the lottery service
-        result = lottery_service.check_number_complete(request.number, request.draw_date)
+        result = await run_blocking(lottery_service.check_number_complete, request.number, request.draw_date)
 
         # Check for errors in the result
         if "เกิดข้อผิดพลาด" in result.get("message", ""):
@@ -108,4 +194,63 @@ async def check_lottery_number(request: LotteryCheckRequest):
         raise HTTPException(
             status_code=500,
             detail=f"เกิดข้อผิดพลาดในการตรวจสอบเลข: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/jobs/{job_id}", tags=["Lottery"])
+async def get_scrape_job(job_id: str):
+    """Status of a background scrape job (queued / running / done / failed)"""
+    job = scrape_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="ไม่พบงานที่ระบุ (อาจหมดอายุแล้ว)")
+
+    headers = {"Retry-After": str(SCRAPE_JOB_RETRY_AFTER)} if job.pending else None
+    return JSONResponse(content=job.to_dict(), headers=headers)
+
+
+@router.post("/lottery/check/batch", response_model=LotteryBatchCheckResponse, tags=["Lottery"])
+async def check_lottery_numbers_batch(request: LotteryBatchCheckRequest):
+    """Check many 6-digit numbers against one or more draws in a single request"""
+    draw_dates = request.all_draw_dates()
+    if not draw_dates:
+        raise HTTPException(
+            status_code=400,
+            detail="ต้องระบุ draw_date หรือ draw_dates อย่างน้อย 1 งวด"
+        )
+
+    # โหลด (หรือ scrape) ทุกงวดใน io_executor ก่อน ระหว่างตอบกลับจึงเหลือแค่การตรวจเลขในหน่วยความจำ
+    draws = await run_blocking(lottery_service.load_check_draws, draw_dates)
+    results = lottery_service.iter_check_numbers(request.numbers, draw_dates, draws)
+
+    # batch ใหญ่ให้ stream ทีละบรรทัด ไม่ต้องรอตรวจครบทุกเลข
+    if len(request.numbers) * len(draw_dates) > BATCH_STREAM_THRESHOLD:
+        def stream_results():
+            try:
+                for result in results:
+                    line = LotteryCheckResponse(**result).dict()
+                    yield json.dumps(line, ensure_ascii=False) + "\n"
+            except Exception as e:
+                # status 200 ส่งไปแล้ว แจ้งข้อผิดพลาดเป็นบรรทัดสุดท้ายแทนการตัด body ทิ้งเฉยๆ
+                print(f"ตรวจเลขแบบ stream ไม่สำเร็จ: {e}")
+                error = {"status": "error", "message": f"เกิดข้อผิดพลาดในการตรวจสอบเลข: {str(e)}"}
+                yield json.dumps(error, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+    try:
+        checked = await run_blocking(lambda: [LotteryCheckResponse(**result) for result in results])
+
+        return LotteryBatchCheckResponse(
+            total_numbers=len(request.numbers),
+            draw_dates=draw_dates,
+            total_winners=sum(1 for result in checked if result.results),
+            results=checked
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"เกิดข้อผิดพลาดในการตรวจสอบเลข: {str(e)}"
+        )
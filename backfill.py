@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Backfill ผลหวยย้อนหลังทุกงวดลงฐานข้อมูล
+
+การใช้งาน:
+    python backfill.py --start 2010-01-01 --end 2025-10-16
+    python backfill.py --start 2010-01-01 --rate 1 --fetch-workers 2   # ช้าลง สุภาพกับ sanook มากขึ้น
+    python backfill.py --start 2010-01-01 --dry-run                   # ดึงและแยกรางวัลอย่างเดียว ไม่บันทึก
+    python backfill.py --start 2010-01-01 --force --offline           # แยกรางวัลใหม่ทุกงวดจาก page cache ไม่เรียกเว็บ
+
+หยุดกลางคันได้ รันคำสั่งเดิมอีกครั้งจะทำต่อจากไฟล์ความคืบหน้า (--no-resume เพื่อเริ่มใหม่)
+"""
+
+import argparse
+import json
+from datetime import datetime
+
+from services.backfill import (
+    BackfillEngine, BACKFILL_FETCH_WORKERS, BACKFILL_PARSE_WORKERS, BACKFILL_RATE,
+    BACKFILL_BATCH_SIZE, BACKFILL_PROGRESS_FILE
+)
+from services.page_cache import page_cache
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill ผลหวยย้อนหลังจาก sanook")
+    parser.add_argument('--start', required=True, help="วันที่เริ่ม (YYYY-MM-DD)")
+    parser.add_argument('--end', default=datetime.now().strftime('%Y-%m-%d'), help="วันที่สิ้นสุด (ค่าเริ่มต้น: วันนี้)")
+    parser.add_argument('--fetch-workers', type=int, default=BACKFILL_FETCH_WORKERS, help="จำนวน request พร้อมกัน")
+    parser.add_argument('--parse-workers', type=int, default=BACKFILL_PARSE_WORKERS, help="จำนวน thread แยกรางวัล")
+    parser.add_argument('--rate', type=float, default=BACKFILL_RATE, help="request ต่อวินาทีสูงสุด")
+    parser.add_argument('--batch-size', type=int, default=BACKFILL_BATCH_SIZE, help="จำนวนงวดต่อการบันทึกหนึ่งครั้ง")
+    parser.add_argument('--progress-file', default=BACKFILL_PROGRESS_FILE, help="ไฟล์เก็บความคืบหน้า")
+    parser.add_argument('--no-resume', action='store_true', help="ไม่ใช้ความคืบหน้าเดิม")
+    parser.add_argument('--force', action='store_true', help="ดึงใหม่ทุกงวด แม้มีในฐานข้อมูลหรือเสร็จในความคืบหน้าเดิมแล้ว")
+    parser.add_argument('--dry-run', action='store_true', help="ไม่บันทึกลงฐานข้อมูล")
+    parser.add_argument('--offline', action='store_true', help="ใช้เฉพาะหน้าที่อยู่ใน page cache")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.offline:
+        page_cache.offline = True
+
+    engine = BackfillEngine(
+        fetch_workers=args.fetch_workers,
+        parse_workers=args.parse_workers,
+        rate=args.rate,
+        batch_size=args.batch_size,
+        progress_path=args.progress_file
+    )
+    report = engine.run(
+        args.start, args.end,
+        resume=not args.no_resume,
+        skip_existing=not args.force,
+        dry_run=args.dry_run
+    )
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+เปรียบเทียบความเร็วการแยกรางวัลจาก sanook_page.html
+tokenizer ของ articleBody และแต่ละ strategy ของ parser กลาง (JSON-LD, CSS, ข้อความ)
+"""
+
+import json
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmark_html_parser import load_fixture
+from services.article_parser import parse_article_body, count_prizes
+from services.draw_parser import DrawPageParser
+from services.html_parser import load_page
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sanook_page.html')
+DRAW_DATE = '2025-10-01'
+
+
+def load_news_article(path=FIXTURE):
+    """อ่าน JSON-LD NewsArticle จากไฟล์ HTML"""
+    with open(path, encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            json_data = json.loads(script.string)
+        except (TypeError, json.JSONDecodeError):
+            continue
+        if isinstance(json_data, dict) and json_data.get('@type') == 'NewsArticle':
+            return json_data
+    return None
+
+
+def time_per_call(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def run_benchmark(iterations=200):
+    content = load_fixture()
+    article_body = load_news_article()['articleBody']
+    print(f"articleBody: {len(article_body):,} ตัวอักษร, {iterations} รอบ")
+
+    tokenizer_time = time_per_call(lambda: parse_article_body(article_body), iterations)
+    print(f"tokenizer (articleBody อย่างเดียว): {tokenizer_time * 1e6:,.1f} µs/ครั้ง")
+
+    # แต่ละ strategy ของ parser กลาง (หน้าใหม่ทุกรอบ เวลาจึงรวมการสร้าง DOM ที่ strategy นั้นต้องใช้)
+    timings = {}
+    for strategy in DrawPageParser().strategies:
+        rows = count_prizes(strategy.extract(load_page(content)))
+        timings[strategy.name] = time_per_call(lambda: strategy.extract(load_page(content)), iterations)
+        print(f"{strategy.name:8s}: {timings[strategy.name] * 1e6:,.1f} µs/ครั้ง ({rows} รางวัล)")
+
+    return tokenizer_time, timings
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+เปรียบเทียบเวลา parse หน้า sanook_page.html ของแต่ละ HTML parser backend
+(parse + ดึง JSON-LD + ดึงรางวัลหลักจาก column)
+เทียบกับการอ่าน JSON-LD จาก bytes โดยไม่สร้าง DOM (raw)
+"""
+
+import os
+import time
+
+from services.html_parser import (
+    available_backends, parse_html, load_page, extract_news_article, extract_main_prizes
+)
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sanook_page.html')
+
+
+def load_fixture(path=FIXTURE) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def parse_page(content, backend):
+    page = parse_html(content, backend)
+    return extract_news_article(page), extract_main_prizes(page)
+
+
+def scan_page(content):
+    page = load_page(content)
+    return extract_news_article(page)
+
+
+def time_per_page(fn, content, iterations):
+    fn(content)  # warm up
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(content)
+    return (time.perf_counter() - start) / iterations
+
+
+def run_benchmark(iterations=20):
+    content = load_fixture()
+    print(f"sanook_page.html: {len(content) / 1024:,.0f} KB, {iterations} รอบ")
+
+    results = {}
+    for backend in available_backends():
+        results[backend] = time_per_page(lambda c: parse_page(c, backend), content, iterations)
+    results['raw'] = time_per_page(scan_page, content, iterations)
+
+    baseline = results['html.parser']
+    for backend, elapsed in results.items():
+        print(f"{backend:12s} {elapsed * 1000:8.2f} ms/หน้า  (เร็วกว่า html.parser {baseline / elapsed:.1f} เท่า)")
+
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
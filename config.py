@@ -26,3 +26,7 @@ TABLE_NAME = 'lottery_results'
 
 # User Agent สำหรับการ request
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# รันบน serverless (Vercel / AWS Lambda): instance หยุดทันทีหลังส่ง response งานใน thread เบื้องหลังจึงไม่รอด
+SERVERLESS = bool(os.getenv('VERCEL') or os.getenv('AWS_LAMBDA_FUNCTION_NAME')) or \
+    os.getenv('LOTTERY_SERVERLESS', 'false').lower() in ('1', 'true', 'yes')
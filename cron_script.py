@@ -4,10 +4,10 @@ Smart Lottery Cron Script
 
 ลอจิก:
 1. รันทุกวันเวลา 19:00
-2. เช็คว่าเป็นวันที่ 1 หรือ 16 หรือไม่
+2. เช็คว่าเป็นวันหวยออกหรือไม่ (วันที่ 1, 16 หรือวันที่งวดนั้นเลื่อนไปออก)
 3. ถ้าใช่ → พยายาม scrape งวดปัจจุบัน
 4. ถ้าไม่เจอข้อมูล → รันต่อทุกวันจนกว่าจะเจอ
-5. เจอแล้ว → หยุด รอถึงวันที่ 1 หรือ 16 ถัดไป
+5. เจอแล้ว → หยุด รอถึงวันหวยออกงวดถัดไป
 
 การใช้งาน:
 - Linux/Mac: python3 cron_script.py
@@ -15,16 +15,21 @@ Smart Lottery Cron Script
 
 Cron job setting (Linux):
 0 19 * * * /usr/bin/python3 /path/to/cron_script.py >> /var/log/lottery_cron.log 2>&1
+
+ทุกขั้นรันในเครื่องนี้ (ต้องตั้ง SUPABASE_URL / SUPABASE_KEY) ไม่เรียก API ที่ deploy ไว้
+
+โหมด live (วันหวยออก): เช็คหน้าผลถี่ ๆ ช่วง 14:00-17:30 บันทึกรางวัลแต่ละประเภททันทีที่ออก
+จนกว่างวดจะออกครบ (ไม่ต้องรอ 19:00 หรือรอให้มีผู้ใช้ขอข้อมูลก่อน)
+รันทุกวันได้ วันที่ไม่ใช่วันหวยออก (ตามปฏิทินงวดรวมงวดที่เลื่อน) จะจบทันที
+55 13 * * * /usr/bin/python3 /path/to/cron_script.py --live >> /var/log/lottery_cron.log 2>&1
 """
 
-import requests
-import json
+import argparse
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 
-# กำหนด URL ของ API
-API_BASE_URL = "https://lotto-six-roan.vercel.app"
+from services.cron_jobs import cron_jobs
 
 # ตั้งค่า logging
 logging.basicConfig(
@@ -37,68 +42,49 @@ logging.basicConfig(
 )
 
 def should_scrape_today():
-    """ตรวจสอบว่าวันนี้ควร scrape หรือไม่"""
-    today = datetime.now()
-
-    # วันที่ 1 และ 16 ต้อง scrape เสมอ
-    if today.day in [1, 16]:
-        return True, "lottery_day"
-
-    # วันอื่นๆ → เช็คว่ามีข้อมูลงวดปัจจุบันแล้วหรือไม่
+    """ตรวจสอบว่าวันนี้ควร scrape หรือไม่ (นับรางวัลในฐานข้อมูลโดยตรง)"""
     try:
-        response = requests.get(f"{API_BASE_URL}/cron/status", timeout=30)
-        if response.status_code == 200:
-            data = response.json()
-            if not data.get("current_data_exists", True):
-                return True, "missing_data"
-
-        return False, "data_exists"
+        return cron_jobs.should_scrape_today()
 
     except Exception as e:
         logging.error(f"Error checking status: {e}")
         return False, "error"
 
 def scrape_current_lottery():
-    """เรียก API เพื่อ scrape งวดปัจจุบัน"""
+    """scrape งวดปัจจุบันในเครื่องนี้ (ดาวน์โหลด แยกรางวัล และบันทึกลง Supabase โดยตรง)"""
     try:
         logging.info("🔄 เริ่มต้น scrape ข้อมูลหวยงวดปัจจุบัน...")
 
-        response = requests.post(
-            f"{API_BASE_URL}/cron/scrape-current",
-            timeout=120  # เพิ่ม timeout เพราะ scraping ใช้เวลานาน
+        result = cron_jobs.scrape_current()
+        status = result.get("status", "unknown")
+        date = result.get("date", "")
+        total_prizes = result.get("total_prizes", 0)
+        message = result.get("message", "")
+        timings = result.get("timings_ms", {})
+        logging.info(
+            f"⏱️ งวด {date}: ดาวน์โหลด {result.get('bytes_fetched', 0)} bytes, "
+            f"ใช้เวลา {timings.get('total', 0)} ms {timings}"
         )
 
-        if response.status_code == 200:
-            result = response.json()
-            status = result.get("status", "unknown")
-            date = result.get("date", "")
-            total_prizes = result.get("total_prizes", 0)
-            message = result.get("message", "")
+        if status == "already_exists":
+            logging.info(f"✅ ข้อมูลงวด {date} มีอยู่แล้ว ({total_prizes} รางวัล)")
+            return True, message
 
-            if status == "already_exists":
-                logging.info(f"✅ ข้อมูลงวด {date} มีอยู่แล้ว ({total_prizes} รางวัล)")
-                return True, message
+        elif status == "success":
+            logging.info(f"🎉 Scrape สำเร็จ! งวด {date} ได้ข้อมูล {total_prizes} รางวัล")
+            return True, message
 
-            elif status == "success":
-                logging.info(f"🎉 Scrape สำเร็จ! งวด {date} ได้ข้อมูล {total_prizes} รางวัล")
-                return True, message
+        elif status == "partial_success":
+            logging.warning(f"⚠️ Scrape บางส่วน งวด {date} ได้ {total_prizes} รางวัล {result.get('tiers', {})}")
+            return False, message
 
-            elif status == "partial_success":
-                logging.warning(f"⚠️ Scrape บางส่วน งวด {date} ได้ {total_prizes} รางวัล")
-                return False, message
-
-            elif status == "failed":
-                logging.error(f"❌ Scrape ไม่สำเร็จ งวด {date}: {message}")
-                return False, message
-
-            else:
-                logging.error(f"❓ สถานะไม่ทราบ: {status}")
-                return False, message
+        elif status == "failed":
+            logging.error(f"❌ Scrape ไม่สำเร็จ งวด {date}: {message}")
+            return False, message
 
         else:
-            error_msg = f"HTTP Error {response.status_code}: {response.text}"
-            logging.error(f"❌ API Error: {error_msg}")
-            return False, error_msg
+            logging.error(f"❓ สถานะไม่ทราบ: {status}")
+            return False, message
 
     except Exception as e:
         error_msg = f"Exception: {str(e)}"
@@ -119,6 +105,28 @@ def send_notification(success, message, reason=""):
     # send_line_notify(log_message)
     # send_email_notification(log_message)
 
+def run_live_mode():
+    """poll หน้าผลหวยในช่วงออกรางวัลในเครื่องนี้เลย (ไม่ผ่าน API)"""
+    from services.live_poller import live_poller
+
+    try:
+        result = live_poller.run()
+        status = result.get("status")
+
+        if status == "not_draw_day":
+            logging.info(f"⏭️ วันนี้ไม่ใช่วันหวยออก ({result.get('date')})")
+            return
+
+        total_prizes = sum(result.get("counts", {}).values())
+        success = status == "complete"
+        message = f"Live polling งวด {result.get('draw_date')}: {status} ({total_prizes} รางวัล, {result.get('polls', 0)} ครั้ง)"
+        send_notification(success, message, "live")
+
+    except Exception as e:
+        error_msg = f"Live polling failed: {str(e)}"
+        logging.error(f"💥 {error_msg}")
+        send_notification(False, error_msg, "exception")
+
 def main():
     """Main cron function"""
     try:
@@ -152,4 +160,11 @@ def main():
         send_notification(False, error_msg, "exception")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Smart Lottery Cron Script")
+    parser.add_argument('--live', action='store_true', help="poll ผลหวยระหว่างออกรางวัลจนกว่าจะครบ")
+    args = parser.parse_args()
+
+    if args.live:
+        run_live_mode()
+    else:
+        main()
\ No newline at end of file
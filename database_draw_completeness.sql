@@ -0,0 +1,32 @@
+-- จำนวนรางวัลแต่ละประเภทของงวด ใช้เช็คว่างวดครบหรือยังโดยไม่ต้องดึงรางวัลทั้งหมด
+-- รันคำสั่งเหล่านี้ใน Supabase Dashboard > SQL Editor
+
+-- 1. ต้องมี index ของ draw_id (สร้างไว้แล้วใน database_upsert_draw.sql)
+CREATE INDEX IF NOT EXISTS idx_lottery_prizes_draw_id ON lottery_prizes(draw_id);
+
+-- 2. หนึ่งแถวต่อ (งวด, ประเภทรางวัล) งวดที่ไม่มีรางวัลเลยได้หนึ่งแถวที่ prize_type เป็น NULL
+--    ชื่อแบบ server.py (first, second, ...) นับรวมกับชื่อแบบ services (first_prize, second_prize, ...)
+CREATE OR REPLACE FUNCTION draw_prize_counts(
+    p_start_date DATE,
+    p_end_date DATE
+) RETURNS TABLE (draw_date DATE, status TEXT, prize_type TEXT, prize_count BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT d.draw_date, d.status, t.prize_type, COUNT(p.id)
+    FROM lottery_draws d
+    LEFT JOIN lottery_prizes p ON p.draw_id = d.id
+    LEFT JOIN LATERAL (
+        SELECT CASE WHEN p.prize_type IN ('first', 'second', 'third', 'fourth', 'fifth')
+                    THEN p.prize_type || '_prize'
+                    ELSE p.prize_type
+               END AS prize_type
+    ) t ON TRUE
+    WHERE d.draw_date BETWEEN p_start_date AND p_end_date
+    GROUP BY d.draw_date, d.status, t.prize_type
+    ORDER BY d.draw_date, t.prize_type;
+$$;
+
+-- 3. ทดสอบ
+-- SELECT * FROM draw_prize_counts('2025-10-01', '2025-10-01');
+-- SELECT * FROM draw_prize_counts('2025-01-01', '2025-12-31');
@@ -0,0 +1,44 @@
+-- lease สำหรับ scrape งวดใหม่ ให้มีเพียง instance เดียวที่ scrape งวดเดียวกันในเวลาเดียวกัน
+-- รันคำสั่งเหล่านี้ใน Supabase Dashboard > SQL Editor
+
+-- 1. ตาราง lease (หนึ่งแถวต่อหนึ่งงวดที่กำลัง scrape)
+CREATE TABLE IF NOT EXISTS scrape_leases (
+    draw_date DATE PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+-- 2. ขอ lease: ได้เมื่อยังไม่มีใครถือ, lease เดิมหมดอายุแล้ว หรือเป็นเจ้าของเดิม
+CREATE OR REPLACE FUNCTION acquire_scrape_lease(
+    p_draw_date DATE,
+    p_owner TEXT,
+    p_ttl_seconds INT DEFAULT 30
+) RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO scrape_leases (draw_date, owner, expires_at)
+    VALUES (p_draw_date, p_owner, now() + make_interval(secs => p_ttl_seconds))
+    ON CONFLICT (draw_date) DO UPDATE
+        SET owner = EXCLUDED.owner,
+            expires_at = EXCLUDED.expires_at
+        WHERE scrape_leases.expires_at < now()
+           OR scrape_leases.owner = EXCLUDED.owner;
+
+    RETURN FOUND;
+END;
+$$;
+
+-- 3. คืน lease (เฉพาะเจ้าของ)
+CREATE OR REPLACE FUNCTION release_scrape_lease(
+    p_draw_date DATE,
+    p_owner TEXT
+) RETURNS VOID
+LANGUAGE sql
+AS $$
+    DELETE FROM scrape_leases WHERE draw_date = p_draw_date AND owner = p_owner;
+$$;
+
+-- 4. ทดสอบ
+-- SELECT acquire_scrape_lease('2025-10-16', 'test-owner', 30);
+-- SELECT release_scrape_lease('2025-10-16', 'test-owner');
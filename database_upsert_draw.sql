@@ -0,0 +1,72 @@
+-- บันทึกงวดหวยพร้อมรางวัลทั้งหมดใน transaction เดียว
+-- รันคำสั่งเหล่านี้ใน Supabase Dashboard > SQL Editor
+
+-- 1. ลบรางวัลที่ซ้ำกันจากการบันทึกพร้อมกันในอดีต (เก็บแถวแรกไว้)
+DELETE FROM lottery_prizes a
+USING lottery_prizes b
+WHERE a.id > b.id
+  AND a.draw_id = b.draw_id
+  AND a.prize_type = b.prize_type
+  AND a.position = b.position;
+
+-- 2. draw_date ต้องไม่ซ้ำ (ใช้กับ ON CONFLICT)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_lottery_draws_draw_date_unique ON lottery_draws(draw_date);
+CREATE INDEX IF NOT EXISTS idx_lottery_prizes_draw_id ON lottery_prizes(draw_id);
+
+-- 3. ฟังก์ชัน upsert งวด + แทนที่รางวัลทั้งชุด
+CREATE OR REPLACE FUNCTION upsert_lottery_draw(
+    p_draw_date DATE,
+    p_draw_number TEXT,
+    p_prizes JSONB,
+    p_status TEXT DEFAULT 'active'
+) RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_draw_id BIGINT;
+BEGIN
+    -- ON CONFLICT ล็อกแถวของงวดนี้ไว้จนจบ transaction
+    -- ผู้บันทึกงวดเดียวกันพร้อมกันจึงต้องรอคิว และไม่เกิดรางวัลซ้ำ
+    INSERT INTO lottery_draws (draw_date, draw_number, status)
+    VALUES (p_draw_date, p_draw_number, p_status)
+    ON CONFLICT (draw_date) DO UPDATE
+        SET draw_number = EXCLUDED.draw_number,
+            status = EXCLUDED.status
+    RETURNING id INTO v_draw_id;
+
+    DELETE FROM lottery_prizes WHERE draw_id = v_draw_id;
+
+    INSERT INTO lottery_prizes (draw_id, prize_type, prize_number, position, amount)
+    SELECT v_draw_id, p.prize_type, p.prize_number, p.position, p.amount
+    FROM jsonb_to_recordset(p_prizes) AS p(prize_type TEXT, prize_number TEXT, position INT, amount INT);
+
+    RETURN v_draw_id;
+END;
+$$;
+
+-- 4. บันทึกหลายงวดในการเรียกครั้งเดียว (ใช้ตอน backfill ข้อมูลย้อนหลัง)
+-- p_draws = [{"draw_date": "...", "draw_number": "...", "prizes": [...]}, ...]
+CREATE OR REPLACE FUNCTION upsert_lottery_draws(p_draws JSONB) RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_draw JSONB;
+    v_count INT := 0;
+BEGIN
+    FOR v_draw IN SELECT * FROM jsonb_array_elements(p_draws) LOOP
+        PERFORM upsert_lottery_draw(
+            (v_draw->>'draw_date')::DATE,
+            v_draw->>'draw_number',
+            v_draw->'prizes',
+            COALESCE(v_draw->>'status', 'active')
+        );
+        v_count := v_count + 1;
+    END LOOP;
+
+    RETURN v_count;
+END;
+$$;
+
+-- 5. ทดสอบ
+-- SELECT upsert_lottery_draw('2025-10-01', '1/2568', '[{"prize_type":"first_prize","prize_number":"876978","position":1,"amount":6000000}]');
+-- SELECT upsert_lottery_draws('[{"draw_date":"2025-10-01","draw_number":"1/2568","prizes":[{"prize_type":"first_prize","prize_number":"876978","position":1,"amount":6000000}]}]');
@@ -3,8 +3,9 @@
 ไฟล์ดึงรางวัลที่ 1 ของงวดล่าสุดและบันทึกลงฐานข้อมูล
 """
 
-import requests
-from bs4 import BeautifulSoup
+from services.html_parser import load_page
+from services.draw_parser import draw_parser
+from services.http_client import http_client
 import re
 from datetime import date, datetime
 import logging
@@ -19,13 +20,13 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DATE_TEXT_PATTERN = re.compile(r'ตรวจหวย.*\d+.*\w+.*\d+')
+DRAW_TEXT_PATTERN = re.compile(r'งวด\s*\d+')
+
 class LatestLotteryScraper:
     def __init__(self):
         """เริ่มต้น Latest Lottery Scraper"""
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.session = http_client
         
         # เชื่อมต่อ Supabase
         try:
@@ -43,7 +44,7 @@ class LatestLotteryScraper:
             api_url = "https://news.sanook.com/api/lottery/result"
             logger.info(f"กำลังดึงข้อมูลจาก API: {api_url}")
             
-            response = self.session.get(api_url, timeout=15)
+            response = self.session.get(api_url)
             response.raise_for_status()
             
             # ตรวจสอบว่าเป็น JSON หรือ HTML
@@ -63,8 +64,7 @@ class LatestLotteryScraper:
                     return None
             else:
                 # ถ้าเป็น HTML ให้ parse
-                soup = BeautifulSoup(response.content, 'html.parser')
-                return self._parse_web_data(soup)
+                return self._parse_web_data(load_page(response.content))
                 
         except Exception as e:
             logger.error(f"ไม่สามารถดึงข้อมูลจาก API ได้: {e}")
@@ -76,13 +76,13 @@ class LatestLotteryScraper:
             url = "https://news.sanook.com/lotto/"
             logger.info(f"กำลังดึงข้อมูลจากเว็บไซต์: {url}")
             
-            response = self.session.get(url, timeout=15)
+            response = self.session.get(url)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            page = load_page(response.content)
             
             # หาข้อมูลงวดล่าสุด
-            lottery_data = self._parse_web_data(soup)
+            lottery_data = self._parse_web_data(page)
             return lottery_data
             
         except Exception as e:
@@ -117,15 +117,18 @@ class LatestLotteryScraper:
             logger.error(f"ไม่สามารถแยกข้อมูลจาก API ได้: {e}")
             return None
 
-    def _parse_web_data(self, soup):
+    def _parse_web_data(self, page):
         """แยกข้อมูลจากเว็บไซต์"""
         try:
+            # ข้อความของหน้าใช้ร่วมกันระหว่างการหาวันที่และเลขงวด (ไม่ต้องค้นทั้ง tree ซ้ำ)
+            lines = [line.strip() for line in page.text().splitlines() if line.strip()]
+            
             # หาข้อมูลงวดล่าสุด
-            draw_date = self._extract_date(soup)
-            draw_number = self._extract_draw_number(soup)
+            draw_date = self._extract_date(lines)
+            draw_number = self._extract_draw_number(lines)
             
             # หาข้อมูลรางวัล
-            prizes = self._extract_prizes(soup)
+            prizes = self._extract_prizes(page)
             
             lottery_data = {
                 'draw_date': draw_date,
@@ -151,15 +154,13 @@ class LatestLotteryScraper:
             logger.error(f"ไม่สามารถแยกข้อมูลจากเว็บไซต์ได้: {e}")
             return None
 
-    def _extract_date(self, soup):
+    def _extract_date(self, lines):
         """ดึงวันที่ออกสลาก"""
         try:
             # หาข้อความ "ตรวจหวย 1 พฤศจิกายน 2568"
-            date_elements = soup.find_all(string=re.compile(r'ตรวจหวย.*\d+.*\w+.*\d+'))
-            for element in date_elements:
-                if element.strip():
+            for date_text in lines:
+                if DATE_TEXT_PATTERN.search(date_text):
                     # แปลงวันที่
-                    date_text = element.strip()
                     if 'พฤศจิกายน' in date_text:
                         return '2024-11-01'
                     elif 'ตุลาคม' in date_text:
@@ -173,16 +174,14 @@ class LatestLotteryScraper:
             logger.warning(f"ไม่สามารถดึงวันที่ได้: {e}")
             return date.today().strftime('%Y-%m-%d')
 
-    def _extract_draw_number(self, soup):
+    def _extract_draw_number(self, lines):
         """ดึงหมายเลขงวด"""
         try:
             # หาข้อความ "งวด 1 พ.ย. 68"
-            draw_elements = soup.find_all(string=re.compile(r'งวด\s*\d+'))
-            for element in draw_elements:
-                if element.strip():
+            for line in lines:
+                if DRAW_TEXT_PATTERN.search(line):
                     # จำกัดความยาวไม่เกิน 20 ตัวอักษร
-                    draw_text = element.strip()[:20]
-                    return draw_text
+                    return line[:20]
             
             return "1/2567"  # ค่าเริ่มต้น
             
@@ -190,36 +189,10 @@ class LatestLotteryScraper:
             logger.warning(f"ไม่สามารถดึงหมายเลขงวดได้: {e}")
             return "1/2567"
 
-    def _extract_prizes(self, soup):
-        """ดึงข้อมูลรางวัล"""
-        prizes = {}
-        
+    def _extract_prizes(self, page):
+        """ดึงข้อมูลรางวัล (parser กลาง: JSON-LD -> CSS -> ข้อความ)"""
         try:
-            # หาตัวเลข 6 หลัก
-            numbers = re.findall(r'\d{6}', soup.get_text())
-            
-            if numbers:
-                # จัดกลุ่มรางวัล
-                if len(numbers) >= 1:
-                    prizes['first_prize'] = numbers[0]
-                if len(numbers) >= 3:
-                    prizes['second_prize_1'] = numbers[1]
-                    prizes['second_prize_2'] = numbers[2]
-                if len(numbers) >= 6:
-                    prizes['third_prize_1'] = numbers[3]
-                    prizes['third_prize_2'] = numbers[4]
-                    prizes['third_prize_3'] = numbers[5]
-                if len(numbers) >= 10:
-                    prizes['fourth_prize_1'] = numbers[6]
-                    prizes['fourth_prize_2'] = numbers[7]
-                    prizes['fourth_prize_3'] = numbers[8]
-                    prizes['fourth_prize_4'] = numbers[9]
-                if len(numbers) >= 13:
-                    prizes['fifth_prize_1'] = numbers[10]
-                    prizes['fifth_prize_2'] = numbers[11]
-                    prizes['fifth_prize_3'] = numbers[12]
-            
-            return prizes
+            return draw_parser.extract(page)
             
         except Exception as e:
             logger.error(f"ไม่สามารถดึงข้อมูลรางวัลได้: {e}")
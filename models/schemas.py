@@ -1,29 +1,74 @@
 from pydantic import BaseModel, Field, validator
 from typing import List, Optional
-from datetime import datetime
+
+from services.draw_calendar import draw_calendar
+
+
+def validate_lottery_number(v: str) -> str:
+    if not v.isdigit():
+        raise ValueError('เลขหวยต้องเป็นตัวเลขเท่านั้น')
+    return v
+
+
+def validate_lottery_date(v: str) -> str:
+    try:
+        date_error = draw_calendar.validation_error(v)
+    except ValueError:
+        raise ValueError('รูปแบบวันที่ไม่ถูกต้อง ใช้ YYYY-MM-DD')
+    if date_error:
+        raise ValueError(date_error)
+    return v
 
 
 class LotteryCheckRequest(BaseModel):
     number: str = Field(..., min_length=6, max_length=6, description="6-digit lottery number")
-    draw_date: str = Field(..., description="Draw date in YYYY-MM-DD format (must be 1st or 16th)")
+    draw_date: str = Field(..., description="Draw date in YYYY-MM-DD format (a draw day: 1st or 16th, or the day a moved draw was held)")
 
     @validator('number')
     def validate_number(cls, v):
-        if not v.isdigit():
-            raise ValueError('เลขหวยต้องเป็นตัวเลขเท่านั้น')
+        return validate_lottery_number(v)
+
+    @validator('draw_date')
+    def validate_draw_date(cls, v):
+        return validate_lottery_date(v)
+
+
+# จำนวนเลขสูงสุดต่อการตรวจแบบ batch หนึ่งครั้ง
+MAX_BATCH_NUMBERS = 5000
+MAX_BATCH_DRAWS = 24
+
+
+class LotteryBatchCheckRequest(BaseModel):
+    numbers: List[str] = Field(..., description=f"6-digit lottery numbers (max {MAX_BATCH_NUMBERS})")
+    draw_date: Optional[str] = Field(None, description="Draw date in YYYY-MM-DD format (a draw day: 1st or 16th, or the day a moved draw was held)")
+    draw_dates: List[str] = Field([], description=f"Several draw dates to check (max {MAX_BATCH_DRAWS})")
+
+    @validator('numbers')
+    def validate_numbers(cls, v):
+        if not v:
+            raise ValueError('ต้องมีเลขหวยอย่างน้อย 1 เลข')
+        if len(v) > MAX_BATCH_NUMBERS:
+            raise ValueError(f'ตรวจได้สูงสุด {MAX_BATCH_NUMBERS} เลขต่อครั้ง')
+        for number in v:
+            if len(number) != 6:
+                raise ValueError(f'เลขหวยต้องเป็น 6 ตัว: {number}')
+            validate_lottery_number(number)
         return v
 
     @validator('draw_date')
     def validate_draw_date(cls, v):
-        try:
-            date_obj = datetime.strptime(v, '%Y-%m-%d')
-            if date_obj.day not in [1, 16]:
-                raise ValueError(f'หวยออกเฉพาะวันที่ 1 และ 16 ของทุกเดือน ไม่ใช่วันที่ {date_obj.day}')
-            return v
-        except ValueError as e:
-            if 'หวยออกเฉพาะ' in str(e):
-                raise e
-            raise ValueError('รูปแบบวันที่ไม่ถูกต้อง ใช้ YYYY-MM-DD')
+        return validate_lottery_date(v) if v is not None else v
+
+    @validator('draw_dates')
+    def validate_draw_dates(cls, v):
+        if len(v) > MAX_BATCH_DRAWS:
+            raise ValueError(f'ตรวจได้สูงสุด {MAX_BATCH_DRAWS} งวดต่อครั้ง')
+        return [validate_lottery_date(draw_date) for draw_date in v]
+
+    def all_draw_dates(self) -> List[str]:
+        """รวม draw_date และ draw_dates โดยไม่ซ้ำกัน (คงลำดับเดิม)"""
+        dates = ([self.draw_date] if self.draw_date else []) + self.draw_dates
+        return list(dict.fromkeys(dates))
 
 
 class LotteryResult(BaseModel):
@@ -44,6 +89,13 @@ class LotteryCheckResponse(BaseModel):
     message: str
 
 
+class LotteryBatchCheckResponse(BaseModel):
+    total_numbers: int
+    draw_dates: List[str]
+    total_winners: int
+    results: List[LotteryCheckResponse] = []
+
+
 class LotteryDrawData(BaseModel):
     draw_date: str
     draw_number: str
@@ -0,0 +1,109 @@
+import re
+from typing import Dict, Iterator, List, Any, Tuple
+
+
+# หัวข้อรางวัลใน articleBody -> ชื่อ section
+HEADER_SECTIONS = {
+    'รางวัลที่ 1': 'first',
+    'เลขหน้า 3 ตัว': 'front_3',
+    'เลขท้าย 3 ตัว': 'back_3',
+    'เลขท้าย 2 ตัว': 'back_2',
+    'ข้างเคียงรางวัลที่ 1': 'nearby',
+    'รางวัลที่ 2': 'second',
+    'รางวัลที่ 3': 'third',
+    'รางวัลที่ 4': 'fourth',
+    'รางวัลที่ 5': 'fifth',
+}
+
+# section -> (จำนวนหลักของเลข, จำนวนรางวัล)
+SECTION_SPECS = {
+    'first': (6, 1),
+    'front_3': (3, 2),
+    'back_3': (3, 2),
+    'back_2': (2, 1),
+    'nearby': (6, 2),
+    'second': (6, 5),
+    'third': (6, 10),
+    'fourth': (6, 50),
+    'fifth': (6, 100),
+}
+
+# section -> key ใน lottery_data (รางวัลที่มีช่องแยกกัน)
+SLOT_KEYS = {
+    'first': ['first_prize'],
+    'front_3': ['second_prize_1', 'second_prize_2'],
+    'back_3': ['third_prize_1', 'third_prize_2'],
+    'back_2': ['fourth_prize_1'],
+}
+
+# section -> key ใน lottery_data (รางวัลแบบรายการ)
+LIST_KEYS = {
+    'nearby': 'nearby_prizes',
+    'second': 'second_prizes',
+    'third': 'third_prizes',
+    'fourth': 'fourth_prizes',
+    'fifth': 'fifth_prizes',
+}
+
+# แบ่ง articleBody เป็นบรรทัด (บาง body มี \r\n เป็นตัวอักษร จึงตัดที่ backslash ด้วย)
+LINE_PATTERN = re.compile(r'[^\r\n\\]+')
+
+# หัวข้อรางวัล (ทั้งบรรทัดเป็นหัวข้อ เลขในบรรทัดนั้น เช่น เงินรางวัล จะไม่ถูกนับเป็นเลขรางวัล)
+HEADER_PATTERN = re.compile(r'ข้างเคียงรางวัลที่ 1|รางวัลที่ [1-5]|เลขหน้า 3 ตัว|เลขท้าย [23] ตัว')
+
+NUMBER_PATTERN = re.compile(r'\d+')
+
+# หัวข้อที่ต้องมีใน articleBody จึงเชื่อถือ JSON-LD ได้โดยไม่ต้อง parse หน้า HTML
+REQUIRED_HEADERS = ('รางวัลที่ 1', 'เลขท้าย 2 ตัว')
+
+
+def tokenize_article_body(article_body: str) -> Iterator[Tuple[str, str]]:
+    """อ่าน articleBody รอบเดียว แล้วคืน (section, เลข) ของทุกรางวัลตามลำดับที่พบ"""
+    section = None
+    for line in LINE_PATTERN.findall(article_body):
+        # บรรทัดเลขรางวัลมีแต่ตัวเลขกับ &nbsp; ค้นหัวข้อเฉพาะบรรทัดที่มีข้อความ
+        if 'รางวัล' in line or 'ตัว' in line:
+            header = HEADER_PATTERN.search(line)
+            if header:
+                section = HEADER_SECTIONS[header.group()]
+                continue
+
+        # เลขก่อนหัวข้อแรก (เช่น วันที่ในชื่อบทความ) ไม่ใช่เลขรางวัล
+        if section is not None:
+            for number in NUMBER_PATTERN.findall(line):
+                yield section, number
+
+
+def has_prize_sections(article_body: str) -> bool:
+    """articleBody มีหัวข้อรางวัลหลักครบหรือไม่"""
+    return bool(article_body) and all(header in article_body for header in REQUIRED_HEADERS)
+
+
+def parse_article_body(article_body: str) -> Dict[str, Any]:
+    """แยกรางวัลทุกประเภทจาก articleBody คืนเฉพาะ key ที่พบ"""
+    sections: Dict[str, List[str]] = {section: [] for section in SECTION_SPECS}
+
+    for section, number in tokenize_article_body(article_body):
+        digits, limit = SECTION_SPECS[section]
+        numbers = sections[section]
+        if len(number) == digits and len(numbers) < limit:
+            numbers.append(number)
+
+    prizes: Dict[str, Any] = {}
+    for section, keys in SLOT_KEYS.items():
+        for key, number in zip(keys, sections[section]):
+            prizes[key] = number
+
+    for section, key in LIST_KEYS.items():
+        if sections[section]:
+            prizes[key] = sections[section]
+
+    return prizes
+
+
+def count_prizes(prizes: Dict[str, Any]) -> int:
+    """จำนวนรางวัลทั้งหมดที่แยกได้"""
+    slots = sum(1 for keys in SLOT_KEYS.values() for key in keys if prizes.get(key))
+    lists = sum(len(prizes.get(key) or []) for key in LIST_KEYS.values())
+    return slots + lists
+
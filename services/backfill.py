@@ -0,0 +1,312 @@
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from .draw_calendar import draw_calendar
+from .page_cache import page_cache
+
+# จำนวน request ไป sanook พร้อมกัน และจำนวน request ต่อวินาทีสูงสุดรวมทุก thread (สุภาพกับเว็บต้นทาง)
+BACKFILL_FETCH_WORKERS = int(os.getenv('BACKFILL_FETCH_WORKERS', '4'))
+BACKFILL_RATE = float(os.getenv('BACKFILL_RATE', '2'))
+
+# จำนวน thread ที่แยกรางวัลจากหน้า HTML และจำนวนงวดต่อการบันทึกหนึ่งครั้ง
+BACKFILL_PARSE_WORKERS = int(os.getenv('BACKFILL_PARSE_WORKERS', '2'))
+BACKFILL_BATCH_SIZE = int(os.getenv('BACKFILL_BATCH_SIZE', '20'))
+
+# ไฟล์เก็บความคืบหน้า (รันต่อจากเดิมได้เมื่อหยุดกลางคัน)
+BACKFILL_PROGRESS_FILE = os.getenv(
+    'BACKFILL_PROGRESS_FILE', os.path.join(tempfile.gettempdir(), 'lotto_backfill.json')
+)
+
+
+def fetch_failure_reason(error: BaseException) -> str:
+    """เหตุผลที่ดาวน์โหลดหน้าของงวดไม่สำเร็จ (not_found, http_<status> หรือ fetch_error)"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        # งวดที่ไม่ได้ออกวันที่ 1/16 (เลื่อนวันออก) จะไม่มีหน้า
+        if error.response.status_code == 404:
+            return 'not_found'
+        return f"http_{error.response.status_code}"
+    return f"fetch_error: {error}"
+
+
+def draw_dates_between(start_date: str, end_date: str) -> List[str]:
+    """วันที่หวยออกจริง (รวมงวดที่เลื่อนวัน) ระหว่างสองวันที่ เรียงจากเก่าไปใหม่"""
+    return draw_calendar.between(start_date, end_date)
+
+
+class RateLimiter:
+    """จำกัดจำนวนครั้งต่อวินาทีรวมทุก thread (แต่ละครั้งห่างกันอย่างน้อย 1/rate วินาที)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class BackfillProgress:
+    """ความคืบหน้าของ backfill ที่บันทึกลงไฟล์ (งวดที่เสร็จแล้วและงวดที่ล้มเหลว)"""
+
+    def __init__(self, path: str = BACKFILL_PROGRESS_FILE):
+        self.path = path
+        self.done = set()
+        self.failed: Dict[str, str] = {}
+
+    def load(self) -> 'BackfillProgress':
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.done = set(data.get('done', []))
+            self.failed = dict(data.get('failed', {}))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️ อ่านไฟล์ความคืบหน้า {self.path} ไม่ได้ เริ่มใหม่: {e}")
+        return self
+
+    def mark_done(self, draw_dates: List[str]):
+        self.done.update(draw_dates)
+        for draw_date in draw_dates:
+            self.failed.pop(draw_date, None)
+
+    def mark_failed(self, draw_date: str, reason: str):
+        self.failed[draw_date] = reason
+
+    def save(self):
+        """เขียนไฟล์ใหม่แล้วค่อยแทนที่ ไฟล์จึงไม่เสียถ้า process ตายระหว่างเขียน"""
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'done': sorted(self.done), 'failed': self.failed}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class BackfillEngine:
+    """ดึงผลหวยย้อนหลังทุกงวด: fetch พร้อมกันแบบจำกัด rate -> แยกรางวัลใน worker pool -> บันทึกทีละ batch"""
+
+    def __init__(self, service=None, fetch_workers: int = BACKFILL_FETCH_WORKERS,
+                 parse_workers: int = BACKFILL_PARSE_WORKERS, rate: float = BACKFILL_RATE,
+                 batch_size: int = BACKFILL_BATCH_SIZE, progress_path: str = BACKFILL_PROGRESS_FILE):
+        self._service = service
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.rate_limiter = RateLimiter(rate)
+        self.rate = rate
+        self.batch_size = batch_size
+        self.progress_path = progress_path
+        self._lock = threading.Lock()
+        self._running = False
+        self._status: Dict[str, Any] = {}
+
+    @property
+    def service(self):
+        # สร้าง LotteryService เมื่อใช้ครั้งแรก (import แล้วไม่ต้องเชื่อมต่อฐานข้อมูลทันที)
+        if self._service is None:
+            from .lottery_service import LotteryService
+            self._service = LotteryService()
+        return self._service
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def status(self) -> Dict[str, Any]:
+        """สถานะล่าสุดของ backfill (ใช้กับ endpoint)"""
+        with self._lock:
+            return dict(self._status, running=self._running)
+
+    def start_background(self, start_date: str, end_date: str, **kwargs) -> bool:
+        """เริ่ม backfill ใน thread แยก (คืน False ถ้ามี backfill กำลังรันอยู่)"""
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+
+        thread = threading.Thread(
+            target=self._run_background, args=(start_date, end_date), kwargs=kwargs,
+            name='lottery-backfill', daemon=True
+        )
+        thread.start()
+        return True
+
+    def _run_background(self, start_date: str, end_date: str, **kwargs):
+        try:
+            self._run(start_date, end_date, **kwargs)
+        except Exception as e:
+            print(f"❌ backfill ล้มเหลว: {e}")
+            with self._lock:
+                self._status['error'] = str(e)
+        finally:
+            with self._lock:
+                self._running = False
+
+    def run(self, start_date: str, end_date: str, resume: bool = True, skip_existing: bool = True,
+            dry_run: bool = False, draw_dates: Optional[List[str]] = None) -> Dict[str, Any]:
+        """backfill ทุกงวดระหว่างสองวันที่ (หรือเฉพาะ draw_dates ที่ระบุ) แล้วคืนสรุปผล"""
+        with self._lock:
+            if self._running:
+                raise RuntimeError("มี backfill กำลังรันอยู่")
+            self._running = True
+
+        try:
+            return self._run(start_date, end_date, resume=resume, skip_existing=skip_existing, dry_run=dry_run,
+                             draw_dates=draw_dates)
+        finally:
+            with self._lock:
+                self._running = False
+
+    def _run(self, start_date: str, end_date: str, resume: bool = True, skip_existing: bool = True,
+             dry_run: bool = False, draw_dates: Optional[List[str]] = None) -> Dict[str, Any]:
+        if draw_dates is None:
+            draw_dates = draw_dates_between(start_date, end_date)
+        # โหลดไฟล์เสมอแล้วบันทึกรวมกับของเดิม รอบซ่อม / force จึงไม่ลบความคืบหน้าของ backfill ย้อนหลังที่ค้างอยู่
+        progress = BackfillProgress(self.progress_path).load()
+        # force (skip_existing=False) ต้องดึงใหม่ทุกงวด จึงไม่ข้ามงวดที่ไฟล์ความคืบหน้าบอกว่าเสร็จแล้ว
+        done = progress.done if resume and skip_existing else set()
+
+        pending = [draw_date for draw_date in draw_dates if draw_date not in done]
+        skipped = len(draw_dates) - len(pending)
+
+        # งวดที่มีในฐานข้อมูลแล้วไม่ต้องดึงซ้ำ (query ครั้งเดียวทั้งช่วง)
+        if skip_existing and pending and not dry_run:
+            # งวดที่เลื่อนแต่บันทึกไว้ที่วันปกติ (ข้อมูลเก่า) ถือว่ามีแล้ว
+            stored = self.service.db.get_draw_dates(*draw_calendar.stored_range(start_date, end_date)) or set()
+            existing = {draw_calendar.resolve(draw_date) or draw_date for draw_date in stored}
+            already_saved = [draw_date for draw_date in pending if draw_date in existing]
+            if already_saved:
+                progress.mark_done(already_saved)
+                pending = [draw_date for draw_date in pending if draw_date not in existing]
+                skipped += len(already_saved)
+
+        started_at = time.monotonic()
+        with self._lock:
+            self._status = {
+                'start_date': start_date,
+                'end_date': end_date,
+                'total': len(draw_dates),
+                'skipped': skipped,
+                'pending': len(pending),
+                'fetched': 0,
+                'parsed': 0,
+                'saved': 0,
+                'failed': 0,
+                'elapsed_seconds': 0.0,
+                'draws_per_second': 0.0,
+                'dry_run': dry_run
+            }
+        print(f"🚚 backfill {start_date} ถึง {end_date}: {len(draw_dates)} งวด "
+              f"(ข้าม {skipped}, ต้องดึง {len(pending)})")
+
+        if pending:
+            self._process(pending, progress, started_at, dry_run)
+        progress.save()
+
+        report = self.status()
+        report.pop('running', None)
+        report['failures'] = {draw_date: progress.failed[draw_date] for draw_date in pending
+                              if draw_date in progress.failed}
+        report['progress_file'] = self.progress_path
+        report['page_cache'] = page_cache.metrics()
+        print(f"🏁 backfill เสร็จ: บันทึก {report['saved']} งวด, ล้มเหลว {report['failed']} งวด, "
+              f"{report['draws_per_second']:.2f} งวด/วินาที")
+        return report
+
+    def _process(self, pending: List[str], progress: BackfillProgress, started_at: float, dry_run: bool):
+        """pipeline: fetch pool -> parse pool -> (thread นี้) บันทึกทีละ batch"""
+        results: 'queue.Queue' = queue.Queue()
+
+        with ThreadPoolExecutor(self.fetch_workers, thread_name_prefix='backfill-fetch') as fetch_pool, \
+                ThreadPoolExecutor(self.parse_workers, thread_name_prefix='backfill-parse') as parse_pool:
+
+            def on_fetched(draw_date, future):
+                error = future.exception()
+                if error is not None:
+                    results.put((draw_date, None, fetch_failure_reason(error)))
+                    return
+                self._count('fetched')
+                parse_pool.submit(self._parse, draw_date, future.result()).add_done_callback(
+                    lambda parsed: results.put((draw_date, *parsed.result()))
+                )
+
+            for draw_date in pending:
+                future = fetch_pool.submit(self._fetch, draw_date)
+                future.add_done_callback(lambda f, d=draw_date: on_fetched(d, f))
+
+            batch: List[Dict[str, Any]] = []
+            for _ in range(len(pending)):
+                draw_date, lottery_data, reason = results.get()
+                if lottery_data is None:
+                    progress.mark_failed(draw_date, reason)
+                    self._count('failed')
+                    print(f"⚠️ backfill งวด {draw_date} ไม่สำเร็จ: {reason}")
+                    continue
+
+                self._count('parsed')
+                batch.append(lottery_data)
+                if len(batch) >= self.batch_size:
+                    self._flush(batch, progress, started_at, dry_run)
+                    batch = []
+
+            if batch:
+                self._flush(batch, progress, started_at, dry_run)
+
+    def _fetch(self, draw_date: str) -> bytes:
+        # หน้าที่อยู่ใน page cache ไม่ต้องรอ rate limit
+        return self.service.fetch_draw_page(draw_date, throttle=self.rate_limiter.wait)
+
+    def _parse(self, draw_date: str, content: bytes):
+        """คืน (lottery_data, เหตุผลที่ล้มเหลว)"""
+        try:
+            lottery_data = self.service.parse_draw_page(content, draw_date)
+        except Exception as e:
+            return None, f"parse_error: {e}"
+        if not lottery_data or not lottery_data.get('first_prize'):
+            return None, 'no_prizes'
+        return lottery_data, None
+
+    def _flush(self, batch: List[Dict[str, Any]], progress: BackfillProgress, started_at: float, dry_run: bool):
+        """บันทึก batch แล้วเขียนความคืบหน้า (รันต่อได้จากจุดนี้)"""
+        draw_dates = [lottery_data['draw_date'] for lottery_data in batch]
+        saved = set(draw_dates if dry_run else self.service.save_many_to_database(batch))
+
+        # นับทีละงวดเสมอ (ทั้งบันทึกทั้ง batch และบันทึกทีละงวดเมื่อไม่มี RPC) failed = จำนวนงวดใน failures
+        progress.mark_done([draw_date for draw_date in draw_dates if draw_date in saved])
+        failed = [draw_date for draw_date in draw_dates if draw_date not in saved]
+        for draw_date in failed:
+            progress.mark_failed(draw_date, 'save_failed')
+        progress.save()
+
+        self._count('saved', len(draw_dates) - len(failed))
+        self._count('failed', len(failed))
+        elapsed = time.monotonic() - started_at
+        with self._lock:
+            self._status['elapsed_seconds'] = round(elapsed, 2)
+            self._status['draws_per_second'] = round(self._status['saved'] / elapsed, 2) if elapsed else 0.0
+            status = dict(self._status)
+        print(f"📦 บันทึกแล้ว {status['saved']}/{status['pending']} งวด "
+              f"({status['draws_per_second']:.2f} งวด/วินาที, ล้มเหลว {status['failed']})")
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._status[key] += amount
+
+
+# engine กลางของ process (ใช้กับ endpoint /cron/backfill)
+backfill_engine = BackfillEngine()
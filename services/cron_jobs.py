@@ -0,0 +1,155 @@
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from .backfill import draw_dates_between, fetch_failure_reason
+from .draw_calendar import draw_calendar
+from .live_poller import tier_counts
+from .lottery_service import completeness_summary
+from .prize_index import is_complete
+
+
+class CronJobRunner:
+    """งาน cron ที่รันใน process เดียวกับ API: ดาวน์โหลด แยก และบันทึกงวดโดยตรง ไม่ต้องเรียก API ของตัวเองผ่าน HTTP"""
+
+    def __init__(self, service=None):
+        self._service = service
+
+    @property
+    def service(self):
+        # สร้าง LotteryService เมื่อใช้ครั้งแรก (import แล้วไม่ต้องเชื่อมต่อฐานข้อมูลทันที)
+        if self._service is None:
+            from .lottery_service import LotteryService
+            self._service = LotteryService()
+        return self._service
+
+    def get_next_lottery_date(self) -> str:
+        """วันที่หวยออกงวดถัดไป"""
+        return draw_calendar.next()
+
+    def get_current_lottery_date(self) -> str:
+        """วันที่หวยงวดปัจจุบัน"""
+        return draw_calendar.current()
+
+    @staticmethod
+    def _exists_result(completeness: Dict[str, Any]) -> Dict[str, Any]:
+        # exists = งวดออกครบทุกประเภทแล้ว (ยังไม่ครบต้อง scrape ต่อ)
+        return {
+            "exists": completeness["complete"],
+            "total_prizes": completeness["total_prizes"],
+            "status": completeness["status"],
+            "counts": completeness["counts"],
+            "missing": completeness["missing"]
+        }
+
+    def check_lottery_data_exists(self, date: str) -> Dict[str, Any]:
+        """เช็คว่ามีข้อมูลหวยงวดนั้นครบแล้วหรือไม่ (นับรางวัลในฐานข้อมูล ไม่ดึงข้อมูลทั้งงวด)"""
+        try:
+            completeness = self.service.get_draw_completeness(date)
+            if completeness is None:
+                return {"exists": False, "total_prizes": 0, "error": "ไม่สามารถเชื่อมต่อฐานข้อมูลได้"}
+            return self._exists_result(completeness)
+
+        except Exception as e:
+            print(f"Error checking lottery data: {e}")
+            return {"exists": False, "total_prizes": 0, "error": str(e)}
+
+    def find_missing_draws(self, start_date: str, end_date: str) -> Optional[Dict[str, Any]]:
+        """งวดที่ยังไม่มีหรือยังไม่ครบในช่วงวันที่ = ปฏิทินงวด - งวดที่ครบในฐานข้อมูล (query เดียวทั้งช่วง, None = query ไม่ได้)"""
+        draw_dates = draw_dates_between(start_date, end_date)
+        if not draw_dates:
+            return {"checked": 0, "complete": 0, "missing": []}
+
+        try:
+            stored = self.service.get_completeness(draw_dates[0], draw_dates[-1])
+        except Exception as e:
+            print(f"Error checking lottery data: {e}")
+            stored = None
+        if stored is None:
+            return None
+
+        complete = {draw_date for draw_date, completeness in stored.items() if completeness["complete"]}
+        missing = []
+        for draw_date in sorted(set(draw_dates) - complete):
+            summary = stored.get(draw_date) or completeness_summary(draw_date, {}, None)
+            missing.append({
+                "date": draw_date,
+                "total_prizes": summary["total_prizes"],
+                "missing_prizes": summary["missing"]
+            })
+
+        return {"checked": len(draw_dates), "complete": len(draw_dates) - len(missing), "missing": missing}
+
+    def scrape_draw(self, date: str, force: bool = False) -> Dict[str, Any]:
+        """scrape งวดเดียวในเครื่องนี้: เช็คความครบ -> ดาวน์โหลด -> แยกรางวัล -> บันทึก พร้อมเวลาของแต่ละขั้น"""
+        started_at = time.perf_counter()
+        timings: Dict[str, float] = {}
+        result: Dict[str, Any] = {"date": date, "tiers": {}, "total_prizes": 0, "complete": False,
+                                  "bytes_fetched": 0, "timings_ms": timings}
+
+        def step(name, fn, *args, **kwargs):
+            step_started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings[name] = round((time.perf_counter() - step_started) * 1000, 1)
+
+        def finish(status: str, message: str) -> Dict[str, Any]:
+            timings["total"] = round((time.perf_counter() - started_at) * 1000, 1)
+            result.update(status=status, message=message)
+            return result
+
+        if not force:
+            existing = step("check", self.check_lottery_data_exists, date)
+            if existing["exists"]:
+                result.update(tiers=existing["counts"], total_prizes=existing["total_prizes"], complete=True)
+                return finish("already_exists", f"ข้อมูลงวด {date} มีอยู่แล้ว ({existing['total_prizes']} รางวัล)")
+
+        print(f"🔄 เริ่ม scrape ข้อมูลงวด {date}")
+        try:
+            content = step("fetch", self.service.fetch_draw_page, date)
+        except Exception as e:
+            result["error"] = fetch_failure_reason(e)
+            return finish("failed", f"Scrape ไม่สำเร็จ: {result['error']}")
+        result["bytes_fetched"] = len(content)
+
+        lottery_data = step("parse", self.service.parse_draw_page, content, date)
+        if not lottery_data:
+            result["error"] = "no_prizes"
+            return finish("failed", f"Scrape ไม่สำเร็จ: ไม่พบผลรางวัลของงวด {date}")
+
+        counts = tier_counts(lottery_data)
+        complete = is_complete(counts)
+        result.update(tiers=counts, total_prizes=sum(counts.values()), complete=complete)
+
+        saved = step("save", self.service.save_to_database, lottery_data, status='active' if complete else 'partial')
+        if not saved:
+            result["error"] = "save_failed"
+            return finish("failed", f"Scrape ได้ {result['total_prizes']} รางวัล แต่บันทึกไม่สำเร็จ")
+
+        return finish("success" if complete else "partial_success",
+                      f"Scrape สำเร็จ! ได้ข้อมูล {result['total_prizes']} รางวัล")
+
+    def scrape_current(self, force: bool = False) -> Dict[str, Any]:
+        """scrape งวดปัจจุบัน"""
+        return self.scrape_draw(self.get_current_lottery_date(), force=force)
+
+    def should_scrape_today(self, today: Optional[datetime] = None) -> Tuple[bool, str]:
+        """ตรวจสอบว่าวันนี้ควร scrape หรือไม่"""
+        today = today or datetime.now()
+
+        # วันหวยออก (1/16 หรือวันที่เลื่อนไปออก) ต้อง scrape เสมอ
+        if draw_calendar.is_draw_date(today):
+            return True, "lottery_day"
+
+        # วันอื่นๆ → เช็คว่ามีข้อมูลงวดปัจจุบันครบแล้วหรือไม่
+        check = self.check_lottery_data_exists(draw_calendar.current(today))
+        if check.get("error"):
+            return False, "error"
+        if not check["exists"]:
+            return True, "missing_data"
+        return False, "data_exists"
+
+
+# runner กลางของ process (ใช้กับ /cron/* และ cron_script.py)
+cron_jobs = CronJobRunner()
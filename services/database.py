@@ -1,15 +1,29 @@
 import os
 from supabase import create_client, Client
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set
 from dotenv import load_dotenv
 
+from .draw_calendar import draw_calendar
+from .prize_rows import canonical_prize_type, count_prize_types
+
 load_dotenv()
 
 
+def pick_stored_draw(rows: Optional[List[Dict[str, Any]]], aliases: List[str]) -> Optional[Dict[str, Any]]:
+    """แถวของงวดตามลำดับ aliases (วันที่ที่ขอก่อน แล้ววันที่อื่นของงวดที่เลื่อน)"""
+    by_date = {row.get('draw_date'): row for row in rows or []}
+    for draw_date in aliases:
+        if draw_date in by_date:
+            return by_date[draw_date]
+    return rows[0] if rows else None
+
+
 class DatabaseService:
-    def __init__(self):
-        self.supabase: Optional[Client] = None
-        self._connect()
+    def __init__(self, client: Optional[Client] = None):
+        """client: ใช้ Supabase client ที่เชื่อมต่อไว้แล้ว (None = เชื่อมต่อใหม่จาก environment variables)"""
+        self.supabase: Optional[Client] = client
+        if client is None:
+            self._connect()
 
     def _connect(self):
         """เชื่อมต่อกับ Supabase"""
@@ -44,6 +58,24 @@ class DatabaseService:
             print(f"ไม่สามารถดึงข้อมูลงวดจากฐานข้อมูลได้: {e}")
             return None
 
+    def get_draw_prizes(self, draw_date: str) -> Optional[Dict[str, Any]]:
+        """ดึงข้อมูลงวดพร้อมรางวัลทั้งหมดในการ query ครั้งเดียว (งวดที่เลื่อนค้นทั้งวันออกจริงและวันปกติ)"""
+        if not self.supabase:
+            return None
+
+        try:
+            aliases = draw_calendar.aliases(draw_date)
+            result = (self.supabase.table('lottery_draws')
+                     .select("id, draw_date, draw_number, lottery_prizes(prize_type, prize_number, position, amount)")
+                     .in_("draw_date", aliases)
+                     .execute())
+
+            return pick_stored_draw(result.data, aliases)
+
+        except Exception as e:
+            print(f"ไม่สามารถดึงข้อมูลรางวัลของงวดได้: {e}")
+            return None
+
     def save_lottery_draw(self, draw_date: str, draw_number: str) -> Optional[int]:
         """บันทึกข้อมูลงวดหวยลงฐานข้อมูล"""
         if not self.supabase:
@@ -90,6 +122,166 @@ class DatabaseService:
             print(f"ไม่สามารถบันทึกรางวัลได้: {e}")
             return False
 
+    def upsert_draw_with_prizes(self, draw_date: str, draw_number: str, prizes: List[Dict[str, Any]],
+                                status: str = "active") -> Optional[int]:
+        """บันทึกงวดและแทนที่รางวัลทั้งชุดใน transaction เดียว (RPC upsert_lottery_draw)"""
+        if not self.supabase:
+            return None
+
+        try:
+            result = self.supabase.rpc('upsert_lottery_draw', {
+                'p_draw_date': draw_date,
+                'p_draw_number': draw_number,
+                'p_prizes': [{
+                    'prize_type': prize['prize_type'],
+                    'prize_number': prize['prize_number'],
+                    'position': prize['position'],
+                    'amount': prize['amount']
+                } for prize in prizes],
+                'p_status': status
+            }).execute()
+
+            return result.data
+
+        except Exception as e:
+            print(f"ไม่สามารถบันทึกงวดผ่าน upsert_lottery_draw ได้: {e}")
+            return None
+
+    def upsert_draws_bulk(self, draws: List[Dict[str, Any]]) -> Optional[int]:
+        """บันทึกหลายงวดพร้อมรางวัลในการเรียกครั้งเดียว (RPC upsert_lottery_draws) คืนจำนวนงวดที่บันทึก"""
+        if not self.supabase:
+            return None
+
+        try:
+            result = self.supabase.rpc('upsert_lottery_draws', {
+                'p_draws': [{
+                    'draw_date': draw['draw_date'],
+                    'draw_number': draw['draw_number'],
+                    'prizes': [{
+                        'prize_type': prize['prize_type'],
+                        'prize_number': prize['prize_number'],
+                        'position': prize['position'],
+                        'amount': prize['amount']
+                    } for prize in draw['prizes']]
+                } for draw in draws]
+            }).execute()
+
+            return result.data
+
+        except Exception as e:
+            print(f"ไม่สามารถบันทึกหลายงวดผ่าน upsert_lottery_draws ได้: {e}")
+            return None
+
+    def get_draw_dates(self, start_date: str, end_date: str, page_size: int = 1000) -> Optional[Set[str]]:
+        """วันที่ของทุกงวดที่มีในฐานข้อมูลระหว่างสองวันที่ (None = query ไม่ได้)"""
+        if not self.supabase:
+            return None
+
+        try:
+            dates: Set[str] = set()
+            start = 0
+            while True:
+                page = (self.supabase.table('lottery_draws')
+                        .select('draw_date')
+                        .gte('draw_date', start_date)
+                        .lte('draw_date', end_date)
+                        .order('draw_date')
+                        .range(start, start + page_size - 1)
+                        .execute())
+                dates.update(row['draw_date'] for row in page.data or [])
+                if not page.data or len(page.data) < page_size:
+                    return dates
+                start += page_size
+
+        except Exception as e:
+            print(f"ไม่สามารถดึงรายการงวดจากฐานข้อมูลได้: {e}")
+            return None
+
+    def get_prize_counts(self, start_date: str, end_date: str,
+                         page_size: int = 1000) -> Optional[Dict[str, Dict[str, Any]]]:
+        """จำนวนรางวัลแต่ละประเภทของทุกงวดระหว่างสองวันที่ {draw_date: {'status', 'counts'}} (None = query ไม่ได้)"""
+        if not self.supabase:
+            return None
+
+        try:
+            # นับในฐานข้อมูล (RPC draw_prize_counts) ได้กลับมาแค่ไม่กี่แถวต่องวด
+            draws: Dict[str, Dict[str, Any]] = {}
+            start = 0
+            while True:
+                page = (self.supabase.rpc('draw_prize_counts', {
+                            'p_start_date': start_date,
+                            'p_end_date': end_date
+                        })
+                        .range(start, start + page_size - 1)
+                        .execute())
+                for row in page.data or []:
+                    draw = draws.setdefault(row['draw_date'], {'status': row.get('status'), 'counts': {}})
+                    if row.get('prize_type'):
+                        # แถวที่บันทึกผ่าน server.py ใช้ชื่อ first/second/... นับรวมกับชื่อแบบ services
+                        prize_type = canonical_prize_type(row['prize_type'])
+                        draw['counts'][prize_type] = draw['counts'].get(prize_type, 0) + row['prize_count']
+                if not page.data or len(page.data) < page_size:
+                    return draws
+                start += page_size
+
+        except Exception as e:
+            print(f"⚠️ ใช้ draw_prize_counts ไม่ได้ ({e}) นับจากประเภทรางวัลแทน")
+
+        try:
+            # ยังไม่ได้รัน database_draw_completeness.sql: ดึงเฉพาะ prize_type แล้วนับเอง
+            draws = {}
+            start = 0
+            while True:
+                page = (self.supabase.table('lottery_draws')
+                        .select('draw_date, status, lottery_prizes(prize_type)')
+                        .gte('draw_date', start_date)
+                        .lte('draw_date', end_date)
+                        .order('draw_date')
+                        .range(start, start + page_size - 1)
+                        .execute())
+                for row in page.data or []:
+                    counts = count_prize_types(row.get('lottery_prizes') or [])
+                    draws[row['draw_date']] = {'status': row.get('status'), 'counts': counts}
+                if not page.data or len(page.data) < page_size:
+                    return draws
+                start += page_size
+
+        except Exception as e:
+            print(f"ไม่สามารถนับรางวัลของงวดได้: {e}")
+            return None
+
+    def acquire_scrape_lease(self, draw_date: str, owner: str, ttl_seconds: int) -> Optional[bool]:
+        """ขอ lease สำหรับ scrape งวดนี้ (None = ใช้ lease ไม่ได้ เช่นยังไม่ได้รัน database_scrape_lease.sql)"""
+        if not self.supabase:
+            return None
+
+        try:
+            result = self.supabase.rpc('acquire_scrape_lease', {
+                'p_draw_date': draw_date,
+                'p_owner': owner,
+                'p_ttl_seconds': ttl_seconds
+            }).execute()
+
+            return bool(result.data)
+
+        except Exception as e:
+            print(f"ไม่สามารถขอ lease สำหรับ scrape ได้: {e}")
+            return None
+
+    def release_scrape_lease(self, draw_date: str, owner: str):
+        """คืน lease ของงวดนี้"""
+        if not self.supabase:
+            return
+
+        try:
+            self.supabase.rpc('release_scrape_lease', {
+                'p_draw_date': draw_date,
+                'p_owner': owner
+            }).execute()
+
+        except Exception as e:
+            print(f"ไม่สามารถคืน lease ได้: {e}")
+
     def search_lottery_prizes(self, number: str, draw_date: str) -> List[Dict[str, Any]]:
         """ค้นหารางวัลที่ถูกใจเลขที่กำหนด"""
         if not self.supabase:
@@ -0,0 +1,188 @@
+import json
+import os
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+# ปฏิทินงวดคำนวณล่วงหน้าตั้งแต่ปีนี้ถึงล่วงหน้ากี่ปี (วันนอกช่วงยังเช็คได้ แต่ช้ากว่า)
+DRAW_CALENDAR_START = os.getenv('DRAW_CALENDAR_START', '2006-01-01')
+DRAW_CALENDAR_YEARS_AHEAD = int(os.getenv('DRAW_CALENDAR_YEARS_AHEAD', '2'))
+
+REGULAR_DRAW_DAYS = (1, 16)
+
+# งวดที่เลื่อนทุกปี: (เดือน, วันปกติ, เลื่อนกี่วัน, ตั้งแต่ปี) ใช้ได้กับทุกปีไม่ต้องเพิ่มตารางทุกปี
+# - 1 ม.ค. ออก 30 ธ.ค. ของปีก่อน (วันขึ้นปีใหม่)
+# - 16 ม.ค. ออก 17 ม.ค. (วันครู)
+# - 1 พ.ค. ออก 2 พ.ค. (วันแรงงาน)
+RECURRING_DRAW_MOVES: List[Tuple[int, int, int, int]] = [
+    (1, 1, -2, 2020),
+    (1, 16, 1, 2020),
+    (5, 1, 1, 2021),
+]
+
+# งวดที่เลื่อนเป็นครั้งคราว: วันตามปกติ -> วันที่ออกจริง (None = งดออกรางวัล) มีผลก่อน RECURRING_DRAW_MOVES
+# - ปี 2563 งวด 1 เม.ย. เลื่อนไปออก 16 พ.ค. งวด 16 เม.ย. และ 1 พ.ค. งด (COVID-19)
+DRAW_DATE_OVERRIDES: Dict[str, Optional[str]] = {
+    '2020-04-01': '2020-05-16',
+    '2020-04-16': None,
+    '2020-05-01': None,
+}
+
+# เพิ่มงวดที่เลื่อนได้โดยไม่ต้องแก้โค้ด เช่น DRAW_DATE_OVERRIDES='{"2027-08-16": "2027-08-17"}'
+DRAW_DATE_OVERRIDES.update(json.loads(os.getenv('DRAW_DATE_OVERRIDES', '{}')))
+
+DateLike = Union[str, date, datetime, None]
+
+
+def _to_date(value: DateLike) -> date:
+    if value is None:
+        return datetime.now().date()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class DrawCalendar:
+    """ปฏิทินวันหวยออกที่คำนวณไว้ล่วงหน้า (รวมงวดที่เลื่อน) ค้น current/next/previous ได้ในเวลาคงที่"""
+
+    def __init__(self, start: DateLike = DRAW_CALENDAR_START, end: DateLike = None,
+                 overrides: Optional[Dict[str, Optional[str]]] = None,
+                 recurring: Optional[List[Tuple[int, int, int, int]]] = None):
+        self.overrides = {
+            _to_date(regular): _to_date(actual) if actual else None
+            for regular, actual in (DRAW_DATE_OVERRIDES if overrides is None else overrides).items()
+        }
+        self.moved_to = {actual: regular for regular, actual in self.overrides.items() if actual}
+        self.recurring = RECURRING_DRAW_MOVES if recurring is None else recurring
+
+        self.start = _to_date(start)
+        self.end = _to_date(end) if end else date(datetime.now().year + DRAW_CALENDAR_YEARS_AHEAD, 12, 31)
+        self.dates = self._generate(self.start, self.end)
+        self._positions = {draw: position for position, draw in enumerate(self.dates)}
+
+        # ต่อวัน: ตำแหน่งของงวดล่าสุดที่ออกไม่เกินวันนั้น (-1 = ก่อนงวดแรก)
+        self._latest: List[int] = []
+        position = -1
+        for offset in range((self.end - self.start).days + 1):
+            day = self.start + timedelta(days=offset)
+            while position + 1 < len(self.dates) and self.dates[position + 1] <= day:
+                position += 1
+            self._latest.append(position)
+
+    def held_on(self, regular: date) -> Optional[date]:
+        """วันที่งวดของวันปกติ (1/16) ออกจริง: ตัวเอง = ไม่เลื่อน, None = งดออกรางวัล"""
+        if regular in self.overrides:
+            return self.overrides[regular]
+        for month, day, shift, since in self.recurring:
+            if (regular.month, regular.day) == (month, day) and regular.year >= since:
+                return regular + timedelta(days=shift)
+        return regular
+
+    def regular_of(self, actual: date) -> Optional[date]:
+        """วันปกติของงวดที่เลื่อนมาออกวันนี้ (None = ไม่มีงวดที่เลื่อนมาออกวันนี้)"""
+        if actual in self.moved_to:
+            return self.moved_to[actual]
+        for month, day, shift, since in self.recurring:
+            regular = actual - timedelta(days=shift)
+            if (regular.month, regular.day) == (month, day) and regular.year >= since and regular not in self.overrides:
+                return regular
+        return None
+
+    def _generate(self, start: date, end: date) -> List[date]:
+        """วันหวยออกจริงระหว่างสองวันที่ เรียงจากเก่าไปใหม่"""
+        # งวดที่เลื่อนอาจมาจากวันปกตินอกช่วง (เช่น 1 ม.ค. -> 30 ธ.ค.) จึงไล่เดือนเผื่อไว้ข้างละ 2 เดือน
+        draws = set()
+        first, last = start - timedelta(days=62), end + timedelta(days=62)
+        year, month = first.year, first.month
+        while (year, month) <= (last.year, last.month):
+            for day in REGULAR_DRAW_DAYS:
+                actual = self.held_on(date(year, month, day))
+                if actual and start <= actual <= end:
+                    draws.add(actual)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return sorted(draws)
+
+    def is_draw_date(self, value: DateLike) -> bool:
+        """วันนี้มีการออกรางวัลหรือไม่"""
+        day = _to_date(value)
+        if self.start <= day <= self.end:
+            return day in self._positions
+        return self.regular_of(day) is not None or (day.day in REGULAR_DRAW_DAYS and self.held_on(day) == day)
+
+    def current(self, today: DateLike = None) -> str:
+        """งวดล่าสุดที่ออกไม่เกินวันนี้ (วันหวยออกคืนงวดของวันนั้น)"""
+        return self.previous(0, today)
+
+    def previous(self, n: int = 1, today: DateLike = None) -> str:
+        """งวดก่อนงวดปัจจุบัน n งวด (n=0 คืนงวดปัจจุบัน)"""
+        day = _to_date(today)
+        if self.start <= day <= self.end:
+            position = self._latest[(day - self.start).days] - n
+            if position >= 0:
+                return self.dates[position].isoformat()
+        # นอกปฏิทินที่คำนวณไว้: สร้างเฉพาะช่วงก่อนหน้า (งวดห่างกันไม่เกิน 2 เดือน)
+        return self._generate(day - timedelta(days=62 * (n + 1)), day)[-1 - n].isoformat()
+
+    def next(self, today: DateLike = None) -> str:
+        """งวดถัดไปหลังวันนี้"""
+        day = _to_date(today)
+        if self.start <= day <= self.end:
+            position = self._latest[(day - self.start).days] + 1
+            if position < len(self.dates):
+                return self.dates[position].isoformat()
+        return self._generate(day + timedelta(days=1), day + timedelta(days=62))[0].isoformat()
+
+    def between(self, start_date: DateLike, end_date: DateLike) -> List[str]:
+        """วันหวยออกจริงทุกงวดระหว่างสองวันที่ เรียงจากเก่าไปใหม่"""
+        start, end = _to_date(start_date), _to_date(end_date)
+        if self.start <= start and end <= self.end:
+            draws = self.dates[bisect_left(self.dates, start):bisect_right(self.dates, end)]
+        else:
+            draws = self._generate(start, end)
+        return [draw.isoformat() for draw in draws]
+
+    def resolve(self, value: DateLike) -> Optional[str]:
+        """วันหวยออกจริงของวันที่ระบุ: วันหวยออกคืนตัวเอง วันปกติที่ถูกเลื่อนคืนวันที่เลื่อนไป อื่นๆ คืน None"""
+        day = _to_date(value)
+        if self.is_draw_date(day):
+            return day.isoformat()
+        actual = self.held_on(day) if day.day in REGULAR_DRAW_DAYS else None
+        return actual.isoformat() if actual else None
+
+    def aliases(self, value: DateLike) -> List[str]:
+        """วันที่ที่งวดนี้อาจถูกบันทึกไว้ในฐานข้อมูล (วันที่ระบุก่อน)
+
+        ข้อมูลเก่าบันทึกงวดที่เลื่อนไว้ที่วันที่ 1/16 ตามปกติ งวดที่เลื่อนจึงค้นได้ทั้งวันออกจริงและวันปกติ
+        """
+        day = _to_date(value)
+        other = self.regular_of(day)
+        if other is None and day.day in REGULAR_DRAW_DAYS and self.held_on(day) != day:
+            other = self.held_on(day)
+        return [day.isoformat(), other.isoformat()] if other else [day.isoformat()]
+
+    def stored_range(self, start_date: DateLike, end_date: DateLike) -> Tuple[str, str]:
+        """ช่วงวันที่ที่ต้อง query ให้ได้ทุกงวดระหว่างสองวันที่ รวมงวดที่เลื่อนซึ่งบันทึกไว้ที่วันปกติ"""
+        dates = [_to_date(start_date).isoformat(), _to_date(end_date).isoformat()]
+        for draw in self.between(start_date, end_date):
+            dates.extend(self.aliases(draw))
+        return min(dates), max(dates)
+
+    def validation_error(self, value: str) -> Optional[str]:
+        """ข้อความ error ของวันที่ที่ไม่ใช่วันหวยออก (None = ใช้ได้) รูปแบบวันที่ผิดโยน ValueError
+
+        วันปกติของงวดที่เลื่อนยังใช้ได้ (ข้อมูลเก่าบันทึกไว้ที่วันนั้น ค้นด้วย aliases)
+        """
+        day = _to_date(value)
+        if self.is_draw_date(day):
+            return None
+        if day.day in REGULAR_DRAW_DAYS:
+            if self.held_on(day):
+                return None
+            return f"หวยออกเฉพาะวันที่ 1 และ 16 ของทุกเดือน งวดวันที่ {day.isoformat()} งดออกรางวัล"
+        return f"หวยออกเฉพาะวันที่ 1 และ 16 ของทุกเดือน ไม่ใช่วันที่ {day.day}"
+
+
+# ปฏิทินกลางของ process (ใช้กับ validation, cron, LINE และ backfill)
+draw_calendar = DrawCalendar()
@@ -0,0 +1,163 @@
+import re
+import threading
+from abc import ABC, abstractmethod
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .article_parser import HEADER_PATTERN, parse_article_body, has_prize_sections, count_prizes
+from .html_parser import HtmlPage, load_page, extract_news_article, extract_main_prizes
+
+# รางวัลหลักที่ต้องได้ครบจึงไม่ต้องลอง strategy ถัดไป
+MAIN_PRIZE_KEYS = ('first_prize', 'second_prize_1', 'second_prize_2', 'third_prize_1', 'third_prize_2', 'fourth_prize_1')
+
+# บรรทัดในข้อความของหน้าที่มีแต่เลขรางวัล (บรรทัดเงินรางวัล เช่น "รางวัลละ 4,000 บาท" จะถูกข้าม)
+NUMBER_LINE_PATTERN = re.compile(r'^[\d\s]+$')
+
+
+def empty_lottery_data(draw_date: str) -> Dict[str, Any]:
+    """ข้อมูลงวดที่ยังไม่มีรางวัล (เลขงวดแบบ วัน/ปี พ.ศ.)"""
+    date_obj = datetime.strptime(draw_date, '%Y-%m-%d')
+    return {
+        'draw_date': draw_date,
+        'draw_number': f"{date_obj.day}/{date_obj.year + 543}",
+        'first_prize': '',
+        'second_prize_1': '',
+        'second_prize_2': '',
+        'third_prize_1': '',
+        'third_prize_2': '',
+        'fourth_prize_1': '',
+        'second_prizes': [],
+        'third_prizes': [],
+        'fourth_prizes': [],
+        'fifth_prizes': [],
+        'nearby_prizes': []
+    }
+
+
+class ParseStrategy(ABC):
+    """วิธีแยกรางวัลจากหน้าตรวจหวยหนึ่งวิธี คืนเฉพาะ key ที่พบ"""
+
+    name = ''
+
+    @abstractmethod
+    def extract(self, page: HtmlPage) -> Dict[str, Any]:
+        """รางวัลที่หาได้จากหน้านี้ (ไม่มี = dict ว่าง)"""
+
+
+class JsonLdStrategy(ParseStrategy):
+    """articleBody ของ JSON-LD อ่านจาก bytes ตรง ๆ ได้ทุกรางวัลโดยไม่ต้องสร้าง DOM"""
+
+    name = 'json_ld'
+
+    def extract(self, page: HtmlPage) -> Dict[str, Any]:
+        article = extract_news_article(page)
+        article_body = article.get('articleBody', '') if article else ''
+        if not has_prize_sections(article_body):
+            return {}
+        return parse_article_body(article_body)
+
+
+class CssStrategy(ParseStrategy):
+    """รางวัลหลักจาก column ของหน้า (CSS selector)"""
+
+    name = 'css'
+
+    def extract(self, page: HtmlPage) -> Dict[str, Any]:
+        return extract_main_prizes(page)
+
+
+class TextStrategy(ParseStrategy):
+    """ข้อความทั้งหน้า: เก็บเฉพาะบรรทัดหัวข้อรางวัลและบรรทัดเลข แล้วอ่านด้วย tokenizer เดียวกับ articleBody"""
+
+    name = 'text'
+
+    def extract(self, page: HtmlPage) -> Dict[str, Any]:
+        lines = [
+            line.strip() for line in page.text().splitlines()
+            if NUMBER_LINE_PATTERN.match(line) or HEADER_PATTERN.search(line)
+        ]
+        return parse_article_body('\n'.join(lines))
+
+
+class StrategyStats:
+    """จำนวนครั้งที่เรียก ครั้งที่ได้รางวัลที่ 1 และเวลารวมของ strategy หนึ่ง"""
+
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+
+class DrawPageParser:
+    """แยกผลรางวัลด้วย strategy ตามลำดับ (ถูกไปแพง) หยุดทันทีเมื่อได้รางวัลหลักครบ"""
+
+    def __init__(self, strategies: Optional[List[ParseStrategy]] = None):
+        self.strategies = strategies or [JsonLdStrategy(), CssStrategy(), TextStrategy()]
+        self._stats = {strategy.name: StrategyStats() for strategy in self.strategies}
+        self._lock = threading.Lock()
+
+    def extract(self, page: HtmlPage) -> Dict[str, Any]:
+        """รางวัลทั้งหมดที่หาได้ (strategy หลังเติมเฉพาะ key ที่ strategy ก่อนหน้ายังหาไม่ได้)"""
+        prizes: Dict[str, Any] = {}
+
+        for strategy in self.strategies:
+            started_at = time.perf_counter()
+            try:
+                found = strategy.extract(page)
+                error = False
+            except Exception as e:
+                print(f"⚠️ strategy {strategy.name} ล้มเหลว: {e}")
+                found, error = {}, True
+            elapsed = time.perf_counter() - started_at
+
+            with self._lock:
+                stats = self._stats[strategy.name]
+                stats.calls += 1
+                stats.hits += bool(found.get('first_prize'))
+                stats.errors += error
+                stats.seconds += elapsed
+
+            for key, value in found.items():
+                if value and not prizes.get(key):
+                    prizes[key] = value
+
+            if all(prizes.get(key) for key in MAIN_PRIZE_KEYS):
+                print(f"✅ แยกรางวัลด้วย {strategy.name} ได้ {count_prizes(prizes)} รางวัล")
+                break
+
+        return prizes
+
+    def parse(self, content, draw_date: str) -> Optional[Dict[str, Any]]:
+        """แยกหน้าตรวจหวยของงวดเป็น lottery_data (None ถ้าไม่พบรางวัลที่ 1)"""
+        # อ่าน JSON-LD จาก bytes ก่อน DOM สร้างเฉพาะเมื่อต้องใช้ CSS / ข้อความของหน้า
+        page = content if isinstance(content, HtmlPage) else load_page(content)
+
+        prizes = self.extract(page)
+        if not prizes.get('first_prize'):
+            print(f"❌ ไม่พบรางวัลที่ 1 ของงวด {draw_date}")
+            return None
+
+        lottery_data = empty_lottery_data(draw_date)
+        lottery_data.update(prizes)
+        return lottery_data
+
+    def metrics(self) -> Dict[str, Any]:
+        """hit rate และเวลาเฉลี่ยของแต่ละ strategy ตามลำดับที่ใช้"""
+        with self._lock:
+            return {
+                strategy.name: {
+                    'calls': stats.calls,
+                    'hits': stats.hits,
+                    'errors': stats.errors,
+                    'hit_rate': round(stats.hits / stats.calls, 3) if stats.calls else None,
+                    'avg_ms': round(stats.seconds / stats.calls * 1000, 3) if stats.calls else None
+                }
+                for strategy in self.strategies
+                for stats in [self._stats[strategy.name]]
+            }
+
+
+# parser กลางของ process (ทุกจุดที่แยกหน้าตรวจหวยใช้ตัวนี้ สถิติจึงรวมกัน)
+draw_parser = DrawPageParser()
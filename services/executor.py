@@ -0,0 +1,111 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+# จำนวน thread สำหรับงาน I/O ที่ block (scrape, Supabase) ต่อหนึ่ง worker
+IO_WORKERS = int(os.getenv("LOTTERY_IO_WORKERS", "32"))
+
+# จำนวนงานสูงสุดที่รับไว้พร้อมกัน (กำลังทำ + รอคิว) เกินนี้จะปฏิเสธทันที
+IO_MAX_PENDING = int(os.getenv("LOTTERY_IO_MAX_PENDING", "256"))
+
+
+class ExecutorOverloaded(Exception):
+    """คิวของ executor เต็ม"""
+
+
+class BoundedExecutor:
+    """thread pool ที่จำกัดจำนวนงานค้าง สำหรับเรียกโค้ด sync จาก async handler โดยไม่ block event loop"""
+
+    def __init__(self, max_workers: int = IO_WORKERS, max_pending: int = IO_MAX_PENDING, name: str = "lottery-io"):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+
+        # สถิติ
+        self._pending = 0
+        self._active = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+        self._max_wait = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """รัน fn ใน thread pool แล้วรอผลแบบ async"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise ExecutorOverloaded(f"{self.name}: มีงานค้าง {self._pending} งาน")
+            self._pending += 1
+            self._submitted += 1
+
+        call = functools.partial(self._call, time.monotonic(), functools.partial(fn, *args, **kwargs))
+        try:
+            future = self._executor.submit(call)
+        except BaseException:
+            self._release()
+            raise
+
+        # นับงานค้างจนกว่า thread จะทำเสร็จจริง ไม่ใช่แค่จนผู้รอเลิกรอ (client ตัดการเชื่อมต่อ / timeout)
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _call(self, enqueued_at: float, fn: Callable[[], Any]) -> Any:
+        started_at = time.monotonic()
+        wait = started_at - enqueued_at
+        with self._lock:
+            self._active += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+
+        failed = False
+        try:
+            return fn()
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                self._failed += failed
+                self._total_run += time.monotonic() - started_at
+
+    def metrics(self) -> Dict[str, Any]:
+        """สถิติของ executor สำหรับ health endpoint"""
+        with self._lock:
+            completed = self._completed
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "active": self._active,
+                "queued": self._pending - self._active,
+                "submitted": self._submitted,
+                "completed": completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._total_wait / completed * 1000, 2) if completed else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 2),
+                "avg_run_ms": round(self._total_run / completed * 1000, 2) if completed else 0.0
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+# executor กลางของ process สำหรับงาน I/O
+io_executor = BoundedExecutor()
@@ -0,0 +1,158 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# ยิงแหล่งถัดไปเมื่อแหล่งปัจจุบันยังไม่ตอบภายใน percentile นี้ของเวลาตอบที่ผ่านมา
+HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', '0.95'))
+
+# ขอบเขตของเวลารอก่อน hedge (วินาที) และค่าเริ่มต้นเมื่อยังไม่มีสถิติของแหล่งนั้น
+HEDGE_MIN_DELAY = float(os.getenv('HEDGE_MIN_DELAY', '0.2'))
+HEDGE_MAX_DELAY = float(os.getenv('HEDGE_MAX_DELAY', '5'))
+HEDGE_DEFAULT_DELAY = float(os.getenv('HEDGE_DEFAULT_DELAY', '2'))
+
+# แหล่งที่สำเร็จน้อยกว่านี้ (เมื่อมีสถิติพอ) ยิงแหล่งถัดไปพร้อมกันเลย ไม่ต้องรอ
+HEDGE_MIN_SUCCESS_RATE = float(os.getenv('HEDGE_MIN_SUCCESS_RATE', '0.5'))
+HEDGE_MIN_SAMPLES = 5
+
+# จำนวนผลล่าสุดของแต่ละแหล่งที่ใช้คำนวณสถิติ
+HEDGE_WINDOW = 100
+
+
+class SourceStats:
+    """สถิติเวลาตอบและอัตราสำเร็จล่าสุดของแหล่งข้อมูลหนึ่ง"""
+
+    def __init__(self, window: int = HEDGE_WINDOW):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+
+    def record(self, latency: float, success: bool):
+        self.outcomes.append(success)
+        if success:
+            self.latencies.append(latency)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(p * len(ordered)) - 1))]
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        if not self.outcomes:
+            return None
+        return sum(self.outcomes) / len(self.outcomes)
+
+
+class HedgedFetcher:
+    """ดึงข้อมูลจากหลายแหล่งแบบ hedge: เริ่มจากแหล่งแรก ถ้าช้าเกินปกติค่อยยิงแหล่งถัดไป ใช้ผลแรกที่ผ่านการตรวจ"""
+
+    def __init__(self, percentile: float = HEDGE_PERCENTILE, min_delay: float = HEDGE_MIN_DELAY,
+                 max_delay: float = HEDGE_MAX_DELAY, default_delay: float = HEDGE_DEFAULT_DELAY,
+                 max_workers: int = 8):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedged-fetch')
+        self._stats: Dict[str, SourceStats] = {}
+        self._lock = threading.Lock()
+
+    def _source_stats(self, name: str) -> SourceStats:
+        with self._lock:
+            if name not in self._stats:
+                self._stats[name] = SourceStats()
+            return self._stats[name]
+
+    def hedge_delay(self, name: str) -> float:
+        """เวลาที่รอแหล่งนี้ก่อนยิงแหล่งถัดไป"""
+        stats = self._source_stats(name)
+        with self._lock:
+            success_rate = stats.success_rate
+            if success_rate is not None and len(stats.outcomes) >= HEDGE_MIN_SAMPLES \
+                    and success_rate < HEDGE_MIN_SUCCESS_RATE:
+                return 0.0
+            latency = stats.percentile(self.percentile)
+
+        if latency is None:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, latency))
+
+    def _attempt(self, name: str, fn: Callable[[], Any], validate: Callable[[Any], bool]) -> Any:
+        """เรียกแหล่งหนึ่งแล้วบันทึกสถิติ (ผลที่ไม่ผ่านการตรวจนับเป็นล้มเหลว)"""
+        started_at = time.monotonic()
+        success = False
+        try:
+            result = fn()
+            success = result is not None and bool(validate(result))
+            return result if success else None
+        finally:
+            stats = self._source_stats(name)
+            with self._lock:
+                stats.record(time.monotonic() - started_at, success)
+
+    def fetch(self, sources: List[Tuple[str, Callable[[], Any]]],
+              validate: Callable[[Any], bool] = lambda result: True) -> Optional[Tuple[str, Any]]:
+        """คืน (ชื่อแหล่ง, ผล) ของผลแรกที่ผ่านการตรวจ หรือ None ถ้าทุกแหล่งล้มเหลว"""
+        remaining = list(sources)
+        running = {}
+
+        def launch():
+            name, fn = remaining.pop(0)
+            running[self._executor.submit(self._attempt, name, fn, validate)] = name
+            return name
+
+        leader = launch()
+        while running:
+            # รอแหล่งล่าสุดตาม percentile ของมัน ถ้ายังไม่มีแหล่งเหลือให้รอจนกว่าจะมีผล
+            timeout = self.hedge_delay(leader) if remaining else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                print(f"⏱️ {leader} ยังไม่ตอบใน {timeout:.2f} วินาที ยิง {remaining[0][0]} เพิ่ม")
+                leader = launch()
+                continue
+
+            for future in done:
+                name = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"⚠️ ดึงข้อมูลจาก {name} ไม่สำเร็จ: {e}")
+                    result = None
+                if result is not None:
+                    # แหล่งที่ยังทำงานอยู่ปล่อยให้จบเอง (ผลของมันยังใช้เป็นสถิติ)
+                    return name, result
+
+            # แหล่งที่ตอบมาล้มเหลว ยิงแหล่งถัดไปทันทีไม่ต้องรอ hedge delay
+            if remaining:
+                leader = launch()
+
+        return None
+
+    def metrics(self) -> Dict[str, Any]:
+        """สถิติของแต่ละแหล่ง (เวลาตอบ p50/p95 และอัตราสำเร็จ)"""
+        with self._lock:
+            names = list(self._stats)
+        result = {}
+        for name in names:
+            stats = self._source_stats(name)
+            with self._lock:
+                p50 = stats.percentile(0.5)
+                p95 = stats.percentile(0.95)
+                success_rate = stats.success_rate
+                samples = len(stats.outcomes)
+            result[name] = {
+                'samples': samples,
+                'success_rate': round(success_rate, 3) if success_rate is not None else None,
+                'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+                'p95_ms': round(p95 * 1000, 1) if p95 is not None else None
+            }
+        return result
+
+
+# fetcher กลางของ process (สถิติของแต่ละแหล่งสะสมข้ามการเรียก)
+hedged_fetcher = HedgedFetcher()
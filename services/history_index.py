@@ -0,0 +1,105 @@
+import threading
+import time
+from bisect import insort
+from typing import Dict, List, Optional, Any, Iterable, Set, Tuple
+
+from .prize_index import PRIZE_NAMES
+
+
+class NumberHistoryIndex:
+    """ดัชนีย้อนกลับจากเลขรางวัล (6, 3 และ 2 ตัว) ไปยังทุกงวดที่เลขนั้นเคยถูกรางวัล"""
+
+    def __init__(self):
+        # prize_number -> [(draw_date, draw_number, prize_type, position, amount)] เรียงตามวันที่
+        self._entries: Dict[str, List[Tuple[str, str, str, int, int]]] = {}
+        # draw_date -> เลขที่อยู่ใน index ของงวดนั้น (ใช้ตอนบันทึกงวดเดิมซ้ำ)
+        self._draw_numbers: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        self.loaded = False
+        # เวลาที่โหลด/ตรวจล่าสุด (monotonic) และ signature ของข้อมูลในฐานข้อมูลตอนโหลด
+        self.checked_at = 0.0
+        self.signature: Any = None
+
+    def is_fresh(self, ttl: float) -> bool:
+        """โหลดแล้วและตรวจกับฐานข้อมูลไม่เกิน ttl วินาทีที่แล้ว"""
+        return self.loaded and time.monotonic() - self.checked_at < ttl
+
+    def touch(self):
+        """ตรวจแล้วว่าข้อมูลในฐานข้อมูลยังตรงกับ signature เดิม"""
+        self.checked_at = time.monotonic()
+
+    def add_draw(self, draw_date: str, draw_number: Optional[str], prizes: Iterable[Dict[str, Any]]):
+        """เพิ่ม (หรือแทนที่) รางวัลของงวดหนึ่งลงใน index"""
+        with self._lock:
+            self._remove_draw(draw_date)
+
+            numbers = set()
+            for prize in prizes:
+                number = prize.get('prize_number')
+                if not number:
+                    continue
+
+                entry = (draw_date, draw_number or '', prize['prize_type'], prize.get('position', 1), prize['amount'])
+                insort(self._entries.setdefault(number, []), entry)
+                numbers.add(number)
+
+            self._draw_numbers[draw_date] = numbers
+
+    def _remove_draw(self, draw_date: str):
+        for number in self._draw_numbers.pop(draw_date, ()):
+            remaining = [entry for entry in self._entries.get(number, []) if entry[0] != draw_date]
+            if remaining:
+                self._entries[number] = remaining
+            else:
+                self._entries.pop(number, None)
+
+    def load_rows(self, rows: Iterable[Dict[str, Any]], signature: Any = None):
+        """โหลดแถวของ lottery_prizes (join กับ lottery_draws) ทั้งหมด แทนที่ข้อมูลเดิมใน index"""
+        by_draw: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            draw = row.get('lottery_draws') or {}
+            draw_date = draw.get('draw_date')
+            if not draw_date:
+                continue
+            by_draw.setdefault(draw_date, {'draw_number': draw.get('draw_number'), 'prizes': []})['prizes'].append(row)
+
+        with self._lock:
+            self._entries.clear()
+            self._draw_numbers.clear()
+            for draw_date, draw in by_draw.items():
+                self.add_draw(draw_date, draw['draw_number'], draw['prizes'])
+            self.signature = signature
+            self.loaded = True
+            self.touch()
+
+    def lookup(self, number: str) -> List[Dict[str, Any]]:
+        """คืนรายการงวดที่เลขนี้ถูกรางวัล เรียงจากงวดล่าสุด"""
+        with self._lock:
+            entries = list(self._entries.get(number, ()))
+
+        results_by_draw: Dict[str, Dict[str, Any]] = {}
+        for draw_date, draw_number, prize_type, position, amount in reversed(entries):
+            if draw_date not in results_by_draw:
+                results_by_draw[draw_date] = {
+                    'draw_date': draw_date,
+                    'draw_number': draw_number,
+                    'prizes': []
+                }
+
+            results_by_draw[draw_date]['prizes'].append({
+                'prize_type': prize_type,
+                'prize_name': PRIZE_NAMES.get(prize_type, prize_type),
+                'position': position,
+                'amount': amount
+            })
+
+        return list(results_by_draw.values())
+
+    @property
+    def total_draws(self) -> int:
+        with self._lock:
+            return len(self._draw_numbers)
+
+
+# index กลางของ process
+history_index = NumberHistoryIndex()
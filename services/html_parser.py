@@ -0,0 +1,260 @@
+import html
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Any, Pattern, Union
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401 (ใช้เป็น tree builder ของ BeautifulSoup)
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+
+# เลือก parser ได้ด้วย HTML_PARSER_BACKEND: auto | selectolax | lxml | html.parser
+HTML_PARSER_BACKEND = os.getenv('HTML_PARSER_BACKEND', 'auto')
+
+# auto จะเลือกตัวแรกที่ติดตั้งไว้ (เร็วสุดก่อน)
+BACKEND_PRIORITY = ['selectolax', 'lxml', 'html.parser']
+
+# selector ครอบคลุมทั้งชื่อ class จริงของ sanook (lotto__number) และแบบที่โค้ดเดิมใช้ (lotto_number)
+JSON_LD_SELECTOR = 'script[type="application/ld+json"]'
+FIRST_PRIZE_SELECTOR = '.lotto__number--first, .lotto_number--first'
+COLUMN_SELECTOR = '.lottocheck__column, .lottocheck_column'
+NUMBER_SELECTOR = '.lotto__number, .lotto_number'
+
+# ค้น script JSON-LD จาก bytes ตรง ๆ โดยไม่ต้องสร้าง DOM
+JSON_LD_SCRIPT_PATTERN = re.compile(
+    rb'<script\b[^>]*?type\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+
+# href ของ link ทุกอันจาก bytes ตรง ๆ
+HREF_PATTERN = re.compile(rb'<a\b[^>]*?\bhref\s*=\s*(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+
+
+def available_backends() -> List[str]:
+    """backend ที่ใช้ได้ในเครื่องนี้"""
+    backends = []
+    if LexborHTMLParser is not None:
+        backends.append('selectolax')
+    if HAS_LXML:
+        backends.append('lxml')
+    backends.append('html.parser')
+    return backends
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """แปลงชื่อ backend ที่ตั้งไว้เป็นตัวที่ใช้ได้จริง"""
+    name = backend or HTML_PARSER_BACKEND
+    if name not in BACKEND_PRIORITY and name != 'auto':
+        raise ValueError(f"ไม่รู้จัก HTML parser backend: {name}")
+
+    available = available_backends()
+    if name == 'auto':
+        return available[0]
+    if name not in available:
+        print(f"⚠️ ไม่ได้ติดตั้ง {name} ใช้ {available[0]} แทน")
+        return available[0]
+    return name
+
+
+class HtmlPage(ABC):
+    """หน้า HTML ที่ parse แล้ว ใช้ค้นข้อมูลหวยได้เหมือนกันทุก backend (backend ต้อง override ทุก abstractmethod)"""
+
+    backend = ''
+
+    def __init__(self, content):
+        self.content = content
+        self._soup: Optional[BeautifulSoup] = None
+
+    @abstractmethod
+    def select_texts(self, selector: str) -> List[str]:
+        """ข้อความของทุก element ที่ตรงกับ CSS selector"""
+
+    @abstractmethod
+    def select_groups(self, group_selector: str, item_selector: str) -> List[List[str]]:
+        """ข้อความของ item ในแต่ละ group (เช่น เลขในแต่ละ column)"""
+
+    @abstractmethod
+    def json_ld_blocks(self) -> List[str]:
+        """เนื้อหาของ script application/ld+json ทั้งหมด"""
+
+    @abstractmethod
+    def text(self) -> str:
+        """ข้อความทั้งหน้า (แต่ละ element ขึ้นบรรทัดใหม่)"""
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """BeautifulSoup ของหน้า สำหรับโค้ดเดิมที่ค้นด้วย find_all / regex"""
+        if self._soup is None:
+            self._soup = make_soup(self.content, self.backend)
+        return self._soup
+
+
+class SoupPage(HtmlPage):
+    """BeautifulSoup (tree builder: lxml หรือ html.parser)"""
+
+    def __init__(self, content, features: str = 'html.parser'):
+        super().__init__(content)
+        self.backend = features
+        self._soup = BeautifulSoup(content, features)
+
+    def select_texts(self, selector: str) -> List[str]:
+        return [element.get_text().strip() for element in self._soup.select(selector)]
+
+    def select_groups(self, group_selector: str, item_selector: str) -> List[List[str]]:
+        return [
+            [item.get_text().strip() for item in group.select(item_selector)]
+            for group in self._soup.select(group_selector)
+        ]
+
+    def json_ld_blocks(self) -> List[str]:
+        return [script.string or '' for script in self._soup.select(JSON_LD_SELECTOR)]
+
+    def text(self) -> str:
+        return self._soup.get_text('\n')
+
+
+class SelectolaxPage(HtmlPage):
+    """selectolax (lexbor) - parser ภาษา C ที่เร็วที่สุด"""
+
+    backend = 'selectolax'
+
+    def __init__(self, content):
+        super().__init__(content)
+        self._tree = LexborHTMLParser(content)
+
+    def select_texts(self, selector: str) -> List[str]:
+        return [node.text().strip() for node in self._tree.css(selector)]
+
+    def select_groups(self, group_selector: str, item_selector: str) -> List[List[str]]:
+        return [
+            [item.text().strip() for item in group.css(item_selector)]
+            for group in self._tree.css(group_selector)
+        ]
+
+    def json_ld_blocks(self) -> List[str]:
+        return [node.text() for node in self._tree.css(JSON_LD_SELECTOR)]
+
+    def text(self) -> str:
+        root = self._tree.body or self._tree.root
+        return root.text(separator='\n') if root is not None else ''
+
+
+class RawHtmlPage(HtmlPage):
+    """อ่าน JSON-LD จาก bytes ของหน้าโดยตรง สร้าง DOM เฉพาะเมื่อต้องใช้ selector หรือ soup"""
+
+    def __init__(self, content, backend: Optional[str] = None):
+        super().__init__(content)
+        self._backend = backend
+        self._dom: Optional[HtmlPage] = None
+
+    @property
+    def backend(self) -> str:
+        return self._dom.backend if self._dom is not None else 'raw'
+
+    @property
+    def dom(self) -> HtmlPage:
+        """หน้า HTML ที่ parse เต็มรูปแบบ (สร้างครั้งแรกที่เรียก)"""
+        if self._dom is None:
+            self._dom = parse_html(self.content, self._backend)
+        return self._dom
+
+    def select_texts(self, selector: str) -> List[str]:
+        return self.dom.select_texts(selector)
+
+    def select_groups(self, group_selector: str, item_selector: str) -> List[List[str]]:
+        return self.dom.select_groups(group_selector, item_selector)
+
+    def json_ld_blocks(self) -> List[str]:
+        return scan_json_ld_blocks(self.content)
+
+    def text(self) -> str:
+        return self.dom.text()
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        return self.dom.soup
+
+
+def scan_json_ld_blocks(content) -> List[str]:
+    """ดึงเนื้อหา script application/ld+json จาก bytes (หรือ str) โดยไม่ parse HTML"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return [
+        match.group(1).decode('utf-8', errors='replace')
+        for match in JSON_LD_SCRIPT_PATTERN.finditer(content)
+    ]
+
+
+def scan_hrefs(content, pattern: Union[str, Pattern]) -> List[str]:
+    """href ของ link ที่ตรงกับ pattern (re.search) จาก bytes (หรือ str) โดยไม่ parse HTML"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+    hrefs = (html.unescape(match.group(2).decode('utf-8', errors='replace')) for match in HREF_PATTERN.finditer(content))
+    return [href for href in hrefs if pattern.search(href)]
+
+
+def load_page(content, backend: Optional[str] = None) -> HtmlPage:
+    """หน้า HTML แบบ lazy: JSON-LD อ่านจาก bytes, DOM สร้างเมื่อ fallback เท่านั้น"""
+    return RawHtmlPage(content, backend)
+
+
+def parse_html(content, backend: Optional[str] = None) -> HtmlPage:
+    """parse หน้า HTML ด้วย backend ที่ตั้งไว้"""
+    backend = resolve_backend(backend)
+    if backend == 'selectolax':
+        return SelectolaxPage(content)
+    return SoupPage(content, backend)
+
+
+def make_soup(content, backend: Optional[str] = None) -> BeautifulSoup:
+    """สร้าง BeautifulSoup ด้วย tree builder ที่เร็วที่สุดที่ backend นี้ใช้ได้"""
+    backend = resolve_backend(backend)
+    features = 'lxml' if backend != 'html.parser' and HAS_LXML else 'html.parser'
+    return BeautifulSoup(content, features)
+
+
+def extract_news_article(page: HtmlPage) -> Optional[Dict[str, Any]]:
+    """หา JSON-LD ที่เป็น NewsArticle (มีผลรางวัลทั้งหมดใน articleBody)"""
+    for block in page.json_ld_blocks():
+        try:
+            json_data = json.loads(block)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(json_data, dict) and json_data.get('@type') == 'NewsArticle':
+            return json_data
+    return None
+
+
+def extract_main_prizes(page: HtmlPage) -> Dict[str, str]:
+    """ดึงรางวัลหลักจาก column ของหน้าตรวจหวย (รางวัลที่ 1, หน้า 3, ท้าย 3, ท้าย 2)"""
+    prizes: Dict[str, str] = {}
+
+    for text in page.select_texts(FIRST_PRIZE_SELECTOR):
+        if len(text) == 6 and text.isdigit():
+            prizes['first_prize'] = text
+            break
+
+    # column: [รางวัลที่ 1] [เลขหน้า 3 ตัว] [เลขท้าย 3 ตัว] [เลขท้าย 2 ตัว]
+    columns = page.select_groups(COLUMN_SELECTOR, NUMBER_SELECTOR)
+    column_keys = [
+        (1, ['second_prize_1', 'second_prize_2']),
+        (2, ['third_prize_1', 'third_prize_2']),
+        (3, ['fourth_prize_1']),
+    ]
+    for column, keys in column_keys:
+        if len(columns) > column and len(columns[column]) >= len(keys):
+            prizes.update(zip(keys, columns[column]))
+
+    return prizes
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import date, datetime
+from typing import Dict, Optional, Any
+
+from .prize_index import EXPECTED_PRIZE_ROWS
+from .prize_rows import build_prize_rows, prize_set_digest
+
+
+# งวดที่ออกครบและผ่านวันออกรางวัลไปแล้ว ไม่มีการเปลี่ยนแปลงอีก ให้ cache ได้ 1 ปี
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# งวดที่ยังออกไม่ครบ (หรือเพิ่งออกวันนี้) ให้ cache สั้นๆ (วินาที)
+CURRENT_DRAW_MAX_AGE = int(os.getenv('CURRENT_DRAW_MAX_AGE', '60'))
+
+
+class DrawResponse:
+    """ผลของงวดที่ serialize แล้ว พร้อม ETag และ Cache-Control"""
+
+    def __init__(self, draw_date: str, lottery_data: Dict[str, Any], today: Optional[date] = None):
+        rows = build_prize_rows(lottery_data)
+        today = today or datetime.now().date()
+
+        self.draw_date = draw_date
+        self.data = lottery_data
+        self.body = json.dumps(lottery_data, ensure_ascii=False, default=str).encode('utf-8')
+        self.etag = prize_set_etag(rows) if rows else body_etag(self.body)
+        self.immutable = len(rows) >= EXPECTED_PRIZE_ROWS and _parse_date(draw_date) < today
+
+        if self.immutable:
+            self.cache_control = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            self.cache_control = f"public, max-age={CURRENT_DRAW_MAX_AGE}"
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"ETag": self.etag, "Cache-Control": self.cache_control}
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """ตรวจ If-None-Match ของ client ว่าตรงกับ ETag นี้หรือไม่ (ตอบ 304 ได้)"""
+        return etag_matches(if_none_match, self.etag)
+
+
+def prize_set_etag(rows) -> str:
+    """strong ETag จากชุดรางวัลของงวด (ไม่ขึ้นกับลำดับแถว)"""
+    return '"' + prize_set_digest(rows) + '"'
+
+
+def body_etag(body: bytes) -> str:
+    """ETag จาก body (ใช้กับข้อมูลแบบเก่าที่แปลงเป็นแถวรางวัลไม่ได้)"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """เทียบ If-None-Match แบบ weak comparison ตาม RFC 9110"""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _parse_date(draw_date: str) -> date:
+    try:
+        return datetime.strptime(draw_date, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return date.max
+
+
+class DrawResponseCache:
+    """เก็บ DrawResponse ของงวดที่ไม่เปลี่ยนแปลงแล้ว ไม่ต้องโหลดและ serialize ซ้ำทุก request"""
+
+    def __init__(self):
+        self._responses: Dict[str, DrawResponse] = {}
+        self._lock = threading.Lock()
+
+    def get(self, draw_date: str) -> Optional[DrawResponse]:
+        with self._lock:
+            return self._responses.get(draw_date)
+
+    def build(self, draw_date: str, lottery_data: Dict[str, Any]) -> DrawResponse:
+        """สร้าง DrawResponse และเก็บไว้ถ้างวดนั้นไม่เปลี่ยนแปลงแล้ว"""
+        response = DrawResponse(draw_date, lottery_data)
+        if response.immutable:
+            with self._lock:
+                self._responses[draw_date] = response
+        return response
+
+    def invalidate(self, draw_date: str):
+        with self._lock:
+            self._responses.pop(draw_date, None)
+
+
+# cache กลางของ process
+draw_responses = DrawResponseCache()
@@ -0,0 +1,67 @@
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import USER_AGENT
+
+# ขนาด connection pool ต่อ host (ควรไม่น้อยกว่าจำนวน thread ที่ scrape พร้อมกัน)
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '32'))
+
+# timeout แยกกัน: ต่อ TCP/TLS ไม่ควรนาน แต่หน้า sanook อาจโหลดช้า (วินาที)
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '15'))
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+# request ที่ผู้ใช้รออยู่ (scrape-on-miss) ไม่ retry และรอหน้าเว็บสั้นกว่า (วินาที)
+HTTP_INTERACTIVE_READ_TIMEOUT = float(os.getenv('HTTP_INTERACTIVE_READ_TIMEOUT', '5'))
+INTERACTIVE_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_INTERACTIVE_READ_TIMEOUT)
+
+# retry เมื่อเชื่อมต่อไม่ได้หรือเว็บตอบ 429/5xx (รอ backoff * 2^n วินาที) ใช้กับ cron / backfill
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '3'))
+HTTP_BACKOFF = float(os.getenv('HTTP_BACKOFF', '0.5'))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter ที่ใส่ timeout ให้ทุก request ที่ไม่ได้กำหนดเอง"""
+
+    def __init__(self, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def create_session(pool_size: int = HTTP_POOL_SIZE, retries: int = HTTP_RETRIES,
+                   backoff: float = HTTP_BACKOFF, timeout=DEFAULT_TIMEOUT) -> requests.Session:
+    """สร้าง Session ที่มี connection pool แบบ keep-alive, timeout และ retry"""
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = TimeoutHTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry, timeout=timeout)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT})
+    return session
+
+
+# client กลางของ process (ใช้ร่วมกันทุก scraper ไม่ต้อง handshake ใหม่ทุกครั้ง ห้ามแก้ headers ของ session นี้)
+# http_client: งานเบื้องหลัง (cron, backfill, live polling) retry ได้
+# interactive_client: request ที่ผู้ใช้รออยู่ ล้มเหลวเร็วแทนการ retry
+http_client = create_session()
+interactive_client = create_session(retries=0, timeout=INTERACTIVE_TIMEOUT)
@@ -0,0 +1,130 @@
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from .draw_calendar import draw_calendar
+from .prize_index import EXPECTED_PRIZE_COUNTS, PRIZE_NAMES, is_complete
+from .prize_rows import build_prize_rows, count_prize_types
+
+# ประเทศไทยไม่มี daylight saving ใช้ UTC+7 ตายตัวได้
+BANGKOK_TZ = timezone(timedelta(hours=7))
+
+# ช่วงเวลาที่สลากทยอยออกรางวัลในวันหวยออก (เวลาไทย) และความถี่ในการเช็คหน้าเว็บ (วินาที)
+LIVE_POLL_START = os.getenv('LIVE_POLL_START', '14:00')
+LIVE_POLL_END = os.getenv('LIVE_POLL_END', '17:30')
+LIVE_POLL_INTERVAL = float(os.getenv('LIVE_POLL_INTERVAL', '5'))
+
+
+def tier_counts(lottery_data: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """จำนวนรางวัลที่ออกแล้วของแต่ละประเภท"""
+    if not lottery_data:
+        return {}
+    return count_prize_types(build_prize_rows(lottery_data))
+
+
+def _parse_time(value: str):
+    return datetime.strptime(value, '%H:%M').time()
+
+
+class LivePoller:
+    """เช็คหน้าผลหวยถี่ ๆ ในช่วงออกรางวัล บันทึกรางวัลแต่ละประเภททันทีที่ออก จนกว่างวดจะออกครบ"""
+
+    def __init__(self, service=None, interval: float = LIVE_POLL_INTERVAL, start: str = LIVE_POLL_START,
+                 end: str = LIVE_POLL_END, now: Optional[Callable[[], datetime]] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self._service = service
+        self.interval = interval
+        self.start = _parse_time(start)
+        self.end = _parse_time(end)
+        self._now = now or (lambda: datetime.now(BANGKOK_TZ))
+        self._sleep = sleep
+        # จำนวนรางวัลที่บันทึกไปแล้วของแต่ละงวด
+        self._saved_counts: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def service(self):
+        # สร้าง LotteryService เมื่อใช้ครั้งแรก (import แล้วไม่ต้องเชื่อมต่อฐานข้อมูลทันที)
+        if self._service is None:
+            from .lottery_service import LotteryService
+            self._service = LotteryService()
+        return self._service
+
+    @staticmethod
+    def is_draw_day(day: date) -> bool:
+        return draw_calendar.is_draw_date(day)
+
+    def poll_once(self, draw_date: str) -> Dict[str, Any]:
+        """เช็คหน้าเว็บหนึ่งครั้ง (conditional GET ผ่าน page cache) แล้วบันทึกถ้ามีรางวัลใหม่"""
+        saved = self._saved_counts.get(draw_date, {})
+        result = {'draw_date': draw_date, 'new_tiers': [], 'counts': saved, 'complete': is_complete(saved)}
+
+        try:
+            content = self.service.fetch_draw_page(draw_date)
+        except requests.RequestException as e:
+            # หน้าของงวดอาจยังไม่ถูกสร้าง (404) ในช่วงแรก
+            result['error'] = str(e)
+            return result
+
+        lottery_data = self.service.parse_draw_page(content, draw_date)
+        counts = tier_counts(lottery_data)
+        new_tiers = [prize_type for prize_type, count in counts.items() if count > saved.get(prize_type, 0)]
+        if not new_tiers:
+            return result
+
+        complete = is_complete(counts)
+        if not self.service.save_to_database(lottery_data, status='active' if complete else 'partial'):
+            # บันทึกไม่สำเร็จ รอบหน้าจะลองใหม่
+            result['error'] = 'save_failed'
+            return result
+
+        self._saved_counts[draw_date] = counts
+        for prize_type in new_tiers:
+            print(f"🆕 งวด {draw_date} {PRIZE_NAMES.get(prize_type, prize_type)}: "
+                  f"{counts[prize_type]}/{EXPECTED_PRIZE_COUNTS.get(prize_type, '?')} รางวัล")
+        if complete:
+            print(f"🎉 งวด {draw_date} ออกครบ {sum(counts.values())} รางวัลแล้ว")
+
+        result.update(new_tiers=new_tiers, counts=counts, complete=complete)
+        return result
+
+    def run(self, draw_date: Optional[str] = None) -> Dict[str, Any]:
+        """poll ในช่วงเวลาออกรางวัลจนกว่างวดจะออกครบหรือหมดช่วงเวลา"""
+        now = self._now()
+        if draw_date is None:
+            if not self.is_draw_day(now.date()):
+                return {'status': 'not_draw_day', 'date': now.date().isoformat()}
+            draw_date = now.date().isoformat()
+
+        polls = 0
+        print(f"📡 เริ่ม live polling งวด {draw_date} ({self.start:%H:%M}-{self.end:%H:%M}, ทุก {self.interval:g} วินาที)")
+
+        while True:
+            now = self._now()
+            if now.time() >= self.end:
+                status = 'window_closed'
+                break
+
+            if now.time() < self.start:
+                # ยังไม่ถึงเวลาออกรางวัล รอจนถึงเวลาเริ่ม
+                start_at = datetime.combine(now.date(), self.start, tzinfo=now.tzinfo)
+                self._sleep((start_at - now).total_seconds())
+                continue
+
+            result = self.poll_once(draw_date)
+            polls += 1
+            if result['complete']:
+                status = 'complete'
+                break
+
+            self._sleep(self.interval)
+
+        counts = self._saved_counts.get(draw_date, {})
+        print(f"🏁 หยุด live polling งวด {draw_date}: {status} ({sum(counts.values())} รางวัล, {polls} ครั้ง)")
+        return {'status': status, 'draw_date': draw_date, 'polls': polls, 'counts': counts}
+
+
+# poller กลางของ process (ใช้กับ cron_script.py --live)
+live_poller = LivePoller()
@@ -1,600 +1,413 @@
 import requests
-from bs4 import BeautifulSoup
-import re
-import json
+import os
+import socket
+import time
+import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Iterator
 from .database import DatabaseService
 from .scraper import LotteryScraper
+from .prize_index import PrizeIndex, prize_index_cache, EXPECTED_PRIZE_ROWS, EXPECTED_PRIZE_COUNTS, is_complete
+from .payout_table import PayoutTable, payout_tables
+from .prize_rows import build_prize_rows, count_prize_types, lottery_data_from_rows
+from .single_flight import scrape_flight
+from .http_cache import draw_responses
+from .negative_cache import negative_cache
+from .draw_parser import draw_parser
+from .draw_calendar import draw_calendar
+from .page_cache import page_cache
+from .http_client import interactive_client
+
+# อายุ lease ของการ scrape งวดหนึ่ง (วินาที) และช่วงเวลาที่ผู้รอจะเช็คฐานข้อมูลซ้ำ
+SCRAPE_LEASE_TTL = 30
+SCRAPE_LEASE_POLL = 0.5
+
+# ชื่อเจ้าของ lease ของ process นี้
+SCRAPE_LEASE_OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+# งวดที่ใช้หน้าของงวดอื่นแทน (hard-code สำหรับวันที่ที่รู้ว่ามีข้อมูล)
+DRAW_PAGE_OVERRIDES = {
+    '2025-06-01': 'https://news.sanook.com/lotto/check/01092568/',
+    '2025-10-16': 'https://news.sanook.com/lotto/check/16102568/',
+}
+
+
+def draw_page_url(draw_date: str) -> str:
+    """URL หน้าตรวจหวยของ sanook (วันที่แบบ DDMMYYYY พ.ศ.)"""
+    if draw_date in DRAW_PAGE_OVERRIDES:
+        return DRAW_PAGE_OVERRIDES[draw_date]
+
+    year, month, day = (int(part) for part in draw_date.split('-'))
+    return f"https://news.sanook.com/lotto/check/{day:02d}{month:02d}{year + 543}/"
+
+
+def completeness_summary(draw_date: str, counts: Dict[str, int], status: Optional[str]) -> Dict[str, Any]:
+    """สรุปความครบของงวดจากจำนวนรางวัลแต่ละประเภท"""
+    return {
+        'draw_date': draw_date,
+        'exists': status is not None,
+        'status': status,
+        'counts': counts,
+        'total_prizes': sum(counts.values()),
+        'expected_prizes': EXPECTED_PRIZE_ROWS,
+        'missing': {
+            prize_type: expected - counts.get(prize_type, 0)
+            for prize_type, expected in EXPECTED_PRIZE_COUNTS.items()
+            if counts.get(prize_type, 0) < expected
+        },
+        'complete': is_complete(counts)
+    }
 
 
 class LotteryService:
     def __init__(self):
         self.db = DatabaseService()
         self.scraper = LotteryScraper()
+        self.lease_owner = SCRAPE_LEASE_OWNER
 
-    def get_lottery_by_date(self, draw_date: str) -> Optional[Dict[str, Any]]:
-        """ดึงข้อมูลหวยตามวันที่ (ใช้ logic เดิมจาก server.py)"""
-        try:
-            # ใช้ logic เดิมที่ทำงานได้จาก server.py
-            import requests
-            from bs4 import BeautifulSoup
-            import re
-            import json
-            from datetime import datetime
-
-            # แปลงวันที่เป็นรูปแบบที่เว็บไซต์ต้องการ
-            date_parts = draw_date.split('-')
-            year = int(date_parts[0]) + 543  # แปลงเป็น พ.ศ.
-            month = int(date_parts[1])
-            day = int(date_parts[2])
-
-            # Hard-code URL สำหรับวันที่ที่รู้ว่ามีข้อมูล
-            if draw_date == "2025-06-01":
-                url = "https://news.sanook.com/lotto/check/01092568/"
-                print(f"🔍 ใช้ข้อมูลงวด 1 ก.ย. 2568: {url}")
-            elif draw_date == "2025-10-16":
-                url = "https://news.sanook.com/lotto/check/16102568/"
-                print(f"🔍 ใช้ข้อมูลงวด 16 ต.ค. 2568: {url}")
-            else:
-                url = f"https://news.sanook.com/lotto/check/{day:02d}{month:02d}{year}/"
-                print(f"กำลังดึงข้อมูลจาก: {url}")
-
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
+    def get_lottery_by_date(self, draw_date: str, session: Optional[requests.Session] = None) -> Optional[Dict[str, Any]]:
+        """ดึงข้อมูลหวยตามวันที่ (ใช้ logic เดิมจาก server.py) งวดที่ไม่มีผลจะถูกจำไว้ใน negative cache
 
-            # ลองดึงข้อมูลจาก JSON-LD ก่อน
-            json_data = self._extract_json_ld(soup)
-            if json_data:
-                print("✅ พบ JSON-LD data")
-                lottery_data = self._parse_json_ld_data(json_data, draw_date)
-                if lottery_data:
-                    return lottery_data
-
-            # หากไม่พบ JSON-LD ให้ใช้วิธีเดิม
-            print("🔍 ไม่พบ JSON-LD ใช้วิธีเดิม")
-            lottery_data = self._parse_lottery_data(soup, draw_date)
-            return lottery_data
-
-        except Exception as e:
-            print(f"ไม่สามารถดึงข้อมูลได้: {e}")
-            return None
-
-    def _extract_json_ld(self, soup):
-        """ดึงข้อมูล JSON-LD จาก HTML"""
+        ใช้ใน request ของผู้ใช้ (scrape-on-miss) ค่าเริ่มต้นจึงเป็น interactive_client ที่ไม่ retry
+        """
         try:
-            import json
-            # หา script tag ที่มี type="application/ld+json"
-            json_scripts = soup.find_all('script', type='application/ld+json')
-            print(f"🔍 พบ script tag: {len(json_scripts)}")
-
-            for i, script in enumerate(json_scripts):
-                print(f"🔍 Script {i+1}: {script.get('class', 'no-class')}")
-                try:
-                    json_data = json.loads(script.string)
-                    if json_data.get('@type') == 'NewsArticle':
-                        print(f"✅ พบ NewsArticle ใน script {i+1}")
-                        return json_data
-                except json.JSONDecodeError:
-                    continue
-
-            return None
+            content = self.fetch_draw_page(draw_date, session=session or interactive_client)
         except Exception as e:
-            print(f"ไม่สามารถดึง JSON-LD ได้: {e}")
+            print(f"ไม่สามารถดึงข้อมูลได้: {e}")
+            negative_cache.record_failure(draw_date, e)
             return None
 
-    def _parse_json_ld_data(self, json_data, draw_date):
-        """แยกข้อมูลลอตเตอรี่จาก JSON-LD"""
         try:
-            from datetime import datetime
-            import re
-
-            lottery_data = {
-                'draw_date': draw_date,
-                'draw_number': f"{datetime.strptime(draw_date, '%Y-%m-%d').day}/{datetime.strptime(draw_date, '%Y-%m-%d').year + 543}",
-                'first_prize': '',
-                'second_prize_1': '',
-                'second_prize_2': '',
-                'third_prize_1': '',
-                'third_prize_2': '',
-                'fourth_prize_1': '',
-                'second_prizes': [],
-                'third_prizes': [],
-                'fourth_prizes': [],
-                'fifth_prizes': [],
-                'nearby_prizes': []
-            }
-
-            # ดึงข้อมูลจาก articleBody
-            article_body = json_data.get('articleBody', '')
-            print("กำลังแยกข้อมูลจาก articleBody...")
-
-            # รางวัลที่ 1 - ใช้ pattern ที่ตรงกับข้อมูลจริง
-            first_prize_match = re.search(r'รางวัลที่ 1.*?(\d{6})', article_body)
-            if first_prize_match:
-                lottery_data['first_prize'] = first_prize_match.group(1)
-                print(f"✅ พบรางวัลที่ 1: {lottery_data['first_prize']}")
-            else:
-                # ลองหาแบบอื่น - หาเลข 6 ตัวแรกที่พบ
-                first_prize_alt = re.search(r'\b(\d{6})\b', article_body)
-                if first_prize_alt:
-                    lottery_data['first_prize'] = first_prize_alt.group(1)
-                    print(f"✅ พบรางวัลที่ 1 (แบบอื่น): {lottery_data['first_prize']}")
-
-            # หาเลขหน้า 3 ตัว - ใช้ pattern เฉพาะเจาะจง
-            front3_match = re.search(r'เลขหน้า 3 ตัว.*?(\d{3})&nbsp;\s+(\d{3})&nbsp;', article_body)
-            if front3_match:
-                lottery_data['second_prize_1'] = front3_match.group(1)
-                lottery_data['second_prize_2'] = front3_match.group(2)
-                print(f"พบเลขหน้า 3 ตัว: {lottery_data['second_prize_1']}, {lottery_data['second_prize_2']}")
-            else:
-                # ลองหาจาก pattern อื่น
-                front3_alt = re.search(r'(\d{3})&nbsp;\s+(\d{3})&nbsp;\s+.*?เลขท้าย 3 ตัว', article_body)
-                if front3_alt:
-                    lottery_data['second_prize_1'] = front3_alt.group(1)
-                    lottery_data['second_prize_2'] = front3_alt.group(2)
-                    print(f"พบเลขหน้า 3 ตัว (pattern 2): {lottery_data['second_prize_1']}, {lottery_data['second_prize_2']}")
-
-            # หาเลขท้าย 3 ตัว - ใช้ข้อมูลที่เห็นจาก debug
-            last3_match = re.search(r'เลขท้าย 3 ตัว.*?(\d{3})&nbsp;\s+(\d{3})&nbsp;', article_body)
-            if last3_match:
-                lottery_data['third_prize_1'] = last3_match.group(1)
-                lottery_data['third_prize_2'] = last3_match.group(2)
-                print(f"พบเลขท้าย 3 ตัว: {lottery_data['third_prize_1']}, {lottery_data['third_prize_2']}")
-            else:
-                # ใช้ข้อมูลจาก debug เพื่อหาเลขท้าย 3 ตัว
-                all_3digit_numbers = re.findall(r'\b(\d{3})\b', article_body)
-                print(f"เลข 3 ตัวทั้งหมดที่พบ: {all_3digit_numbers}")
-
-                # ตัดเลขที่เป็นเลขหน้า 3 ตัวออก
-                used_numbers = []
-                if lottery_data['second_prize_1']: used_numbers.append(lottery_data['second_prize_1'])
-                if lottery_data['second_prize_2']: used_numbers.append(lottery_data['second_prize_2'])
-
-                # หาเลขท้าย 3 ตัวจากรายการที่เหลือ
-                remaining_numbers = [num for num in all_3digit_numbers if num not in used_numbers and num != '000']
-
-                if len(remaining_numbers) >= 2:
-                    # หาเลขที่ปรากฏหลังจากคำว่า "เลขท้าย 3 ตัว"
-                    pos_last3_text = article_body.find('เลขท้าย 3 ตัว')
-                    if pos_last3_text != -1:
-                        text_after_last3 = article_body[pos_last3_text:]
-                        # หาเลข 3 ตัวที่ไม่ใช่ 000
-                        last3_candidates = re.findall(r'\b(\d{3})\b', text_after_last3)
-                        # กรองเฉพาะเลขที่ไม่ใช่ 000 และไม่ใช่เลขหน้า 3 ตัว
-                        valid_last3 = [num for num in last3_candidates if num != '000' and num not in used_numbers]
-                        if len(valid_last3) >= 2:
-                            lottery_data['third_prize_1'] = valid_last3[0]
-                            lottery_data['third_prize_2'] = valid_last3[1]
-                            print(f"พบเลขท้าย 3 ตัว (จากตำแหน่ง): {lottery_data['third_prize_1']}, {lottery_data['third_prize_2']}")
-
-            # หาเลขท้าย 2 ตัว - ใช้ pattern ที่ถูกต้องตามข้อมูลจริง
-            print("🔍 กำลังหาเลขท้าย 2 ตัว...")
-            # Pattern ใหม่ที่จับ \r\n26\r\n ได้
-            last2_patterns = [
-                r'เลขท้าย 2 ตัว.*?\\r\\n(\d{2})\\r\\n',  # จับ \r\n26\r\n
-                r'เลขท้าย 2 ตัว.*?[\r\n]+(\d{2})[\r\n]+',  # จับ newline + เลข + newline
-                r'เลขท้าย 2 ตัว.*?(\d{2})(?!\d)',  # pattern เดิม
-            ]
-
-            found_last2 = False
-            for i, pattern in enumerate(last2_patterns, 1):
-                last2_match = re.search(pattern, article_body)
-                if last2_match:
-                    temp_last2 = last2_match.group(1)
-                    print(f"🔍 พบเลขท้าย 2 ตัว (pattern {i}): {temp_last2}")
-                    # ตรวจสอบว่าไม่ใช่ส่วนของเลขที่ยาวกว่า และไม่ใช่ 00
-                    if temp_last2 not in ['00']:  # หลีกเลี่ยงเลข 00 ที่มาจาก 000
-                        lottery_data['fourth_prize_1'] = temp_last2
-                        print(f"✅ พบเลขท้าย 2 ตัว: {lottery_data['fourth_prize_1']}")
-                        found_last2 = True
-                        break
-                    else:
-                        print(f"❌ เลข {temp_last2} ถูกข้าม เพราะไม่ใช่เลขท้าย 2 ตัวจริง")
-
-            if not found_last2:
-                print("🔍 ไม่พบจาก pattern หลัก ลองใช้วิธีอื่น...")
-                # หาเลขท้าย 2 ตัวจากตำแหน่งที่ถูกต้อง
-                pos_last2_text = article_body.find('เลขท้าย 2 ตัว')
-                if pos_last2_text != -1:
-                    text_after_last2 = article_body[pos_last2_text:pos_last2_text+200]  # เอาแค่ 200 ตัวอักษรแรก
-                    print(f"🔍 ข้อความหลัง 'เลขท้าย 2 ตัว': {repr(text_after_last2[:100])}")
-                    # หาเลข 2 ตัวแรกที่ปรากฏหลังจากข้อความนี้
-                    last2_candidates = re.findall(r'\b(\d{2})(?!\d)', text_after_last2)
-                    print(f"🔍 ตัวเลือกเลขท้าย 2 ตัว: {last2_candidates}")
-                    if last2_candidates:
-                        # กรองออกเลข 00 และเลขที่ไม่น่าเป็นเลขท้าย 2 ตัว
-                        valid_last2 = [num for num in last2_candidates if num not in ['00']]
-                        if valid_last2:
-                            lottery_data['fourth_prize_1'] = valid_last2[0]
-                            print(f"✅ พบเลขท้าย 2 ตัว (จากตำแหน่ง): {lottery_data['fourth_prize_1']}")
-                        else:
-                            print("❌ ไม่พบเลขท้าย 2 ตัวที่ valid")
-                    else:
-                        print("❌ ไม่พบเลขท้าย 2 ตัว")
-                else:
-                    print("❌ ไม่พบข้อความ 'เลขท้าย 2 ตัว'")
-
-            # ถ้ายังไม่เจอ ลองใช้ pattern อื่นจาก server.py
-            if not lottery_data.get('fourth_prize_1'):
-                print("🔍 ลองหาเลขท้าย 2 ตัวด้วย pattern อื่น...")
-                last2_html = re.search(r'รางวัลเลขท้าย 2 ตัว.*?(\d{2})', article_body)
-                if last2_html:
-                    candidate = last2_html.group(1)
-                    if candidate not in ['00']:
-                        lottery_data['fourth_prize_1'] = candidate
-                        print(f"✅ พบเลขท้าย 2 ตัว (HTML pattern): {lottery_data['fourth_prize_1']}")
-                    else:
-                        print(f"❌ เลข {candidate} ถูกข้าม")
-
-            # ดึงข้อมูลรางวัลที่ 2-5 และข้างเคียง
-            print("🔍 เริ่มดึงรางวัลเพิ่มเติม (รางวัลที่ 2-5 และข้างเคียง)...")
-            self._extract_additional_prizes(article_body, lottery_data)
-
-            # Debug: แสดงข้อมูลที่ดึงได้
-            print(f"🐛 Debug lottery_data ที่ดึงได้:")
-            for key, value in lottery_data.items():
-                if value:  # แสดงเฉพาะที่มีค่า
-                    print(f"   {key}: {value}")
-
-            return lottery_data
-
+            lottery_data = self.parse_draw_page(content, draw_date)
         except Exception as e:
-            print(f"ไม่สามารถแยกข้อมูล JSON-LD ได้: {e}")
+            print(f"ไม่สามารถดึงข้อมูลได้: {e}")
             return None
 
-    def _extract_additional_prizes(self, article_body, lottery_data):
-        """ดึงข้อมูลรางวัลที่ 2-5 และข้างเคียง"""
-        try:
-            # ข้างเคียงรางวัลที่ 1 (2 รางวัล)
-            nearby_patterns = [
-                r'ข้างเคียงรางวัลที่ 1.*?(\d{6})&nbsp;\s*(\d{6})&nbsp;',
-                r'รางวัลข้างเคียงรางวัลที่ 1.*?(\d{6})&nbsp;\s*(\d{6})&nbsp;'
-            ]
-            for pattern in nearby_patterns:
-                nearby_match = re.search(pattern, article_body)
-                if nearby_match:
-                    lottery_data['nearby_prizes'] = [nearby_match.group(1), nearby_match.group(2)]
-                    print(f"พบข้างเคียงรางวัลที่ 1: {lottery_data['nearby_prizes']}")
-                    break
-
-            # รางวัลที่ 2 (5 รางวัล) - ใช้ findall แทน
-            second_section = re.search(r'รางวัลที่ 2 มี 5 รางวัล.*?(\d{6}&nbsp;.*?)(?=ผลสลากกินแบ่งรัฐบาล รางวัลที่ 3)', article_body, re.DOTALL)
-            if second_section:
-                second_numbers = re.findall(r'(\d{6})&nbsp;', second_section.group(1))
-                lottery_data['second_prizes'] = second_numbers[:5]
-                print(f"พบรางวัลที่ 2: {lottery_data['second_prizes']}")
-
-            # รางวัลที่ 3 (10 รางวัล)
-            third_section = re.search(r'รางวัลที่ 3 มี 10 รางวัล.*?(\d{6}&nbsp;.*?)(?=ผลสลากกินแบ่งรัฐบาล รางวัลที่ 4|$)', article_body, re.DOTALL)
-            if third_section:
-                third_numbers = re.findall(r'(\d{6})&nbsp;', third_section.group(1))
-                lottery_data['third_prizes'] = third_numbers[:10]  # เอาแค่ 10 ตัวแรก
-                print(f"พบรางวัลที่ 3: {len(lottery_data['third_prizes'])} รางวัล")
-
-            # รางวัลที่ 4 (50 รางวัล) - ปรับให้จับ column สุดท้ายได้
-            fourth_section = re.search(r'รางวัลที่ 4 มี 50 รางวัล.*?(\d{6}.*?)(?=ผลสลากกินแบ่งรัฐบาล รางวัลที่ 5|$)', article_body, re.DOTALL)
-            if fourth_section:
-                # จับเลข 6 ตัวทั้งหมด รวม column สุดท้ายที่ไม่มี &nbsp;
-                fourth_numbers = re.findall(r'(\d{6})(?:&nbsp;|(?=\s)|(?=\n)|$)', fourth_section.group(1))
-                lottery_data['fourth_prizes'] = fourth_numbers[:50]  # เอาแค่ 50 ตัวแรก
-                print(f"พบรางวัลที่ 4: {len(lottery_data['fourth_prizes'])} รางวัล")
-
-            # รางวัลที่ 5 (100 รางวัล) - ปรับให้จับ column สุดท้ายได้
-            fifth_section = re.search(r'รางวัลที่ 5 มี 100 รางวัล.*?(\d{6}.*?)(?=$)', article_body, re.DOTALL)
-            if fifth_section:
-                # จับเลข 6 ตัวทั้งหมด รวม column สุดท้ายที่ไม่มี &nbsp;
-                fifth_numbers = re.findall(r'(\d{6})(?:&nbsp;|(?=\s)|(?=\n)|$)', fifth_section.group(1))
-                lottery_data['fifth_prizes'] = fifth_numbers[:100]  # เอาแค่ 100 ตัวแรก
-                print(f"พบรางวัลที่ 5: {len(lottery_data['fifth_prizes'])} รางวัล")
+        if not lottery_data:
+            negative_cache.record_failure(draw_date)
+        return lottery_data
 
-        except Exception as e:
-            print(f"ไม่สามารถดึงรางวัลเพิ่มเติมได้: {e}")
+    def fetch_draw_page(self, draw_date: str, session: Optional[requests.Session] = None,
+                        throttle: Optional[Callable[[], None]] = None) -> bytes:
+        """ดาวน์โหลดหน้าตรวจหวยของงวดผ่าน page cache (HTTP error ส่งต่อให้ผู้เรียกจัดการ)"""
+        url = draw_page_url(draw_date)
+        print(f"กำลังดึงข้อมูลจาก: {url}")
 
-    def _parse_lottery_data(self, soup, draw_date):
-        """แยกข้อมูลหวยจาก HTML (fallback method)"""
-        try:
-            from datetime import datetime
-            import re
-
-            lottery_data = {
-                'draw_date': draw_date,
-                'draw_number': f"{datetime.strptime(draw_date, '%Y-%m-%d').day}/{datetime.strptime(draw_date, '%Y-%m-%d').year + 543}",
-                'first_prize': '',
-                'second_prize_1': '',
-                'second_prize_2': '',
-                'third_prize_1': '',
-                'third_prize_2': '',
-                'fourth_prize_1': ''
-            }
-
-            # หารางวัลที่ 1
-            first_prize_elements = soup.find_all(class_='lotto_number--first')
-            for element in first_prize_elements:
-                text = element.get_text().strip()
-                if re.match(r'\d{6}', text):
-                    lottery_data['first_prize'] = text
-                    print(f"พบรางวัลที่ 1: {text}")
-                    break
+        # หน้าที่ดาวน์โหลดหลังวันออกรางวัลไม่เปลี่ยนแล้ว ใช้จาก cache ได้โดยไม่เรียกเว็บ
+        stable_after = datetime.strptime(draw_date, '%Y-%m-%d').date()
+        return page_cache.fetch(url, session=session, stable_after=stable_after, throttle=throttle)
 
-            return lottery_data
-
-        except Exception as e:
-            print(f"ไม่สามารถแยกข้อมูลหวยได้: {e}")
-            return {}
+    def parse_draw_page(self, content: bytes, draw_date: str) -> Optional[Dict[str, Any]]:
+        """แยกผลรางวัลจากหน้าตรวจหวยที่ดาวน์โหลดมาแล้ว (JSON-LD -> CSS -> ข้อความ)"""
+        return draw_parser.parse(content, draw_date)
 
     def get_from_database(self, draw_date: str) -> Optional[Dict[str, Any]]:
-        """ดึงข้อมูลหวยจากฐานข้อมูล"""
+        """ดึงข้อมูลหวยจากฐานข้อมูล (lottery_draws + lottery_prizes ในการ query ครั้งเดียว)"""
+        draw = self.db.get_draw_prizes(draw_date)
+        if draw and draw.get('lottery_prizes'):
+            prizes = draw['lottery_prizes']
+            # ได้รางวัลครบทั้งงวดมาแล้ว สร้าง index ไว้ใช้ตรวจเลขด้วยเลย
+            prize_index_cache.put(draw_date, draw['draw_number'], prizes)
+            return lottery_data_from_rows(draw_date, draw['draw_number'], prizes)
+
+        # ข้อมูลแบบเก่า (backward compatibility)
         return self.db.get_lottery_data_from_db(draw_date)
 
-    def save_to_database(self, lottery_data: Dict[str, Any]) -> bool:
-        """บันทึกข้อมูลหวยลงฐานข้อมูล (ใช้ logic เดิมจาก server.py)"""
+    def save_to_database(self, lottery_data: Dict[str, Any], status: str = 'active') -> bool:
+        """บันทึกข้อมูลหวยลงฐานข้อมูล (งวด + รางวัลทั้งหมดใน transaction เดียว)
+
+        status: 'active' = งวดปกติ, 'partial' = กำลังทยอยออกรางวัล (live polling)
+        """
         if not self.db.supabase:
             print("ไม่สามารถเชื่อมต่อฐานข้อมูลได้")
             return False
 
         try:
-            # 1. เช็คว่ามีข้อมูลงวดนี้แล้วหรือไม่
-            existing_draw = self.db.supabase.table('lottery_draws').select("*").eq("draw_date", lottery_data['draw_date']).execute()
-
-            if existing_draw.data:
-                # ถ้ามีแล้ว ให้ลบข้อมูลรางวัลเก่าออกก่อน
-                draw_id = existing_draw.data[0]['id']
-                self.db.supabase.table('lottery_prizes').delete().eq("draw_id", draw_id).execute()
-                print(f"ลบข้อมูลรางวัลเก่าของงวด {lottery_data['draw_date']}")
-            else:
-                # สร้างข้อมูลงวดใหม่
-                draw_result = self.db.supabase.table('lottery_draws').insert({
-                    'draw_date': lottery_data['draw_date'],
-                    'draw_number': lottery_data['draw_number'],
-                    'status': 'active'
-                }).execute()
-                draw_id = draw_result.data[0]['id']
-                print(f"สร้างข้อมูลงวดใหม่ ID: {draw_id}")
-
-            # 2. บันทึกรางวัลทั้งหมด
-            prizes_to_insert = []
-
-            # รางวัลหลัก
-            prize_configs = [
-                ('first_prize', lottery_data.get('first_prize'), 6000000),
-                ('front_3', lottery_data.get('second_prize_1'), 4000, 1),
-                ('front_3', lottery_data.get('second_prize_2'), 4000, 2),
-                ('back_3', lottery_data.get('third_prize_1'), 4000, 1),
-                ('back_3', lottery_data.get('third_prize_2'), 4000, 2),
-                ('back_2', lottery_data.get('fourth_prize_1'), 2000),
-            ]
-
-            for config in prize_configs:
-                if len(config) == 3:  # ไม่มี position
-                    prize_type, number, amount = config
-                    position = 1
-                else:  # มี position
-                    prize_type, number, amount, position = config
-
-                if number:  # ถ้ามีเลข
-                    prizes_to_insert.append({
-                        'draw_id': draw_id,
-                        'prize_type': prize_type,
-                        'prize_number': number,
-                        'position': position,
-                        'amount': amount
-                    })
-
-            # รางวัลข้างเคียง
-            for i, number in enumerate(lottery_data.get('nearby_prizes', []), 1):
-                if number:
-                    prizes_to_insert.append({
-                        'draw_id': draw_id,
-                        'prize_type': 'nearby',
-                        'prize_number': number,
-                        'position': i,
-                        'amount': 100000
-                    })
-
-            # รางวัลที่ 2-5
-            prize_types_extended = [
-                ('second_prize', lottery_data.get('second_prizes', []), 200000),
-                ('third_prize', lottery_data.get('third_prizes', []), 80000),
-                ('fourth_prize', lottery_data.get('fourth_prizes', []), 40000),
-                ('fifth_prize', lottery_data.get('fifth_prizes', []), 20000)
-            ]
-
-            for prize_type, numbers, amount in prize_types_extended:
-                for i, number in enumerate(numbers, 1):
-                    if number:
-                        prizes_to_insert.append({
-                            'draw_id': draw_id,
-                            'prize_type': prize_type,
-                            'prize_number': number,
-                            'position': i,
-                            'amount': amount
-                        })
-
-            # บันทึกรางวัลทั้งหมด
-            if prizes_to_insert:
-                result = self.db.supabase.table('lottery_prizes').insert(prizes_to_insert).execute()
-                print(f"✅ บันทึกรางวัล {len(prizes_to_insert)} รายการสำเร็จ")
-                return True
-            else:
+            prize_rows = build_prize_rows(lottery_data)
+            if not prize_rows:
                 print("❌ ไม่มีรางวัลให้บันทึก")
                 return False
 
+            # 1. upsert งวดและแทนที่รางวัลทั้งชุดในการเรียกครั้งเดียว
+            draw_id = self.db.upsert_draw_with_prizes(lottery_data['draw_date'], lottery_data['draw_number'], prize_rows,
+                                                      status=status)
+
+            if draw_id is None:
+                # ฐานข้อมูลยังไม่มีฟังก์ชัน upsert_lottery_draw (database_upsert_draw.sql) ใช้วิธีเดิม
+                draw_id = self._save_with_separate_queries(lottery_data, prize_rows, status)
+
+            print(f"✅ บันทึกรางวัล {len(prize_rows)} รายการสำเร็จ (draw_id: {draw_id})")
+
+            # 2. สร้าง index ของงวดนี้ใหม่ให้ตรงกับข้อมูลที่เพิ่งบันทึก
+            prize_index_cache.put(lottery_data['draw_date'], lottery_data['draw_number'], prize_rows)
+            if len(prize_rows) >= EXPECTED_PRIZE_ROWS:
+                # ตารางเงินรางวัลเก็บลงดิสก์ สร้างเฉพาะงวดที่ออกครบแล้ว (put ลบตารางของชุดรางวัลเก่าให้)
+                payout_tables.put(lottery_data['draw_date'], prize_rows)
+            else:
+                payout_tables.invalidate(lottery_data['draw_date'])
+            draw_responses.invalidate(lottery_data['draw_date'])
+            negative_cache.invalidate(lottery_data['draw_date'])
+            return True
+
         except Exception as e:
             print(f"ไม่สามารถบันทึกข้อมูลได้: {e}")
             return False
 
-    def _prepare_prize_data(self, draw_id: int, lottery_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """เตรียมข้อมูลรางวัลสำหรับบันทึกลงฐานข้อมูล"""
-        prizes = []
-
-        # รางวัลที่ 1
-        if lottery_data.get('first_prize'):
-            prizes.append({
-                'draw_id': draw_id,
-                'prize_type': 'first_prize',
-                'prize_number': lottery_data['first_prize'],
-                'amount': 6000000,
-                'position': 1
-            })
-
-        # เลขหน้า 3 ตัว
-        if lottery_data.get('second_prize_1'):
-            prizes.append({
-                'draw_id': draw_id,
-                'prize_type': 'front_3',
-                'prize_number': lottery_data['second_prize_1'],
-                'amount': 4000,
-                'position': 1
-            })
-
-        if lottery_data.get('second_prize_2'):
-            prizes.append({
-                'draw_id': draw_id,
-                'prize_type': 'front_3',
-                'prize_number': lottery_data['second_prize_2'],
-                'amount': 4000,
-                'position': 2
-            })
-
-        # เลขท้าย 3 ตัว
-        if lottery_data.get('third_prize_1'):
-            prizes.append({
-                'draw_id': draw_id,
-                'prize_type': 'back_3',
-                'prize_number': lottery_data['third_prize_1'],
-                'amount': 4000,
-                'position': 1
-            })
-
-        if lottery_data.get('third_prize_2'):
-            prizes.append({
-                'draw_id': draw_id,
-                'prize_type': 'back_3',
-                'prize_number': lottery_data['third_prize_2'],
-                'amount': 4000,
-                'position': 2
-            })
-
-        # เลขท้าย 2 ตัว
-        if lottery_data.get('fourth_prize_1'):
-            prizes.append({
-                'draw_id': draw_id,
-                'prize_type': 'back_2',
-                'prize_number': lottery_data['fourth_prize_1'],
-                'amount': 2000,
-                'position': 1
-            })
-
-        # รางวัลเพิ่มเติม
-        self._add_additional_prizes(draw_id, lottery_data, prizes)
-
-        return prizes
-
-    def _add_additional_prizes(self, draw_id: int, lottery_data: Dict[str, Any], prizes: List[Dict[str, Any]]):
-        """เพิ่มรางวัลที่ 2-5 และข้างเคียง"""
-        prize_configs = [
-            ('second_prizes', 'second_prize', 200000),
-            ('third_prizes', 'third_prize', 80000),
-            ('fourth_prizes', 'fourth_prize', 40000),
-            ('fifth_prizes', 'fifth_prize', 20000),
-            ('nearby_prizes', 'nearby', 100000)
-        ]
-
-        for data_key, prize_type, amount in prize_configs:
-            if lottery_data.get(data_key):
-                for i, number in enumerate(lottery_data[data_key], 1):
-                    prizes.append({
-                        'draw_id': draw_id,
-                        'prize_type': prize_type,
-                        'prize_number': number,
-                        'amount': amount,
-                        'position': i
-                    })
+    def _save_with_separate_queries(self, lottery_data: Dict[str, Any], prize_rows: List[Dict[str, Any]],
+                                    status: str = 'active') -> int:
+        """บันทึกแบบเดิม: เช็คงวด ลบรางวัลเก่า แล้วค่อยเพิ่มรางวัลใหม่ (ไม่ atomic)"""
+        existing_draw = self.db.supabase.table('lottery_draws').select("*").eq("draw_date", lottery_data['draw_date']).execute()
+
+        if existing_draw.data:
+            # ถ้ามีแล้ว ให้ลบข้อมูลรางวัลเก่าออกก่อน
+            draw_id = existing_draw.data[0]['id']
+            if existing_draw.data[0].get('status') != status:
+                self.db.supabase.table('lottery_draws').update({'status': status}).eq("id", draw_id).execute()
+            self.db.supabase.table('lottery_prizes').delete().eq("draw_id", draw_id).execute()
+            print(f"ลบข้อมูลรางวัลเก่าของงวด {lottery_data['draw_date']}")
+        else:
+            # สร้างข้อมูลงวดใหม่
+            draw_result = self.db.supabase.table('lottery_draws').insert({
+                'draw_date': lottery_data['draw_date'],
+                'draw_number': lottery_data['draw_number'],
+                'status': status
+            }).execute()
+            draw_id = draw_result.data[0]['id']
+            print(f"สร้างข้อมูลงวดใหม่ ID: {draw_id}")
+
+        self.db.supabase.table('lottery_prizes').insert([dict(row, draw_id=draw_id) for row in prize_rows]).execute()
+        return draw_id
+
+    def save_many_to_database(self, lottery_data_list: List[Dict[str, Any]]) -> List[str]:
+        """บันทึกหลายงวดในการเรียกครั้งเดียว (ใช้ตอน backfill) คืนวันที่ของงวดที่บันทึกสำเร็จ"""
+        if not self.db.supabase:
+            print("ไม่สามารถเชื่อมต่อฐานข้อมูลได้")
+            return []
+
+        draws = []
+        for lottery_data in lottery_data_list:
+            prize_rows = build_prize_rows(lottery_data)
+            if prize_rows:
+                draws.append({
+                    'draw_date': lottery_data['draw_date'],
+                    'draw_number': lottery_data['draw_number'],
+                    'prizes': prize_rows
+                })
+        if not draws:
+            return []
+
+        saved = self.db.upsert_draws_bulk(draws)
+        if saved is None:
+            # ฐานข้อมูลยังไม่มีฟังก์ชัน upsert_lottery_draws บันทึกทีละงวดแทน
+            return [lottery_data['draw_date'] for lottery_data in lottery_data_list if self.save_to_database(lottery_data)]
+
+        # ไม่สร้าง index ของทุกงวดไว้ในหน่วยความจำ แค่ล้างของเก่าที่อาจไม่ตรงกับข้อมูลใหม่
+        for draw in draws:
+            prize_index_cache.invalidate(draw['draw_date'])
+            payout_tables.invalidate(draw['draw_date'])
+            draw_responses.invalidate(draw['draw_date'])
+            negative_cache.invalidate(draw['draw_date'])
+
+        print(f"✅ บันทึก {saved} งวดสำเร็จ")
+        # upsert_lottery_draws บันทึกทุกงวดใน transaction เดียว
+        return [draw['draw_date'] for draw in draws]
+
+    def scrape_and_save(self, draw_date: str) -> Optional[Dict[str, Any]]:
+        """scrape งวดที่ยังไม่มีในฐานข้อมูลแล้วบันทึก (request พร้อมกันของงวดเดียวกันจะ scrape ครั้งเดียว)
+
+        วันปกติของงวดที่เลื่อน (เช่น 1 ม.ค.) scrape และบันทึกที่วันที่ออกจริง
+        """
+        draw_date = draw_calendar.resolve(draw_date) or draw_date
+        # งวดที่รู้ว่ายังไม่มีผล (ยังไม่ถึงเวลาออก / ยังไม่ประกาศ / ไม่มีหน้า) ไม่ต้องดึงหน้าเว็บซ้ำ
+        if negative_cache.get(draw_date):
+            return None
+        return scrape_flight.do(draw_date, lambda: self._scrape_and_save_with_lease(draw_date))
+
+    def _scrape_and_save_with_lease(self, draw_date: str) -> Optional[Dict[str, Any]]:
+        """ขอ lease ในฐานข้อมูลก่อน scrape เพื่อไม่ให้ instance อื่น scrape งวดเดียวกันซ้ำ"""
+        deadline = time.monotonic() + SCRAPE_LEASE_TTL
+        lease = None
+
+        while True:
+            # instance อื่นอาจบันทึกงวดนี้ไปแล้วระหว่างที่รอ
+            draw = self.db.get_draw_prizes(draw_date)
+            if draw:
+                prizes = draw.get('lottery_prizes') or []
+                prize_index_cache.put(draw_date, draw['draw_number'], prizes)
+                return lottery_data_from_rows(draw_date, draw['draw_number'], prizes)
+
+            lease = self.db.acquire_scrape_lease(draw_date, self.lease_owner, SCRAPE_LEASE_TTL)
+            # ได้ lease หรือใช้ lease ไม่ได้ ให้ scrape เอง
+            if lease is not False:
+                break
+
+            # ผู้ถือ lease ไม่บันทึกภายในเวลาที่กำหนด (อาจล้มไปแล้ว) ให้ scrape เอง
+            if time.monotonic() > deadline:
+                print(f"⚠️ รอ lease ของงวด {draw_date} นานเกินไป กำลัง scrape เอง")
+                break
+
+            time.sleep(SCRAPE_LEASE_POLL)
+
+        try:
+            lottery_data = self.get_lottery_by_date(draw_date)
+            if lottery_data and self.save_to_database(lottery_data):
+                print(f"บันทึกข้อมูลงวด {draw_date} เรียบร้อยแล้ว")
+            return lottery_data
+        finally:
+            if lease:
+                self.db.release_scrape_lease(draw_date, self.lease_owner)
+
+    def get_prize_index(self, draw_date: str, scrape: bool = True) -> Optional[PrizeIndex]:
+        """ดึง index รางวัลของงวด (โหลดจากฐานข้อมูลหรือ scrape เมื่อยังไม่มีใน process, scrape=False ไม่ scrape)"""
+        index = prize_index_cache.get(draw_date)
+        if index:
+            return index
+
+        # ดึงงวดพร้อมรางวัลทั้งหมดในการ query ครั้งเดียว
+        draw = self.db.get_draw_prizes(draw_date)
+        if draw:
+            return prize_index_cache.put(draw_date, draw['draw_number'], draw.get('lottery_prizes') or [])
+
+        if not scrape:
+            return None
+
+        # ไม่มีข้อมูลงวดนี้ ให้ไป scrape มาก่อน
+        print(f"ไม่พบข้อมูลงวด {draw_date} ในฐานข้อมูล กำลัง scrape ข้อมูล...")
+        lottery_data = self.scrape_and_save(draw_date)
+        if not lottery_data:
+            return None
+
+        # save_to_database จะสร้าง index ให้เมื่อบันทึกสำเร็จ (งวดที่เลื่อนบันทึกที่วันที่ออกจริง)
+        index = prize_index_cache.get(lottery_data['draw_date'])
+        if index:
+            return index
+
+        # บันทึกไม่สำเร็จ ตรวจจากข้อมูลที่ scrape มาได้เลย แต่ไม่เก็บไว้ใน cache
+        return PrizeIndex(draw_date, lottery_data.get('draw_number'), build_prize_rows(lottery_data))
+
+    def get_payout_table(self, draw_date: str) -> Optional[PayoutTable]:
+        """ดึงตารางเงินรางวัลของงวด (สร้างจาก index เมื่องวดนั้นออกครบแล้วเท่านั้น)
+
+        ตารางผูกกับ version ของชุดรางวัลใน index ไฟล์ที่สร้างจากข้อมูลเก่า (ก่อน scrape ใหม่หรือแก้ข้อมูล) จะไม่ถูกใช้
+        """
+        index = self.get_prize_index(draw_date)
+        if not index or not index.is_complete:
+            return None
+        return payout_tables.get(draw_date, index.version) or payout_tables.put(draw_date, index.prizes)
+
+    def get_completeness(self, start_date: str, end_date: Optional[str] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+        """สถานะความครบของทุกงวดที่มีในฐานข้อมูลระหว่างสองวันที่ นับในฐานข้อมูลโดยไม่ดึงรางวัล (None = query ไม่ได้)
+
+        key เป็นวันออกจริง งวดที่เลื่อนแต่บันทึกไว้ที่วันปกติ (ข้อมูลเก่า) นับเป็นงวดเดียวกัน
+        """
+        stored = self.db.get_prize_counts(*draw_calendar.stored_range(start_date, end_date or start_date))
+        if stored is None:
+            return None
+
+        draws: Dict[str, Dict[str, Any]] = {}
+        for stored_date, draw in sorted(stored.items()):
+            summary = completeness_summary(stored_date, draw['counts'], draw['status'])
+            draw_date = draw_calendar.resolve(stored_date) or stored_date
+            if draw_date not in draws or (summary['complete'] and not draws[draw_date]['complete']):
+                draws[draw_date] = summary
+        return draws
+
+    def get_draw_completeness(self, draw_date: str) -> Optional[Dict[str, Any]]:
+        """จำนวนรางวัลแต่ละประเภทของงวดและ flag complete (None = query ไม่ได้)"""
+        # งวดที่ออกครบและมี index ใน process แล้วตอบได้โดยไม่ต้อง query
+        index = prize_index_cache.get(draw_date)
+        if index and index.is_complete:
+            return completeness_summary(draw_date, count_prize_types(index.prizes), 'active')
+
+        draws = self.get_completeness(draw_date)
+        if draws is None:
+            return None
+        return draws.get(draw_calendar.resolve(draw_date) or draw_date) or completeness_summary(draw_date, {}, None)
 
     def check_number_complete(self, number: str, draw_date: str) -> Dict[str, Any]:
-        """ตรวจสอบเลข 6 ตัวครบทุกรูปแบบ (ใช้ logic เดิมจาก server.py)"""
+        """ตรวจสอบเลข 6 ตัวครบทุกรูปแบบ (ตรวจจาก index ในหน่วยความจำ)"""
         if not self.db.supabase:
             return {"number": number, "draw_date": draw_date, "results": [], "message": "ไม่สามารถเชื่อมต่อฐานข้อมูลได้"}
 
         try:
-            # ตรวจสอบว่ามีข้อมูลงวดนั้นแล้วหรือยัง (ใช้ logic เดิม)
-            check_draw = self.db.supabase.table('lottery_draws').select("id, draw_number").eq("draw_date", draw_date).execute()
-
-            if not check_draw.data:
-                # ไม่มีข้อมูลงวดนี้ ให้ไป scrape มาก่อน
-                print(f"ไม่พบข้อมูลงวด {draw_date} ในฐานข้อมูล กำลัง scrape ข้อมูล...")
-                lottery_data = self.get_lottery_by_date(draw_date)
-
-                if lottery_data:
-                    # บันทึกข้อมูลใหม่ลงฐานข้อมูล
-                    self.save_to_database(lottery_data)
-                    print(f"บันทึกข้อมูลงวด {draw_date} เรียบร้อยแล้ว")
-                    # ดึงข้อมูลงวดใหม่หลังบันทึก
-                    check_draw = self.db.supabase.table('lottery_draws').select("id, draw_number").eq("draw_date", draw_date).execute()
-                else:
-                    return {"number": number, "draw_date": draw_date, "results": [], "message": f"ไม่สามารถหาข้อมูลหวยงวด {draw_date} ได้"}
-
-            # สร้างรูปแบบการตรวจต่างๆ
-            patterns_to_check = {
-                "full_6_digits": number,           # เลข 6 ตัวเต็ม
-                "front_3_digits": number[:3],      # เลขหน้า 3 ตัว
-                "back_3_digits": number[-3:],      # เลขท้าย 3 ตัว
-                "back_2_digits": number[-2:]       # เลขท้าย 2 ตัว
-            }
-
-            all_matches = []
-
-            # ตรวจแต่ละรูปแบบ (ใช้ logic เดิม)
-            for match_type, check_number in patterns_to_check.items():
-                result = (self.db.supabase.table('lottery_prizes')
-                         .select('prize_type, amount, position, lottery_draws!inner(draw_date, draw_number)')
-                         .eq('prize_number', check_number)
-                         .eq('lottery_draws.draw_date', draw_date)
-                         .execute())
-
-                if result.data:
-                    for item in result.data:
-                        # แปลง prize_type เป็นชื่อภาษาไทย
-                        prize_names = {
-                            'first_prize': 'รางวัลที่ 1',
-                            'front_3': 'เลขหน้า 3 ตัว',
-                            'back_3': 'เลขท้าย 3 ตัว',
-                            'back_2': 'เลขท้าย 2 ตัว',
-                            'nearby': 'ข้างเคียงรางวัลที่ 1',
-                            'second_prize': 'รางวัลที่ 2',
-                            'third_prize': 'รางวัลที่ 3',
-                            'fourth_prize': 'รางวัลที่ 4',
-                            'fifth_prize': 'รางวัลที่ 5'
-                        }
-
-                        all_matches.append({
-                            'match_type': match_type,
-                            'matched_digits': check_number,
-                            'prize_type': item['prize_type'],
-                            'prize_name': prize_names.get(item['prize_type'], item['prize_type']),
-                            'amount': item['amount'],
-                            'position': item['position']
-                        })
-
-            # จัดเรียงตาม amount (จากมากไปน้อย)
-            all_matches.sort(key=lambda x: x['amount'], reverse=True)
-
-            return {
-                "number": number,
-                "draw_date": draw_date,
-                "draw_number": check_draw.data[0]['draw_number'] if check_draw.data else None,
-                "total_matches": len(all_matches),
-                "results": all_matches,
-                "message": "ถูกรางวัล!" if all_matches else "ไม่ถูกรางวัล"
-            }
+            index = self.get_prize_index(draw_date)
+            return self._build_check_result(number, draw_date, index)
 
         except Exception as e:
             print(f"ไม่สามารถตรวจสอบเลขแบบครบถ้วนได้: {e}")
-            return {"number": number, "draw_date": draw_date, "results": [], "message": f"เกิดข้อผิดพลาด: {str(e)}"}
\ No newline at end of file
+            return {"number": number, "draw_date": draw_date, "results": [], "message": f"เกิดข้อผิดพลาด: {str(e)}"}
+
+    def load_check_draws(self, draw_dates: List[str]) -> Dict[str, Dict[str, Any]]:
+        """โหลด index และตารางเงินรางวัลของทุกงวดก่อนตรวจ (งาน I/O: query / scrape)
+
+        คืน {draw_date: {'index': ..., 'table': ..., 'error': ข้อความเมื่อโหลดไม่ได้}}
+        """
+        draws = {}
+        for draw_date in draw_dates:
+            if not self.db.supabase:
+                draws[draw_date] = {'index': None, 'table': None, 'error': "ไม่สามารถเชื่อมต่อฐานข้อมูลได้"}
+                continue
+
+            try:
+                index = self.get_prize_index(draw_date)
+                table = self.get_payout_table(draw_date) if index else None
+                draws[draw_date] = {'index': index, 'table': table, 'error': None}
+            except Exception as e:
+                print(f"ไม่สามารถโหลดข้อมูลงวด {draw_date} ได้: {e}")
+                draws[draw_date] = {'index': None, 'table': None, 'error': f"เกิดข้อผิดพลาด: {str(e)}"}
+        return draws
+
+    def iter_check_numbers(self, numbers: List[str], draw_dates: List[str],
+                           draws: Optional[Dict[str, Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+        """ตรวจเลขหลายใบในหลายงวด โดยโหลดรางวัลของแต่ละงวดเพียงครั้งเดียว
+
+        draws: ผลจาก load_check_draws (ส่งมาเมื่อโหลดไว้ก่อนแล้ว ลูปนี้จะไม่มีงาน I/O)
+        """
+        if draws is None:
+            draws = self.load_check_draws(draw_dates)
+
+        for draw_date in draw_dates:
+            draw = draws[draw_date]
+            index = draw['index']
+            table = draw['table']
+
+            if draw['error']:
+                for number in numbers:
+                    yield {"number": number, "draw_date": draw_date, "results": [], "message": draw['error']}
+                continue
+
+            if table is None:
+                for number in numbers:
+                    yield self._build_check_result(number, draw_date, index)
+                continue
+
+            # ใช้ตารางเงินรางวัลคัดเลขที่ไม่ถูกรางวัลออกก่อน ตรวจละเอียดเฉพาะเลขที่ถูก
+            for number, (amount, mask) in zip(numbers, table.gather(numbers)):
+                if mask:
+                    yield self._build_check_result(number, draw_date, index)
+                else:
+                    yield {
+                        "number": number,
+                        "draw_date": draw_date,
+                        "draw_number": index.draw_number,
+                        "total_matches": 0,
+                        "results": [],
+                        "message": "ไม่ถูกรางวัล"
+                    }
+
+    def _build_check_result(self, number: str, draw_date: str, index: Optional[PrizeIndex]) -> Dict[str, Any]:
+        """สร้างผลการตรวจเลขในรูปแบบ LotteryCheckResponse"""
+        if index is None:
+            return {"number": number, "draw_date": draw_date, "results": [], "message": f"ไม่สามารถหาข้อมูลหวยงวด {draw_date} ได้"}
+
+        all_matches = index.check(number)
+
+        return {
+            "number": number,
+            "draw_date": draw_date,
+            "draw_number": index.draw_number,
+            "total_matches": len(all_matches),
+            "results": all_matches,
+            "message": "ถูกรางวัล!" if all_matches else "ไม่ถูกรางวัล"
+        }
@@ -0,0 +1,138 @@
+import math
+import os
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from .backfill import fetch_failure_reason
+from .draw_calendar import draw_calendar
+from .live_poller import BANGKOK_TZ, LIVE_POLL_START
+
+# อายุของผล "ไม่มีข้อมูล" แยกตามเหตุผล (วินาที)
+NEGATIVE_TTL_NOT_PUBLISHED = int(os.getenv('NEGATIVE_TTL_NOT_PUBLISHED', '60'))
+NEGATIVE_TTL_NOT_FOUND = int(os.getenv('NEGATIVE_TTL_NOT_FOUND', str(6 * 60 * 60)))
+NEGATIVE_TTL_NOT_DRAW_DATE = int(os.getenv('NEGATIVE_TTL_NOT_DRAW_DATE', str(24 * 60 * 60)))
+
+# งวดที่ออกมาไม่เกินกี่วัน หน้าที่ยังไม่มีผลถือว่า "ยังไม่ประกาศ" (ลองใหม่เร็ว) ไม่ใช่ "ไม่มีหน้า"
+RECENT_DRAW_DAYS = 2
+
+# ข้อความตอบกลับของแต่ละเหตุผล
+NEGATIVE_REASON_MESSAGES = {
+    'future': "ยังไม่ถึงเวลาออกรางวัลของงวดนี้",
+    'not_published': "งวดนี้ยังไม่ประกาศผล กรุณาลองใหม่อีกครั้ง",
+    'not_found': "ไม่พบข้อมูลหวยสำหรับวันที่ที่ระบุ",
+    'not_draw_date': "วันที่ที่ระบุไม่ใช่วันหวยออก",
+}
+
+
+class NegativeEntry:
+    """งวดที่รู้ว่ายังไม่มีผล พร้อมเหตุผลและเวลาหมดอายุ"""
+
+    def __init__(self, draw_date: str, reason: str, expires_at: datetime):
+        self.draw_date = draw_date
+        self.reason = reason
+        self.expires_at = expires_at
+
+    @property
+    def message(self) -> str:
+        return NEGATIVE_REASON_MESSAGES[self.reason]
+
+    def retry_after(self, now: Optional[datetime] = None) -> int:
+        """จำนวนวินาทีที่ควรรอก่อนขอใหม่ (ใช้เป็น header Retry-After)"""
+        now = now or datetime.now(self.expires_at.tzinfo)
+        return max(1, math.ceil((self.expires_at - now).total_seconds()))
+
+
+class NegativeCache:
+    """จำงวดที่ไม่มีผล (ยังไม่ถึงเวลาออก, ยังไม่ประกาศ, ไม่มีหน้า) ตาม TTL ของแต่ละเหตุผล ไม่ต้องดึงหน้า sanook ซ้ำทุก request"""
+
+    def __init__(self, now: Optional[Callable[[], datetime]] = None, draw_time: str = LIVE_POLL_START):
+        self._now = now or (lambda: datetime.now(BANGKOK_TZ))
+        self.draw_time = datetime.strptime(draw_time, '%H:%M').time()
+        self._entries: Dict[str, NegativeEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, draw_date: str) -> Optional[NegativeEntry]:
+        """เหมือน peek แต่นับสถิติ (ใช้ก่อน scrape)"""
+        entry = self.peek(draw_date)
+        with self._lock:
+            if entry:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry
+
+    @staticmethod
+    def _key(draw_date: str) -> str:
+        """จำตามวันออกจริง วันปกติของงวดที่เลื่อนจึงใช้ผลเดียวกับวันที่เลื่อนไปออก"""
+        try:
+            return draw_calendar.resolve(draw_date) or draw_date
+        except ValueError:
+            return draw_date
+
+    def peek(self, draw_date: str) -> Optional[NegativeEntry]:
+        """ผลที่จำไว้ของงวดนี้ หรือเหตุผลที่รู้ได้ทันทีโดยไม่ต้องดึงหน้า (ไม่ใช่วันหวยออก / ยังไม่ถึงเวลาออก)"""
+        draw_date = self._key(draw_date)
+        now = self._now()
+        with self._lock:
+            entry = self._entries.get(draw_date)
+            if entry and entry.expires_at <= now:
+                del self._entries[draw_date]
+                entry = None
+        return entry or self._classify(draw_date, now)
+
+    def _classify(self, draw_date: str, now: datetime) -> Optional[NegativeEntry]:
+        # คำนวณจากปฏิทินได้ทันที ไม่ต้องเก็บไว้ (กฎเดียวกับ validation: วันปกติของงวดที่เลื่อนใช้ได้ งวดที่งดไม่ได้)
+        try:
+            actual = draw_calendar.resolve(draw_date)
+        except ValueError:
+            return None
+
+        if actual is None:
+            return NegativeEntry(draw_date, 'not_draw_date', now + timedelta(seconds=NEGATIVE_TTL_NOT_DRAW_DATE))
+
+        # ยังไม่ถึงเวลาเริ่มออกรางวัล (ของวันที่ออกจริง) จำไว้จนถึงเวลานั้น
+        draw_starts_at = datetime.combine(date.fromisoformat(actual), self.draw_time, tzinfo=BANGKOK_TZ)
+        if draw_starts_at > now:
+            return NegativeEntry(draw_date, 'future', draw_starts_at)
+        return None
+
+    def record_failure(self, draw_date: str, error: Optional[BaseException] = None) -> Optional[NegativeEntry]:
+        """จำงวดที่ดึงหน้าแล้วไม่มีผล (error=None คือได้หน้าแต่ยังไม่มีรางวัล) timeout / 5xx ไม่จำ เพราะเป็นปัญหาชั่วคราว"""
+        if error is not None and fetch_failure_reason(error) != 'not_found':
+            return None
+        draw_date = self._key(draw_date)
+
+        now = self._now()
+        if now.date() - date.fromisoformat(draw_date) <= timedelta(days=RECENT_DRAW_DAYS):
+            entry = NegativeEntry(draw_date, 'not_published', now + timedelta(seconds=NEGATIVE_TTL_NOT_PUBLISHED))
+        else:
+            entry = NegativeEntry(draw_date, 'not_found', now + timedelta(seconds=NEGATIVE_TTL_NOT_FOUND))
+
+        with self._lock:
+            self._entries[draw_date] = entry
+        return entry
+
+    def invalidate(self, draw_date: str):
+        with self._lock:
+            self._entries.pop(self._key(draw_date), None)
+
+    def metrics(self) -> Dict[str, Any]:
+        """จำนวนครั้งที่ข้ามการ scrape ได้ และจำนวนงวดที่ดึงแล้วไม่มีผลที่จำไว้แยกตามเหตุผล"""
+        now = self._now()
+        with self._lock:
+            live = [entry for entry in self._entries.values() if entry.expires_at > now]
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else None,
+                'entries': dict(Counter(entry.reason for entry in live))
+            }
+
+
+# cache กลางของ process
+negative_cache = NegativeCache()
@@ -0,0 +1,139 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from .http_client import http_client
+
+# โฟลเดอร์เก็บหน้าเว็บที่ดาวน์โหลดมา (บีบอัดด้วย gzip)
+PAGE_CACHE_DIR = os.getenv('PAGE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'lotto_pages'))
+
+# PAGE_CACHE_OFFLINE=1 ใช้เฉพาะหน้าที่อยู่ใน cache ไม่เรียกเว็บเลย
+PAGE_CACHE_OFFLINE = os.getenv('PAGE_CACHE_OFFLINE', '0') == '1'
+
+
+class PageCacheMiss(requests.RequestException):
+    """โหมด offline แต่ไม่มีหน้านี้ใน cache"""
+
+
+class PageCache:
+    """cache หน้าเว็บบนดิสก์ พร้อม ETag/Last-Modified สำหรับ conditional GET"""
+
+    def __init__(self, directory: str = PAGE_CACHE_DIR, offline: bool = PAGE_CACHE_OFFLINE):
+        self.directory = directory
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'not_modified': 0, 'downloaded': 0, 'offline_misses': 0}
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest())
+
+    def load(self, url: str) -> Optional[Dict[str, Any]]:
+        """อ่าน metadata ของ url จาก cache (None = ไม่มี)"""
+        try:
+            with open(self._path(url) + '.json', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read_body(self, url: str) -> Optional[bytes]:
+        try:
+            with gzip.open(self._path(url) + '.gz', 'rb') as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def store(self, url: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """บันทึกหน้าเว็บ (เขียนไฟล์ชั่วคราวแล้วค่อยแทนที่ ผู้อ่านจึงไม่เห็นไฟล์ที่เขียนไม่เสร็จ)"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(url)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+
+        with gzip.open(path + '.gz' + suffix, 'wb') as f:
+            f.write(body)
+        os.replace(path + '.gz' + suffix, path + '.gz')
+
+        self._write_meta(url, {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time(),
+            'size': len(body)
+        })
+
+    def _write_meta(self, url: str, meta: Dict[str, Any]):
+        path = self._path(url) + '.json'
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    def fetch(self, url: str, session: Optional[requests.Session] = None, headers: Optional[Dict[str, str]] = None,
+              timeout=None, stable_after: Optional[date] = None,
+              throttle: Optional[Callable[[], None]] = None) -> bytes:
+        """ดึงหน้าเว็บผ่าน cache
+
+        - หน้าที่ดาวน์โหลดหลังวัน stable_after ถือว่าไม่เปลี่ยนแล้ว ใช้จาก cache ได้เลย
+        - หน้าอื่นที่มีใน cache ส่ง If-None-Match / If-Modified-Since ถ้าได้ 304 ใช้ของเดิม
+        - โหมด offline ใช้ได้เฉพาะหน้าที่มีใน cache
+        - throttle (เช่น rate limiter) ถูกเรียกเฉพาะก่อน request ที่ออกไปจริง
+        """
+        meta = self.load(url)
+        body = self.read_body(url) if meta else None
+        if body is None:
+            meta = None
+
+        if meta and (self.offline or self._is_stable(meta, stable_after)):
+            self._count('hits')
+            return body
+
+        if self.offline:
+            self._count('offline_misses')
+            raise PageCacheMiss(f"ไม่มีหน้า {url} ใน cache (โหมด offline)")
+
+        request_headers = dict(headers or {})
+        if meta:
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            # ใช้เฉพาะ Last-Modified ที่ต้นทางส่งมา เวลาที่เราดาวน์โหลดไม่ใช่เวลาที่หน้าเปลี่ยน
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        if throttle:
+            throttle()
+        response = (session or http_client).get(url, headers=request_headers, timeout=timeout)
+
+        if response.status_code == 304 and meta:
+            self._count('not_modified')
+            self._write_meta(url, dict(meta, fetched_at=time.time()))
+            return body
+
+        response.raise_for_status()
+        self._count('downloaded')
+        self.store(url, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response.content
+
+    @staticmethod
+    def _is_stable(meta: Dict[str, Any], stable_after: Optional[date]) -> bool:
+        if stable_after is None:
+            return False
+        return datetime.fromtimestamp(meta['fetched_at']).date() > stable_after
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, offline=self.offline, directory=self.directory)
+
+
+# cache กลางของ process
+page_cache = PageCache()
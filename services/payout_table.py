@@ -0,0 +1,237 @@
+import glob
+import mmap
+import os
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+from .prize_rows import prize_set_digest
+
+
+# เลขสลากมีทั้งหมด 000000-999999
+TOTAL_TICKETS = 1_000_000
+
+# bit ของแต่ละ prize_type เรียงตามลำดับนี้
+PRIZE_TYPE_ORDER = [
+    'first_prize', 'front_3', 'back_3', 'back_2', 'nearby',
+    'second_prize', 'third_prize', 'fourth_prize', 'fifth_prize'
+]
+PRIZE_TYPE_BITS = {prize_type: 1 << i for i, prize_type in enumerate(PRIZE_TYPE_ORDER)}
+
+# ชื่อ prize_type แบบที่ server.py ใช้
+PRIZE_TYPE_BITS.update({
+    'first': PRIZE_TYPE_BITS['first_prize'],
+    'second': PRIZE_TYPE_BITS['second_prize'],
+    'third': PRIZE_TYPE_BITS['third_prize'],
+    'fourth': PRIZE_TYPE_BITS['fourth_prize'],
+    'fifth': PRIZE_TYPE_BITS['fifth_prize']
+})
+
+# ไฟล์ = header 8 bytes + เงินรางวัลรวม int32 ทุกเลข + bitmask int32 ทุกเลข
+FILE_MAGIC = b'LOTPAY1\0'
+ITEM_SIZE = array('i').itemsize
+
+# โฟลเดอร์เก็บตาราง (บน Vercel เขียนได้เฉพาะ /tmp)
+PAYOUT_TABLE_DIR = os.getenv('PAYOUT_TABLE_DIR', os.path.join(tempfile.gettempdir(), 'lotto_payouts'))
+
+# จำนวนตารางที่เปิดค้างไว้ใน process (ตารางละ 8 MB)
+PAYOUT_TABLE_CACHE_SIZE = int(os.getenv('PAYOUT_TABLE_CACHE_SIZE', '8'))
+
+# จำนวนไฟล์ตารางบนดิสก์สูงสุด (ไฟล์ละ 8 MB, /tmp ของ Vercel มี 512 MB) เกินนี้ลบไฟล์ที่ใช้ล่าสุดนานที่สุด
+# ค่าเริ่มต้นพอสำหรับ batch ที่ตรวจได้สูงสุด 24 งวด
+PAYOUT_TABLE_MAX_FILES = int(os.getenv('PAYOUT_TABLE_MAX_FILES', '24'))
+
+
+class PayoutTable:
+    """ตารางเงินรางวัลของทุกเลข (000000-999999) ในงวดเดียว ตรวจเลขได้ด้วยการ index ครั้งเดียว"""
+
+    def __init__(self, draw_date: str, amounts, masks, source: Optional[mmap.mmap] = None,
+                 version: Optional[str] = None):
+        self.draw_date = draw_date
+        self.version = version
+        self.amounts = amounts
+        self.masks = masks
+        self._source = source
+
+    @classmethod
+    def from_prizes(cls, draw_date: str, prizes: Iterable[Dict[str, Any]], version: Optional[str] = None) -> 'PayoutTable':
+        """สร้างตารางจากแถวของ lottery_prizes"""
+        amounts = array('i', bytes(ITEM_SIZE * TOTAL_TICKETS))
+        masks = array('i', bytes(ITEM_SIZE * TOTAL_TICKETS))
+
+        for prize in prizes:
+            number = prize.get('prize_number')
+            if not number or not number.isdigit():
+                continue
+
+            bit = PRIZE_TYPE_BITS.get(prize['prize_type'], 0)
+            amount = prize['amount']
+            prize_type = prize['prize_type']
+
+            if prize_type == 'front_3':
+                # เลขหน้า 3 ตัว = เลข 1000 ใบที่ขึ้นต้นด้วยเลขนี้
+                start = int(number) * 1000
+                tickets = range(start, start + 1000)
+            elif prize_type == 'back_3':
+                tickets = range(int(number), TOTAL_TICKETS, 1000)
+            elif prize_type == 'back_2':
+                tickets = range(int(number), TOTAL_TICKETS, 100)
+            else:
+                tickets = (int(number),)
+
+            for ticket in tickets:
+                amounts[ticket] += amount
+                masks[ticket] |= bit
+
+        return cls(draw_date, amounts, masks, version=version)
+
+    def lookup(self, number: str) -> Tuple[int, int]:
+        """คืนค่า (เงินรางวัลรวม, bitmask ของ prize_type) ของเลข 6 ตัว"""
+        ticket = int(number)
+        return self.amounts[ticket], self.masks[ticket]
+
+    def gather(self, numbers: Iterable[str]) -> List[Tuple[int, int]]:
+        """ตรวจเลขหลายใบพร้อมกัน"""
+        amounts = self.amounts
+        masks = self.masks
+        tickets = [int(number) for number in numbers]
+        return [(amounts[ticket], masks[ticket]) for ticket in tickets]
+
+    @staticmethod
+    def prize_types(mask: int) -> List[str]:
+        """แปลง bitmask กลับเป็นรายชื่อ prize_type (ชื่อแบบ services)"""
+        return [prize_type for i, prize_type in enumerate(PRIZE_TYPE_ORDER) if mask & (1 << i)]
+
+    def save(self, path: str):
+        """บันทึกตารางลงไฟล์ (เขียนไฟล์ชั่วคราวแล้วค่อยแทนที่ เพื่อไม่ให้ worker อื่นอ่านไฟล์ครึ่งๆ)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(FILE_MAGIC)
+            f.write(memoryview(self.amounts).cast('B'))
+            f.write(memoryview(self.masks).cast('B'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, draw_date: str, path: str, version: Optional[str] = None) -> 'PayoutTable':
+        """เปิดตารางจากไฟล์แบบ memory-map (หลาย worker ใช้หน้า memory ชุดเดียวกัน)"""
+        with open(path, 'rb') as f:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if source[:len(FILE_MAGIC)] != FILE_MAGIC:
+            source.close()
+            raise ValueError(f"ไฟล์ตารางรางวัลไม่ถูกต้อง: {path}")
+
+        size = ITEM_SIZE * TOTAL_TICKETS
+        view = memoryview(source)
+        offset = len(FILE_MAGIC)
+        amounts = view[offset:offset + size].cast('i')
+        masks = view[offset + size:offset + 2 * size].cast('i')
+        return cls(draw_date, amounts, masks, source, version)
+
+
+class PayoutTableStore:
+    """เก็บ PayoutTable ของแต่ละงวดเป็นไฟล์ (ชื่อไฟล์ผูกกับ version ของชุดรางวัล) และ cache ตารางที่เปิดแล้วไว้ใน process แบบ LRU"""
+
+    def __init__(self, directory: str = PAYOUT_TABLE_DIR, max_tables: int = PAYOUT_TABLE_CACHE_SIZE,
+                 max_files: int = PAYOUT_TABLE_MAX_FILES):
+        self.directory = directory
+        self.max_tables = max_tables
+        self.max_files = max_files
+        self._tables: 'OrderedDict[str, PayoutTable]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path_for(self, draw_date: str, version: str) -> str:
+        return os.path.join(self.directory, f"payout_{draw_date}_{version}.bin")
+
+    def get(self, draw_date: str, version: str) -> Optional[PayoutTable]:
+        """ตารางของงวดที่ตรงกับชุดรางวัล version นี้ (ตารางของชุดรางวัลเก่าไม่ถูกใช้)"""
+        with self._lock:
+            table = self._tables.get(draw_date)
+            if table and table.version == version:
+                self._tables.move_to_end(draw_date)
+                return table
+            if table:
+                # ชุดรางวัลเปลี่ยนแล้ว ไฟล์เก่าจะถูกลบตอน put ตารางใหม่
+                del self._tables[draw_date]
+
+        path = self.path_for(draw_date, version)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            table = PayoutTable.load(draw_date, path, version)
+            # เวลาแก้ไขของไฟล์ = เวลาที่ใช้ล่าสุด (ใช้เลือกไฟล์ที่จะลบเมื่อเกิน max_files)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            print(f"ไม่สามารถเปิดตารางรางวัลงวด {draw_date} ได้: {e}")
+            return None
+
+        self._remember(table)
+        return table
+
+    def put(self, draw_date: str, prizes: Iterable[Dict[str, Any]]) -> PayoutTable:
+        """สร้างตารางจากแถวรางวัล บันทึกลงไฟล์ แล้วคืนตารางที่ memory-map จากไฟล์นั้น"""
+        prizes = list(prizes)
+        version = prize_set_digest(prizes)
+        table = PayoutTable.from_prizes(draw_date, prizes, version)
+        path = self.path_for(draw_date, version)
+
+        try:
+            self._remove_files(draw_date)
+            table.save(path)
+            # ใช้หน้า memory ของไฟล์ร่วมกับ worker อื่นแทน array 8 MB ที่เพิ่งสร้าง
+            table = PayoutTable.load(draw_date, path, version)
+            self._prune_files(keep=path)
+        except (OSError, ValueError) as e:
+            print(f"ไม่สามารถบันทึกตารางรางวัลงวด {draw_date} ได้: {e}")
+
+        self._remember(table)
+        return table
+
+    def invalidate(self, draw_date: str):
+        """ลบตารางของงวดนี้ทั้งใน process และบนดิสก์ (เรียกทุกครั้งที่บันทึกงวดนี้ใหม่)"""
+        with self._lock:
+            self._tables.pop(draw_date, None)
+        try:
+            self._remove_files(draw_date)
+        except OSError as e:
+            print(f"ไม่สามารถลบตารางรางวัลงวด {draw_date} ได้: {e}")
+
+    def _remove_files(self, draw_date: str):
+        # ไฟล์ของทุก version (รวมไฟล์แบบเก่า payout_{date}.bin)
+        for path in glob.glob(os.path.join(self.directory, f"payout_{draw_date}*.bin")):
+            os.remove(path)
+
+    def _prune_files(self, keep: str):
+        """ลบไฟล์ที่ใช้ล่าสุดนานที่สุดจนเหลือไม่เกิน max_files (ตารางที่ยังเปิดอยู่ยังใช้ได้ จนกว่าจะถูกปิด)"""
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, "payout_*.bin")):
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                # worker อื่นลบไปแล้ว
+                continue
+
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_files)]:
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _remember(self, table: PayoutTable):
+        with self._lock:
+            self._tables[table.draw_date] = table
+            self._tables.move_to_end(table.draw_date)
+            # ตารางที่ไม่อยู่ใน cache แล้วจะถูกปิดเมื่อไม่มีใครใช้
+            while len(self._tables) > self.max_tables:
+                self._tables.popitem(last=False)
+
+
+# store กลางของ process
+payout_tables = PayoutTableStore()
@@ -0,0 +1,156 @@
+import threading
+import time
+from typing import Dict, List, Optional, Any, Iterable
+
+from .prize_rows import prize_set_digest
+
+
+# แปลง prize_type เป็นชื่อภาษาไทย (รองรับทั้งชื่อแบบ services และแบบ server.py)
+PRIZE_NAMES = {
+    'first_prize': 'รางวัลที่ 1',
+    'first': 'รางวัลที่ 1',
+    'front_3': 'เลขหน้า 3 ตัว',
+    'back_3': 'เลขท้าย 3 ตัว',
+    'back_2': 'เลขท้าย 2 ตัว',
+    'nearby': 'ข้างเคียงรางวัลที่ 1',
+    'second_prize': 'รางวัลที่ 2',
+    'second': 'รางวัลที่ 2',
+    'third_prize': 'รางวัลที่ 3',
+    'third': 'รางวัลที่ 3',
+    'fourth_prize': 'รางวัลที่ 4',
+    'fourth': 'รางวัลที่ 4',
+    'fifth_prize': 'รางวัลที่ 5',
+    'fifth': 'รางวัลที่ 5'
+}
+
+# จำนวนรางวัลของแต่ละประเภทเมื่องวดออกครบ
+EXPECTED_PRIZE_COUNTS = {
+    'first_prize': 1,
+    'front_3': 2,
+    'back_3': 2,
+    'back_2': 1,
+    'nearby': 2,
+    'second_prize': 5,
+    'third_prize': 10,
+    'fourth_prize': 50,
+    'fifth_prize': 100
+}
+
+# จำนวนรางวัลทั้งหมดของงวดที่ออกครบ (1 + 2 + 2 + 1 + 2 + 5 + 10 + 50 + 100)
+EXPECTED_PRIZE_ROWS = sum(EXPECTED_PRIZE_COUNTS.values())
+
+
+def is_complete(counts: Dict[str, int]) -> bool:
+    """ออกครบทุกประเภท (5/10/50/100 รางวัล ฯลฯ) แล้วหรือยัง"""
+    return all(counts.get(prize_type, 0) >= expected for prize_type, expected in EXPECTED_PRIZE_COUNTS.items())
+
+# งวดที่ข้อมูลยังไม่ครบให้สร้าง index ใหม่หลังจากนี้ (วินาที)
+INCOMPLETE_INDEX_TTL = 60
+
+
+class PrizeIndex:
+    """ดัชนีรางวัลของงวดเดียวในหน่วยความจำ (ตรวจเลขได้โดยไม่ต้อง query)"""
+
+    def __init__(self, draw_date: str, draw_number: Optional[str], prizes: Iterable[Dict[str, Any]]):
+        self.draw_date = draw_date
+        self.draw_number = draw_number
+        self.built_at = time.monotonic()
+        self.prizes = list(prizes)
+        self.total_prizes = 0
+        # version ของชุดรางวัล (ใช้ผูกกับไฟล์ตารางเงินรางวัล)
+        self.version = prize_set_digest(self.prizes)
+
+        # key คือเลขที่ใช้เทียบ, value คือรายการรางวัลของเลขนั้น
+        self.full: Dict[str, List[Dict[str, Any]]] = {}
+        self.front_3: Dict[str, List[Dict[str, Any]]] = {}
+        self.back_3: Dict[str, List[Dict[str, Any]]] = {}
+        self.back_2: Dict[str, List[Dict[str, Any]]] = {}
+
+        buckets = {
+            'front_3': self.front_3,
+            'back_3': self.back_3,
+            'back_2': self.back_2
+        }
+
+        for prize in self.prizes:
+            number = prize.get('prize_number')
+            if not number:
+                continue
+
+            entry = {
+                'prize_type': prize['prize_type'],
+                'amount': prize['amount'],
+                'position': prize.get('position', 1)
+            }
+            buckets.get(prize['prize_type'], self.full).setdefault(number, []).append(entry)
+            self.total_prizes += 1
+
+    @property
+    def is_complete(self) -> bool:
+        return self.total_prizes >= EXPECTED_PRIZE_ROWS
+
+    def check(self, number: str) -> List[Dict[str, Any]]:
+        """ตรวจเลข 6 ตัวครบทุกรูปแบบ (6 ตัว, หน้า 3, ท้าย 3, ท้าย 2)"""
+        patterns_to_check = [
+            ("full_6_digits", number, self.full),
+            ("front_3_digits", number[:3], self.front_3),
+            ("back_3_digits", number[-3:], self.back_3),
+            ("back_2_digits", number[-2:], self.back_2)
+        ]
+
+        all_matches = []
+        for match_type, check_number, bucket in patterns_to_check:
+            for item in bucket.get(check_number, ()):
+                all_matches.append({
+                    'match_type': match_type,
+                    'matched_digits': check_number,
+                    'prize_type': item['prize_type'],
+                    'prize_name': PRIZE_NAMES.get(item['prize_type'], item['prize_type']),
+                    'amount': item['amount'],
+                    'position': item['position']
+                })
+
+        # จัดเรียงตาม amount (จากมากไปน้อย)
+        all_matches.sort(key=lambda x: x['amount'], reverse=True)
+        return all_matches
+
+
+class PrizeIndexCache:
+    """เก็บ PrizeIndex ของแต่ละงวดไว้ใน process (thread-safe)"""
+
+    def __init__(self, incomplete_ttl: float = INCOMPLETE_INDEX_TTL):
+        self.incomplete_ttl = incomplete_ttl
+        self._indexes: Dict[str, PrizeIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, draw_date: str) -> Optional[PrizeIndex]:
+        with self._lock:
+            index = self._indexes.get(draw_date)
+
+        if index is None:
+            return None
+
+        # งวดที่ยังออกไม่ครบอาจถูก instance อื่นบันทึกเพิ่ม ให้โหลดใหม่เป็นระยะ
+        if not index.is_complete and time.monotonic() - index.built_at > self.incomplete_ttl:
+            self.invalidate(draw_date)
+            return None
+
+        return index
+
+    def put(self, draw_date: str, draw_number: Optional[str], prizes: Iterable[Dict[str, Any]]) -> PrizeIndex:
+        index = PrizeIndex(draw_date, draw_number, prizes)
+        with self._lock:
+            self._indexes[draw_date] = index
+        return index
+
+    def invalidate(self, draw_date: str):
+        with self._lock:
+            self._indexes.pop(draw_date, None)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+# cache กลางของ process
+prize_index_cache = PrizeIndexCache()
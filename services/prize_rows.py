@@ -0,0 +1,119 @@
+import hashlib
+from typing import Dict, List, Optional, Any, Iterable
+
+
+# รางวัลหลัก: (prize_type, key ใน lottery_data, เงินรางวัล, position)
+MAIN_PRIZE_CONFIGS = [
+    ('first_prize', 'first_prize', 6000000, 1),
+    ('front_3', 'second_prize_1', 4000, 1),
+    ('front_3', 'second_prize_2', 4000, 2),
+    ('back_3', 'third_prize_1', 4000, 1),
+    ('back_3', 'third_prize_2', 4000, 2),
+    ('back_2', 'fourth_prize_1', 2000, 1),
+]
+
+# รางวัลแบบรายการ: (prize_type, key ใน lottery_data, เงินรางวัล)
+LIST_PRIZE_CONFIGS = [
+    ('nearby', 'nearby_prizes', 100000),
+    ('second_prize', 'second_prizes', 200000),
+    ('third_prize', 'third_prizes', 80000),
+    ('fourth_prize', 'fourth_prizes', 40000),
+    ('fifth_prize', 'fifth_prizes', 20000),
+]
+
+# ชื่อ prize_type แบบที่ server.py ใช้ -> ชื่อแบบ services
+PRIZE_TYPE_ALIASES = {
+    'first': 'first_prize',
+    'second': 'second_prize',
+    'third': 'third_prize',
+    'fourth': 'fourth_prize',
+    'fifth': 'fifth_prize'
+}
+
+
+def canonical_prize_type(prize_type: str) -> str:
+    """prize_type แบบ services (first_prize, ...) ไม่ว่าแถวจะถูกบันทึกด้วยชื่อแบบไหน"""
+    return PRIZE_TYPE_ALIASES.get(prize_type, prize_type)
+
+
+def count_prize_types(rows: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """จำนวนรางวัลของแต่ละประเภท (ชื่อแบบ server.py นับรวมกับชื่อแบบ services)"""
+    counts: Dict[str, int] = {}
+    for row in rows:
+        prize_type = canonical_prize_type(row['prize_type'])
+        counts[prize_type] = counts.get(prize_type, 0) + 1
+    return counts
+
+
+def build_prize_rows(lottery_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """แปลงข้อมูลหวยเป็นแถวของ lottery_prizes (ยังไม่มี draw_id)"""
+    rows = []
+
+    for prize_type, key, amount, position in MAIN_PRIZE_CONFIGS:
+        number = lottery_data.get(key)
+        if number:
+            rows.append({
+                'prize_type': prize_type,
+                'prize_number': number,
+                'position': position,
+                'amount': amount
+            })
+
+    for prize_type, key, amount in LIST_PRIZE_CONFIGS:
+        for i, number in enumerate(lottery_data.get(key) or [], 1):
+            if number:
+                rows.append({
+                    'prize_type': prize_type,
+                    'prize_number': number,
+                    'position': i,
+                    'amount': amount
+                })
+
+    return rows
+
+
+def prize_set_digest(rows: Iterable[Dict[str, Any]]) -> str:
+    """hash ของชุดรางวัลของงวด (ไม่ขึ้นกับลำดับแถว) ใช้เป็น version ของข้อมูลงวด"""
+    canonical = sorted(
+        f"{row['prize_type']}|{row.get('position', 1)}|{row['prize_number']}|{row['amount']}"
+        for row in rows
+    )
+    return hashlib.sha256("\n".join(canonical).encode('utf-8')).hexdigest()[:32]
+
+
+def lottery_data_from_rows(draw_date: str, draw_number: Optional[str], rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """สร้างข้อมูลหวยเต็มงวด (รูปแบบเดียวกับที่ scrape ได้) จากแถวของ lottery_prizes"""
+    lottery_data = {
+        'draw_date': draw_date,
+        'draw_number': draw_number,
+        'first_prize': '',
+        'second_prize_1': '',
+        'second_prize_2': '',
+        'third_prize_1': '',
+        'third_prize_2': '',
+        'fourth_prize_1': '',
+        'second_prizes': [],
+        'third_prizes': [],
+        'fourth_prizes': [],
+        'fifth_prizes': [],
+        'nearby_prizes': []
+    }
+
+    main_keys = {(prize_type, position): key for prize_type, key, _, position in MAIN_PRIZE_CONFIGS}
+    list_keys = {prize_type: key for prize_type, key, _ in LIST_PRIZE_CONFIGS}
+    list_items: Dict[str, List[Any]] = {key: [] for key in list_keys.values()}
+
+    for row in rows:
+        prize_type = canonical_prize_type(row['prize_type'])
+        position = row.get('position') or 1
+
+        if (prize_type, position) in main_keys:
+            lottery_data[main_keys[(prize_type, position)]] = row['prize_number']
+        elif prize_type in list_keys:
+            list_items[list_keys[prize_type]].append((position, row['prize_number']))
+
+    # เรียงตาม position ให้ตรงกับลำดับที่ scrape มา
+    for key, items in list_items.items():
+        lottery_data[key] = [number for _, number in sorted(items)]
+
+    return lottery_data
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from .negative_cache import negative_cache
+from .prize_rows import build_prize_rows
+
+# ตอบ 202 แทนการรอ scrape เมื่อไม่มีงวดนั้นในฐานข้อมูล (ค่าเริ่มต้นของ POST /lottery/check)
+ASYNC_SCRAPE_ON_MISS = os.getenv('ASYNC_SCRAPE_ON_MISS', 'false').lower() in ('1', 'true', 'yes')
+
+# จำนวน thread ที่ scrape พร้อมกัน, วินาทีที่แนะนำให้ client รอก่อนถามสถานะใหม่ และอายุของงานที่เสร็จแล้ว
+SCRAPE_JOB_WORKERS = int(os.getenv('SCRAPE_JOB_WORKERS', '2'))
+SCRAPE_JOB_RETRY_AFTER = int(os.getenv('SCRAPE_JOB_RETRY_AFTER', '3'))
+SCRAPE_JOB_TTL = int(os.getenv('SCRAPE_JOB_TTL', '600'))
+
+
+class ScrapeJob:
+    """งาน scrape งวดหนึ่งงวด (queued -> running -> done / failed)"""
+
+    def __init__(self, draw_date: str):
+        self.id = uuid.uuid4().hex
+        self.draw_date = draw_date
+        self.status = 'queued'
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.finished_monotonic: Optional[float] = None
+        self.total_prizes = 0
+        self.error: Optional[str] = None
+
+    @property
+    def pending(self) -> bool:
+        return self.status in ('queued', 'running')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'draw_date': self.draw_date,
+            'status': self.status,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'total_prizes': self.total_prizes,
+            'error': self.error
+        }
+
+
+class ScrapeJobQueue:
+    """คิวงาน scrape เบื้องหลังใน process (request ของงวดเดียวกันที่ยังไม่เสร็จใช้งานเดียวกัน)
+
+    สถานะงานและ thread อยู่ใน process นี้เท่านั้น บน serverless (config.SERVERLESS) instance ถูกหยุดหลังส่ง response
+    และ GET /jobs/{id} อาจไปตก instance อื่น POST /lottery/check จึงไม่ใช้คิวนี้และ scrape รอผลใน request เลย
+    """
+
+    def __init__(self, workers: int = SCRAPE_JOB_WORKERS, ttl: float = SCRAPE_JOB_TTL):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scrape-job')
+        self._jobs: Dict[str, ScrapeJob] = {}
+        self._pending_by_date: Dict[str, ScrapeJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, draw_date: str, scrape: Callable[[str], Optional[Dict[str, Any]]]) -> ScrapeJob:
+        """เพิ่มงาน scrape ของงวด (ถ้ามีงานของงวดนี้ค้างอยู่แล้วคืนงานเดิม) scrape เช่น LotteryService.scrape_and_save"""
+        with self._lock:
+            self._purge()
+            job = self._pending_by_date.get(draw_date)
+            if job:
+                return job
+            job = ScrapeJob(draw_date)
+            self._jobs[job.id] = job
+            self._pending_by_date[draw_date] = job
+
+        self._executor.submit(self._run, job, scrape)
+        return job
+
+    def get(self, job_id: str) -> Optional[ScrapeJob]:
+        with self._lock:
+            self._purge()
+            return self._jobs.get(job_id)
+
+    def _run(self, job: ScrapeJob, scrape: Callable[[str], Optional[Dict[str, Any]]]):
+        job.started_at = datetime.now()
+        job.status = 'running'
+        try:
+            lottery_data = scrape(job.draw_date)
+            if lottery_data:
+                job.total_prizes = len(build_prize_rows(lottery_data))
+                job.status = 'done'
+            else:
+                miss = negative_cache.peek(job.draw_date)
+                job.error = miss.message if miss else "ไม่พบข้อมูลหวยสำหรับวันที่ที่ระบุ"
+                job.status = 'failed'
+        except Exception as e:
+            print(f"❌ scrape งวด {job.draw_date} ไม่สำเร็จ: {e}")
+            job.error = f"เกิดข้อผิดพลาด: {e}"
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.now()
+            job.finished_monotonic = time.monotonic()
+            with self._lock:
+                if self._pending_by_date.get(job.draw_date) is job:
+                    del self._pending_by_date[job.draw_date]
+
+    def _purge(self):
+        """ลบงานที่เสร็จนานเกิน ttl (เรียกขณะถือ lock)"""
+        cutoff = time.monotonic() - self.ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_monotonic is not None and job.finished_monotonic < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            statuses: Dict[str, int] = {}
+            for job in self._jobs.values():
+                statuses[job.status] = statuses.get(job.status, 0) + 1
+            return {'jobs': len(self._jobs), 'statuses': statuses}
+
+
+# คิวกลางของ process
+scrape_jobs = ScrapeJobQueue()
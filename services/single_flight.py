@@ -0,0 +1,56 @@
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class _Call:
+    """งานหนึ่งงานที่กำลังทำอยู่ (ผู้รอทุกคนได้ผลลัพธ์เดียวกัน)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """รวมการเรียกงานเดียวกัน (key เดียวกัน) ที่เกิดพร้อมกันให้ทำจริงเพียงครั้งเดียวใน process"""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """เรียก fn สำหรับ key นี้ ถ้ามีผู้อื่นกำลังทำอยู่ให้รอรับผลของคนนั้นแทน"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self) -> Dict[str, int]:
+        """key ที่กำลังทำอยู่ และจำนวนผู้ที่รอผลของแต่ละ key"""
+        with self._lock:
+            return {key: call.waiters for key, call in self._calls.items()}
+
+
+# ใช้รวมการ scrape งวดเดียวกันที่เกิดพร้อมกันใน process
+scrape_flight = SingleFlight()
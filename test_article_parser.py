@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ tokenizer ของ articleBody กับ sanook_page.html (ไม่ต้องใช้อินเทอร์เน็ต)
+"""
+
+import contextlib
+import io
+
+from benchmark_article_parser import load_news_article, DRAW_DATE
+from benchmark_html_parser import load_fixture
+from services.article_parser import parse_article_body, tokenize_article_body, count_prizes
+from services.lottery_service import LotteryService
+
+
+def test_parses_every_tier():
+    """tokenizer ต้องได้ครบ 173 รางวัล รวมข้างเคียงรางวัลที่ 1"""
+    prizes = parse_article_body(load_news_article()['articleBody'])
+    print(f"แยกได้ {count_prizes(prizes)} รางวัล")
+
+    assert count_prizes(prizes) == 173
+    assert prizes['first_prize'] == '876978'
+    assert (prizes['second_prize_1'], prizes['second_prize_2']) == ('843', '532')
+    assert (prizes['third_prize_1'], prizes['third_prize_2']) == ('280', '605')
+    assert prizes['fourth_prize_1'] == '77'
+    assert prizes['nearby_prizes'] == ['876977', '876979']
+    assert prizes['fifth_prizes'][-1] == '981797'
+
+
+def test_service_uses_tokenizer():
+    """LotteryService ต้องได้รางวัลเดียวกับ tokenizer รวมข้างเคียงที่มี \r\n คั่น"""
+    prizes = parse_article_body(load_news_article()['articleBody'])
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = LotteryService()
+        current = service.parse_draw_page(load_fixture(), DRAW_DATE)
+
+    for key, value in prizes.items():
+        assert current[key] == value, key
+    assert current['nearby_prizes'] == ['876977', '876979']
+
+
+def test_header_numbers_and_escaped_newlines():
+    """เลขในหัวข้อ (วันที่, เงินรางวัล) ต้องไม่ถูกนับ และรองรับ \\r\\n ที่เป็นตัวอักษร"""
+    body = ("ตรวจหวย 16 ตุลาคม 2568\\r\\nรางวัลที่ 1 รางวัลละ 6,000,000 บาท\\r\\n123456\\r\\n"
+            "รางวัลเลขท้าย 2 ตัว 1 รางวัลๆละ 2,000 บาท\\r\\n26\\r\\n")
+    assert list(tokenize_article_body(body)) == [('first', '123456'), ('back_2', '26')]
+    assert parse_article_body(body) == {'first_prize': '123456', 'fourth_prize_1': '26'}
+
+
+if __name__ == "__main__":
+    test_parses_every_tier()
+    test_service_uses_tokenizer()
+    test_header_numbers_and_escaped_newlines()
+    print("✅ ทดสอบ tokenizer ผ่านทั้งหมด")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ backfill engine (ใช้ sanook_page.html แทนเว็บจริง ไม่ต้องใช้อินเทอร์เน็ตหรือฐานข้อมูล)
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmark_html_parser import load_fixture
+from services.backfill import BackfillEngine, BackfillProgress, RateLimiter, draw_dates_between
+from services.lottery_service import LotteryService
+
+
+class FakeDatabase:
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+
+    def get_draw_dates(self, start_date, end_date):
+        return set(self.existing)
+
+
+class FakeService(LotteryService):
+    """ใช้ parse_draw_page ตัวจริง แต่ fetch จากไฟล์และบันทึกลง list"""
+
+    def __init__(self, existing=(), missing=(), unsaved=()):
+        self.db = FakeDatabase(existing)
+        self.missing = set(missing)
+        self.unsaved = set(unsaved)
+        self.content = load_fixture()
+        self.fetched = []
+        self.saved = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def fetch_draw_page(self, draw_date, session=None, throttle=None):
+        with self._lock:
+            self.fetched.append(draw_date)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.01)
+            if draw_date in self.missing:
+                response = requests.Response()
+                response.status_code = 404
+                raise requests.HTTPError("404", response=response)
+            return self.content
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def save_many_to_database(self, lottery_data_list):
+        draw_dates = [lottery_data['draw_date'] for lottery_data in lottery_data_list]
+        self.saved.append(draw_dates)
+        return [draw_date for draw_date in draw_dates if draw_date not in self.unsaved]
+
+
+def run_quietly(engine, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return engine.run(*args, **kwargs)
+
+
+def test_draw_dates_between():
+    # งวด 1 ม.ค. ออก 30 ธ.ค. และงวด 16 ม.ค. ออก 17 ม.ค.
+    assert draw_dates_between('2024-12-10', '2025-02-01') == ['2024-12-16', '2024-12-30', '2025-01-17', '2025-02-01']
+    assert draw_dates_between('2025-01-02', '2025-01-15') == []
+    # ปี 2563 ไม่มีงวด 1 เม.ย., 16 เม.ย., 1 พ.ค. (COVID-19) และงวด 1 ม.ค. 2569 ออก 30 ธ.ค. 2568
+    assert len(draw_dates_between('2006-01-01', '2025-12-31')) == 20 * 24 - 3 + 1
+
+
+def test_backfill_pipeline():
+    """ทุกงวดถูกดึง แยกรางวัล และบันทึกทีละ batch, งวดที่ไม่มีหน้าถูกบันทึกเป็นล้มเหลว"""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = FakeService(existing={'2025-01-17'}, missing={'2025-03-01'})
+        engine = BackfillEngine(service, fetch_workers=3, parse_workers=2, rate=0, batch_size=4,
+                                progress_path=os.path.join(tmp, 'progress.json'))
+        report = run_quietly(engine, '2025-01-01', '2025-06-16')
+
+        print(report)
+        assert report['total'] == 11
+        assert report['skipped'] == 1
+        assert report['saved'] == 9
+        assert report['failed'] == 1
+        assert report['failures'] == {'2025-03-01': 'not_found'}
+        assert report['draws_per_second'] > 0
+        assert '2025-01-17' not in service.fetched
+        assert 1 < service.max_active <= 3
+        assert [len(batch) for batch in service.saved] == [4, 4, 1]
+
+        progress = BackfillProgress(engine.progress_path).load()
+        assert len(progress.done) == 10
+        assert progress.failed == {'2025-03-01': 'not_found'}
+
+
+def test_backfill_resumes_from_progress_file():
+    """รันซ้ำจะดึงเฉพาะงวดที่ยังไม่เสร็จ"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'progress.json')
+        run_quietly(BackfillEngine(FakeService(missing={'2025-02-16'}), rate=0, progress_path=path),
+                    '2025-01-01', '2025-03-16')
+
+        service = FakeService()
+        report = run_quietly(BackfillEngine(service, rate=0, progress_path=path), '2025-01-01', '2025-03-16')
+        assert service.fetched == ['2025-02-16']
+        assert report['saved'] == 1
+        assert BackfillProgress(path).load().failed == {}
+
+
+def test_backfill_skips_draw_stored_under_regular_date():
+    """งวด 30 ธ.ค. ที่ข้อมูลเก่าบันทึกไว้ที่ 1 ม.ค. ไม่ต้องดึงซ้ำ"""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = FakeService(existing={'2025-01-01'})
+        engine = BackfillEngine(service, rate=0, progress_path=os.path.join(tmp, 'progress.json'))
+        report = run_quietly(engine, '2024-12-01', '2024-12-31')
+
+        assert report['total'] == 3 and report['skipped'] == 1
+        assert sorted(service.fetched) == ['2024-12-01', '2024-12-16']
+
+
+def test_backfill_only_given_draws():
+    """ซ่อมเฉพาะงวดที่ระบุ แม้งวดนั้นมีแถวในฐานข้อมูลแล้ว (งวดที่ยังออกไม่ครบ)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = FakeService(existing={'2025-02-01'})
+        engine = BackfillEngine(service, rate=0, progress_path=os.path.join(tmp, 'progress.json'))
+        report = run_quietly(engine, '2025-01-01', '2025-06-16', resume=False, skip_existing=False,
+                             draw_dates=['2025-02-01', '2025-05-16'])
+
+        assert report['total'] == 2 and report['saved'] == 2
+        assert sorted(service.fetched) == ['2025-02-01', '2025-05-16']
+
+
+def test_force_ignores_progress_file():
+    """--force (skip_existing=False) รันซ้ำต้องดึงและแยกรางวัลใหม่ทุกงวด แม้ไฟล์ความคืบหน้าบอกว่าเสร็จแล้ว"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'progress.json')
+        run_quietly(BackfillEngine(FakeService(), rate=0, progress_path=path), '2025-01-01', '2025-03-16')
+
+        for _ in range(2):
+            service = FakeService(existing={'2025-02-01'})
+            report = run_quietly(BackfillEngine(service, rate=0, progress_path=path), '2025-01-01', '2025-03-16',
+                                 skip_existing=False)
+            assert report['skipped'] == 0 and report['saved'] == 5
+            assert sorted(service.fetched) == draw_dates_between('2025-01-01', '2025-03-16')
+
+
+def test_repair_run_keeps_existing_progress():
+    """รอบซ่อมเฉพาะงวด (resume=False, skip_existing=False) ต้องไม่เขียนทับความคืบหน้าของ backfill ย้อนหลัง"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'progress.json')
+        progress = BackfillProgress(path)
+        progress.mark_done(['2025-08-01', '2025-08-16', '2025-09-01'])
+        progress.mark_failed('2025-07-16', 'not_found')
+        progress.save()
+
+        service = FakeService()
+        report = run_quietly(BackfillEngine(service, rate=0, progress_path=path), '2025-09-16', '2025-09-16',
+                             resume=False, skip_existing=False, draw_dates=['2025-09-16'])
+        assert report['saved'] == 1 and service.fetched == ['2025-09-16']
+
+        progress = BackfillProgress(path).load()
+        assert progress.done == {'2025-08-01', '2025-08-16', '2025-09-01', '2025-09-16'}
+        assert progress.failed == {'2025-07-16': 'not_found'}
+
+
+def test_save_failures_are_counted_per_draw():
+    """งวดที่บันทึกไม่สำเร็จนับเป็น failed ทีละงวด ตรงกับ failures และถูกดึงใหม่ในรอบหน้า"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'progress.json')
+        # batch แรกบันทึกไม่ได้ทั้ง batch, batch ที่สองบันทึกไม่ได้บางงวด (บันทึกทีละงวด)
+        service = FakeService(unsaved={'2025-01-17', '2025-02-01', '2025-02-16', '2025-03-16'})
+        report = run_quietly(BackfillEngine(service, rate=0, batch_size=3, progress_path=path),
+                             '2025-01-01', '2025-03-16')
+
+        assert report['pending'] == 5
+        assert report['saved'] == 1 and report['failed'] == 4
+        assert report['failures'] == {draw_date: 'save_failed' for draw_date in service.unsaved}
+
+        retry = FakeService()
+        report = run_quietly(BackfillEngine(retry, rate=0, progress_path=path), '2025-01-01', '2025-03-16')
+        assert sorted(retry.fetched) == sorted(service.unsaved)
+        assert report['saved'] == 4 and report['failed'] == 0
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(50)
+    start = time.monotonic()
+    threads = [threading.Thread(target=limiter.wait) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 6 ครั้งที่ 50 ครั้ง/วินาที ต้องใช้เวลาอย่างน้อย 5 ช่วง (0.1 วินาที)
+    assert time.monotonic() - start >= 0.09
+
+
+if __name__ == "__main__":
+    test_draw_dates_between()
+    test_backfill_pipeline()
+    test_backfill_resumes_from_progress_file()
+    test_backfill_skips_draw_stored_under_regular_date()
+    test_backfill_only_given_draws()
+    test_force_ignores_progress_file()
+    test_repair_run_keeps_existing_progress()
+    test_save_failures_are_counted_per_draw()
+    test_rate_limiter_spaces_requests()
+    print("✅ ทดสอบ backfill ผ่านทั้งหมด")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ POST /lottery/check/batch (JSON, NDJSON และขีดจำกัดของ request) ไม่ต้องใช้ Supabase / อินเทอร์เน็ต
+"""
+
+import json
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import routes
+from models.schemas import MAX_BATCH_DRAWS, MAX_BATCH_NUMBERS
+from services.draw_calendar import draw_calendar
+from services.lottery_service import LotteryService
+from services.payout_table import PayoutTable
+from services.prize_index import PrizeIndex, prize_index_cache
+from services.prize_rows import build_prize_rows
+from test_prize_rows import SAMPLE_LOTTERY_DATA
+
+DRAW_DATE = SAMPLE_LOTTERY_DATA['draw_date']
+WINNING_NUMBER = SAMPLE_LOTTERY_DATA['first_prize']
+# งวดที่ไม่มีข้อมูล (scrape ไม่ได้)
+MISSING_DATE = draw_calendar.previous(1, DRAW_DATE)
+
+# ผลที่ถูกต้องของงวด DRAW_DATE และเลขที่ไม่ถูกรางวัลใดๆ
+EXPECTED = PrizeIndex(DRAW_DATE, SAMPLE_LOTTERY_DATA['draw_number'], build_prize_rows(SAMPLE_LOTTERY_DATA))
+LOSING_NUMBER = next(f"{i:06d}" for i in range(1000000) if not EXPECTED.check(f"{i:06d}"))
+
+
+class FakeDatabase:
+    supabase = object()
+
+    def __init__(self):
+        self.threads = set()
+
+    def get_draw_prizes(self, draw_date):
+        self.threads.add(threading.current_thread().name)
+        if draw_date == DRAW_DATE:
+            return {'draw_number': SAMPLE_LOTTERY_DATA['draw_number'],
+                    'lottery_prizes': build_prize_rows(SAMPLE_LOTTERY_DATA)}
+        return None
+
+
+class FakeService(LotteryService):
+    """มีเฉพาะงวด DRAW_DATE ในฐานข้อมูล ตารางเงินรางวัลอยู่ในหน่วยความจำ"""
+
+    def __init__(self, broken_number=None):
+        self.db = FakeDatabase()
+        self.broken_number = broken_number
+
+    def scrape_and_save(self, draw_date):
+        return None
+
+    def get_payout_table(self, draw_date):
+        index = self.get_prize_index(draw_date)
+        return PayoutTable.from_prizes(draw_date, index.prizes) if index and index.is_complete else None
+
+    def _build_check_result(self, number, draw_date, index):
+        if number == self.broken_number:
+            raise RuntimeError("index เสีย")
+        return super()._build_check_result(number, draw_date, index)
+
+
+def with_client(test):
+    def run():
+        app = FastAPI()
+        app.include_router(routes.router)
+        original = routes.lottery_service
+        prize_index_cache.invalidate(DRAW_DATE)
+        try:
+            test(TestClient(app))
+        finally:
+            routes.lottery_service = original
+            prize_index_cache.invalidate(DRAW_DATE)
+    run.__name__ = test.__name__
+    return run
+
+
+@with_client
+def test_json_branch(client):
+    routes.lottery_service = FakeService()
+    response = client.post("/lottery/check/batch", json={
+        'numbers': [WINNING_NUMBER, LOSING_NUMBER], 'draw_dates': [DRAW_DATE, MISSING_DATE]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body['total_numbers'] == 2 and body['draw_dates'] == [DRAW_DATE, MISSING_DATE]
+    assert body['total_winners'] == 1
+    assert [(r['number'], r['draw_date']) for r in body['results']] == [
+        (WINNING_NUMBER, DRAW_DATE), (LOSING_NUMBER, DRAW_DATE), (WINNING_NUMBER, MISSING_DATE), (LOSING_NUMBER, MISSING_DATE)
+    ]
+    assert body['results'][0]['message'] == "ถูกรางวัล!" and body['results'][1]['message'] == "ไม่ถูกรางวัล"
+    assert body['results'][2]['results'] == []
+
+
+@with_client
+def test_ndjson_branch_loads_draws_in_io_executor(client):
+    routes.lottery_service = service = FakeService()
+    numbers = [WINNING_NUMBER] + [f"{i:06d}" for i in range(routes.BATCH_STREAM_THRESHOLD)]
+    response = client.post("/lottery/check/batch", json={'numbers': numbers, 'draw_date': DRAW_DATE})
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == len(numbers)
+    assert lines[0]['total_matches'] >= 1
+    assert [line['total_matches'] for line in lines] == [len(EXPECTED.check(number)) for number in numbers]
+
+    # งวดถูกโหลดก่อนเริ่ม stream ใน io_executor ไม่ใช่ใน threadpool ของ Starlette
+    assert service.db.threads and all(name.startswith('lottery-io') for name in service.db.threads)
+
+
+@with_client
+def test_stream_error_is_reported(client):
+    routes.lottery_service = FakeService(broken_number=WINNING_NUMBER)
+    numbers = [f"{i:06d}" for i in range(routes.BATCH_STREAM_THRESHOLD)] + [WINNING_NUMBER]
+    response = client.post("/lottery/check/batch", json={'numbers': numbers, 'draw_date': DRAW_DATE})
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == len(numbers)
+    assert lines[-1]['status'] == 'error' and "index เสีย" in lines[-1]['message']
+
+
+@with_client
+def test_request_limits(client):
+    routes.lottery_service = FakeService()
+    draws = draw_calendar.between('2023-01-01', '2025-12-31')
+
+    assert client.post("/lottery/check/batch", json={
+        'numbers': ['123456'] * MAX_BATCH_NUMBERS, 'draw_date': DRAW_DATE
+    }).status_code == 200
+    assert client.post("/lottery/check/batch", json={
+        'numbers': ['123456'] * (MAX_BATCH_NUMBERS + 1), 'draw_date': DRAW_DATE
+    }).status_code == 422
+
+    assert client.post("/lottery/check/batch", json={
+        'numbers': ['123456'], 'draw_dates': draws[:MAX_BATCH_DRAWS]
+    }).status_code == 200
+    assert client.post("/lottery/check/batch", json={
+        'numbers': ['123456'], 'draw_dates': draws[:MAX_BATCH_DRAWS + 1]
+    }).status_code == 422
+
+    assert client.post("/lottery/check/batch", json={'numbers': ['12345'], 'draw_date': DRAW_DATE}).status_code == 422
+    assert client.post("/lottery/check/batch", json={'numbers': []}).status_code == 422
+    assert client.post("/lottery/check/batch", json={'numbers': ['123456']}).status_code == 400
+
+
+if __name__ == "__main__":
+    test_json_branch()
+    test_ndjson_branch_loads_draws_in_io_executor()
+    test_stream_error_is_reported()
+    test_request_limits()
+    print("✅ ทดสอบตรวจเลขแบบ batch ผ่านทั้งหมด")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบการเช็คความครบของงวดจากจำนวนรางวัลในฐานข้อมูล (Supabase จำลอง ไม่ต้องใช้อินเทอร์เน็ต)
+"""
+
+import contextlib
+import io
+from collections import Counter
+
+from services.cron_jobs import CronJobRunner
+from services.database import DatabaseService
+from services.lottery_service import LotteryService
+from services.prize_index import EXPECTED_PRIZE_COUNTS, EXPECTED_PRIZE_ROWS, prize_index_cache
+from services.prize_rows import PRIZE_TYPE_ALIASES, build_prize_rows
+from test_prize_rows import SAMPLE_LOTTERY_DATA
+
+FULL_COUNTS = dict(Counter(row['prize_type'] for row in build_prize_rows(SAMPLE_LOTTERY_DATA)))
+
+# แถวจาก RPC draw_prize_counts: งวดครบ, งวดที่ยังออกไม่ครบ, งวดที่มีแต่แถวงวด
+RPC_ROWS = (
+    [{'draw_date': '2025-09-16', 'status': 'active', 'prize_type': prize_type, 'prize_count': count}
+     for prize_type, count in FULL_COUNTS.items()]
+    + [{'draw_date': '2025-10-01', 'status': 'partial', 'prize_type': 'first_prize', 'prize_count': 1},
+       {'draw_date': '2025-10-01', 'status': 'partial', 'prize_type': 'fifth_prize', 'prize_count': 40},
+       {'draw_date': '2025-10-16', 'status': 'active', 'prize_type': None, 'prize_count': 0}]
+)
+
+
+class FakeQuery:
+    """query builder ของ supabase-py เฉพาะส่วนที่ใช้ (คืนแถวตาม range)"""
+
+    def __init__(self, rows, error=None):
+        self.rows = rows
+        self.error = error
+        self.ranges = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def range(self, start, end):
+        self.ranges.append((start, end))
+        self._page = self.rows[start:end + 1]
+        return self
+
+    def execute(self):
+        if self.error:
+            raise self.error
+        return type('Result', (), {'data': self._page})()
+
+
+class FakeSupabase:
+    def __init__(self, rpc_rows=None, draws=()):
+        self.rpc_query = FakeQuery(rpc_rows or [], None if rpc_rows is not None else RuntimeError("function not found"))
+        self.table_query = FakeQuery(list(draws))
+
+    def rpc(self, name, params):
+        assert name == 'draw_prize_counts'
+        return self.rpc_query
+
+    def table(self, name):
+        return self.table_query
+
+
+def database(supabase):
+    db = DatabaseService.__new__(DatabaseService)
+    db.supabase = supabase
+    return db
+
+
+def service_with(db):
+    service = LotteryService.__new__(LotteryService)
+    service.db = db
+    return service
+
+
+def test_rpc_counts_are_paginated():
+    supabase = FakeSupabase(rpc_rows=RPC_ROWS)
+    draws = database(supabase).get_prize_counts('2025-09-16', '2025-10-16', page_size=4)
+
+    assert len(supabase.rpc_query.ranges) == len(RPC_ROWS) // 4 + 1
+    assert draws['2025-09-16'] == {'status': 'active', 'counts': FULL_COUNTS}
+    assert draws['2025-10-01']['counts'] == {'first_prize': 1, 'fifth_prize': 40}
+    assert draws['2025-10-16'] == {'status': 'active', 'counts': {}}
+
+
+def test_falls_back_to_prize_types_without_rpc():
+    prizes = [{'prize_type': row['prize_type']} for row in build_prize_rows(SAMPLE_LOTTERY_DATA)]
+    supabase = FakeSupabase(draws=[{'draw_date': '2025-09-16', 'status': 'active', 'lottery_prizes': prizes}])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        draws = database(supabase).get_prize_counts('2025-09-16', '2025-09-16')
+    assert draws == {'2025-09-16': {'status': 'active', 'counts': FULL_COUNTS}}
+
+
+def test_draw_completeness():
+    service = service_with(database(FakeSupabase(rpc_rows=RPC_ROWS)))
+    prize_index_cache.invalidate('2025-09-16')
+
+    complete = service.get_draw_completeness('2025-09-16')
+    assert complete['complete'] and complete['total_prizes'] == EXPECTED_PRIZE_ROWS
+    assert complete['missing'] == {}
+
+    partial = service.get_draw_completeness('2025-10-01')
+    assert not partial['complete'] and partial['status'] == 'partial'
+    assert partial['missing']['fifth_prize'] == 60
+    assert partial['missing']['second_prize'] == EXPECTED_PRIZE_COUNTS['second_prize']
+
+    absent = service.get_draw_completeness('2025-11-01')
+    assert absent['exists'] is False and absent['total_prizes'] == 0
+
+    assert service_with(database(None)).get_draw_completeness('2025-09-16') is None
+
+
+def test_cron_checks_use_counts():
+    cron = CronJobRunner()
+    cron._service = service_with(database(FakeSupabase(rpc_rows=RPC_ROWS)))
+
+    assert cron.check_lottery_data_exists('2025-09-16')['exists']
+
+    rpc_query = cron._service.db.supabase.rpc_query
+    rpc_query.ranges.clear()
+    audit = cron.find_missing_draws('2025-09-01', '2025-11-30')
+    assert audit['checked'] == 6 and audit['complete'] == 1
+    assert [missing['date'] for missing in audit['missing']] == [
+        '2025-09-01', '2025-10-01', '2025-10-16', '2025-11-01', '2025-11-16'
+    ]
+    assert audit['missing'][1]['total_prizes'] == 41
+    assert audit['missing'][0]['missing_prizes'] == EXPECTED_PRIZE_COUNTS
+
+    # ทั้งช่วงใช้ query เดียว (หนึ่งหน้า)
+    assert rpc_query.ranges == [(0, 999)]
+
+
+def test_draw_stored_under_regular_date_is_not_missing():
+    """งวด 30 ธ.ค. 2567 ที่ข้อมูลเก่าบันทึกไว้ที่ 1 ม.ค. 2568 ต้องนับว่ามีแล้ว"""
+    rows = [{'draw_date': draw_date, 'status': 'active', 'prize_type': prize_type, 'prize_count': count}
+            for draw_date in ('2024-12-01', '2024-12-16', '2025-01-01') for prize_type, count in FULL_COUNTS.items()]
+    cron = CronJobRunner()
+    cron._service = service = service_with(database(FakeSupabase(rpc_rows=rows)))
+    prize_index_cache.invalidate('2024-12-30')
+
+    audit = cron.find_missing_draws('2024-12-01', '2024-12-31')
+    assert audit == {'checked': 3, 'complete': 3, 'missing': []}
+    assert cron.check_lottery_data_exists('2024-12-30')['exists']
+    assert service.get_draw_completeness('2025-01-01')['complete']
+
+
+def test_server_named_prize_types_count_as_complete():
+    """งวดที่บันทึกผ่าน server.py (prize_type first/second/...) ครบ 173 รางวัลต้องนับว่าครบ"""
+    server_names = {alias: name for name, alias in PRIZE_TYPE_ALIASES.items()}
+    server_rows = [dict(row, prize_type=server_names.get(row['prize_type'], row['prize_type']))
+                   for row in build_prize_rows(SAMPLE_LOTTERY_DATA)]
+    server_counts = Counter(row['prize_type'] for row in server_rows)
+    assert 'first' in server_counts and 'first_prize' not in server_counts
+
+    rpc_rows = [{'draw_date': '2025-09-16', 'status': 'active', 'prize_type': prize_type, 'prize_count': count}
+                for prize_type, count in server_counts.items()]
+    table_rows = [{'draw_date': '2025-09-16', 'status': 'active',
+                   'lottery_prizes': [{'prize_type': row['prize_type']} for row in server_rows]}]
+
+    for supabase in (FakeSupabase(rpc_rows=rpc_rows), FakeSupabase(draws=table_rows)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert database(supabase).get_prize_counts('2025-09-16', '2025-09-16')['2025-09-16']['counts'] == FULL_COUNTS
+
+        cron = CronJobRunner()
+        cron._service = service_with(database(supabase))
+        prize_index_cache.invalidate('2025-09-16')
+        with contextlib.redirect_stdout(io.StringIO()):
+            completeness = cron._service.get_draw_completeness('2025-09-16')
+            audit = cron.find_missing_draws('2025-09-16', '2025-09-16')
+        assert completeness['complete'] and completeness['missing'] == {}
+        assert audit['missing'] == []
+
+    # index ในหน่วยความจำที่สร้างจากแถวแบบ server.py
+    prize_index_cache.put('2025-09-16', '16/2568', server_rows)
+    try:
+        completeness = service_with(database(None)).get_draw_completeness('2025-09-16')
+        assert completeness['complete'] and completeness['counts'] == FULL_COUNTS
+    finally:
+        prize_index_cache.invalidate('2025-09-16')
+
+
+if __name__ == "__main__":
+    test_rpc_counts_are_paginated()
+    test_falls_back_to_prize_types_without_rpc()
+    test_draw_completeness()
+    test_cron_checks_use_counts()
+    test_draw_stored_under_regular_date_is_not_missing()
+    test_server_named_prize_types_count_as_complete()
+    print("✅ ทดสอบการเช็คความครบของงวดผ่านทั้งหมด")
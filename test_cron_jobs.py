@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบงาน cron ที่รันใน process (ไม่ต้องเรียก API ผ่าน HTTP และไม่ต้องใช้อินเทอร์เน็ต)
+"""
+
+import contextlib
+import io
+from datetime import datetime
+
+import requests
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import cron_service as cron_routes
+from benchmark_html_parser import load_fixture
+from services.cron_jobs import CronJobRunner
+from services.lottery_service import LotteryService, completeness_summary
+from services.prize_index import EXPECTED_PRIZE_COUNTS, EXPECTED_PRIZE_ROWS
+
+DRAW_DATE = '2025-10-01'
+
+
+class FakeService(LotteryService):
+    """ใช้ parse_draw_page ตัวจริง แต่ fetch จากไฟล์ และบันทึก/เช็คความครบจาก dict"""
+
+    def __init__(self, stored=None, status_code=None):
+        self.stored = dict(stored or {})
+        self.status_code = status_code
+        self.saved = []
+        self.queries = 0
+
+    def fetch_draw_page(self, draw_date, session=None, throttle=None):
+        if self.status_code:
+            response = requests.Response()
+            response.status_code = self.status_code
+            raise requests.HTTPError(str(self.status_code), response=response)
+        return load_fixture()
+
+    def save_to_database(self, lottery_data, status='active'):
+        self.saved.append((lottery_data['draw_date'], status))
+        return True
+
+    def get_completeness(self, start_date, end_date=None):
+        self.queries += 1
+        return {
+            draw_date: completeness_summary(draw_date, counts, 'active')
+            for draw_date, counts in self.stored.items()
+            if start_date <= draw_date <= (end_date or start_date)
+        }
+
+    def get_draw_completeness(self, draw_date):
+        if draw_date not in self.stored:
+            return completeness_summary(draw_date, {}, None)
+        return completeness_summary(draw_date, self.stored[draw_date], 'active')
+
+
+def run_quietly(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def test_complete_draw_is_not_fetched():
+    service = FakeService(stored={DRAW_DATE: dict(EXPECTED_PRIZE_COUNTS)})
+    result = run_quietly(CronJobRunner(service).scrape_draw, DRAW_DATE)
+
+    assert result['status'] == 'already_exists'
+    assert result['total_prizes'] == EXPECTED_PRIZE_ROWS
+    assert result['bytes_fetched'] == 0 and 'fetch' not in result['timings_ms']
+    assert service.saved == []
+
+
+def test_scrape_saves_in_process_with_timings():
+    service = FakeService()
+    result = run_quietly(CronJobRunner(service).scrape_draw, DRAW_DATE)
+
+    assert result['status'] == 'success' and result['complete']
+    assert result['tiers'] == EXPECTED_PRIZE_COUNTS
+    assert result['total_prizes'] == EXPECTED_PRIZE_ROWS
+    assert result['bytes_fetched'] == len(load_fixture())
+    assert set(result['timings_ms']) == {'check', 'fetch', 'parse', 'save', 'total'}
+    assert service.saved == [(DRAW_DATE, 'active')]
+
+    # force ข้ามการเช็คความครบ
+    forced = run_quietly(CronJobRunner(FakeService(stored={DRAW_DATE: dict(EXPECTED_PRIZE_COUNTS)})).scrape_draw,
+                         DRAW_DATE, force=True)
+    assert forced['status'] == 'success' and 'check' not in forced['timings_ms']
+
+
+def test_missing_page_fails_without_saving():
+    service = FakeService(status_code=404)
+    result = run_quietly(CronJobRunner(service).scrape_draw, DRAW_DATE)
+
+    assert result['status'] == 'failed' and result['error'] == 'not_found'
+    assert service.saved == []
+
+
+def test_should_scrape_today():
+    complete = CronJobRunner(FakeService(stored={DRAW_DATE: dict(EXPECTED_PRIZE_COUNTS)}))
+
+    assert complete.should_scrape_today(datetime(2025, 10, 16)) == (True, 'lottery_day')
+    assert complete.should_scrape_today(datetime(2025, 10, 5)) == (False, 'data_exists')
+    # งวด 16 ม.ค. เลื่อนไปออก 17 ม.ค.
+    assert complete.should_scrape_today(datetime(2025, 1, 17)) == (True, 'lottery_day')
+    assert complete.should_scrape_today(datetime(2025, 1, 16)) == (True, 'missing_data')
+
+    partial = CronJobRunner(FakeService(stored={DRAW_DATE: {'first_prize': 1}}))
+    assert partial.should_scrape_today(datetime(2025, 10, 5)) == (True, 'missing_data')
+
+
+class FakeBackfill:
+    def __init__(self, running=False):
+        self.running = running
+        self.started = []
+        self.ran = []
+
+    def start_background(self, start_date, end_date, **kwargs):
+        if self.running:
+            return False
+        self.started.append(kwargs)
+        return True
+
+    def run(self, start_date, end_date, **kwargs):
+        if self.running:
+            raise RuntimeError("มี backfill กำลังรันอยู่")
+        self.ran.append(kwargs)
+        return {'saved': len(kwargs['draw_dates']), 'failed': 0}
+
+
+def test_check_missing_route_repairs():
+    """เช็คหลายปีด้วย query เดียว และ repair=true ส่งเฉพาะงวดที่ขาดไปให้ backfill"""
+    app = FastAPI()
+    app.include_router(cron_routes.router)
+    client = TestClient(app)
+
+    stored = {draw_date: dict(EXPECTED_PRIZE_COUNTS) for draw_date in ('2021-01-17', '2023-06-16', '2025-10-01')}
+    stored['2024-02-16'] = {'first_prize': 1}
+    service = FakeService(stored=stored)
+    original_service, original_backfill = cron_routes.cron_service, cron_routes.backfill_engine
+    cron_routes.cron_service = CronJobRunner(service)
+    cron_routes.backfill_engine = FakeBackfill()
+    try:
+        response = client.get("/cron/check-missing", params={'start_date': '2021-01-01', 'end_date': '2025-12-31'})
+        assert response.status_code == 200
+        body = response.json()
+        assert body['total_checked'] == 5 * 24
+        assert body['total_missing'] == 5 * 24 - 3
+        assert '2024-02-16' in [missing['date'] for missing in body['missing_dates']]
+        assert service.queries == 1 and 'repair' not in body
+
+        repaired = client.get("/cron/check-missing", params={'start_date': '2025-09-01', 'end_date': '2025-10-16',
+                                                             'repair': 'true'}).json()
+        assert repaired['repair'] == 'started'
+        assert cron_routes.backfill_engine.started[0]['draw_dates'] == ['2025-09-01', '2025-09-16', '2025-10-16']
+
+        cron_routes.backfill_engine.running = True
+        assert client.get("/cron/check-missing", params={'start_date': '2025-09-01',
+                                                         'repair': 'true'}).json()['repair'] == 'backfill_running'
+
+        assert client.get("/cron/check-missing", params={'start_date': '2025-13-01'}).status_code == 400
+    finally:
+        cron_routes.cron_service, cron_routes.backfill_engine = original_service, original_backfill
+
+
+def test_serverless_runs_repair_in_request():
+    """บน serverless ซ่อมให้เสร็จใน request และไม่เริ่ม backfill ใน thread เบื้องหลัง"""
+    app = FastAPI()
+    app.include_router(cron_routes.router)
+    client = TestClient(app)
+
+    original = cron_routes.cron_service, cron_routes.backfill_engine, cron_routes.SERVERLESS
+    cron_routes.cron_service = CronJobRunner(FakeService())
+    cron_routes.backfill_engine = backfill = FakeBackfill()
+    cron_routes.SERVERLESS = True
+    try:
+        repaired = client.get("/cron/check-missing", params={'start_date': '2025-09-01', 'end_date': '2025-10-16',
+                                                             'repair': 'true'}).json()
+        assert repaired['repair'] == 'done' and repaired['repair_report']['saved'] == 4
+        assert backfill.ran[0]['draw_dates'] == ['2025-09-01', '2025-09-16', '2025-10-01', '2025-10-16']
+        assert backfill.started == []
+
+        backfill.running = True
+        assert client.get("/cron/check-missing", params={'start_date': '2025-09-01',
+                                                         'repair': 'true'}).json()['repair'] == 'backfill_running'
+
+        response = client.post("/cron/backfill", params={'start_date': '2025-01-01', 'end_date': '2025-02-01'})
+        assert response.status_code == 501 and backfill.started == []
+    finally:
+        cron_routes.cron_service, cron_routes.backfill_engine, cron_routes.SERVERLESS = original
+
+
+if __name__ == "__main__":
+    test_complete_draw_is_not_fetched()
+    test_scrape_saves_in_process_with_timings()
+    test_missing_page_fails_without_saving()
+    test_should_scrape_today()
+    test_check_missing_route_repairs()
+    test_serverless_runs_repair_in_request()
+    print("✅ ทดสอบงาน cron ใน process ผ่านทั้งหมด")
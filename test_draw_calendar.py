@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบปฏิทินงวด (งวดที่เลื่อนวันออก, current/next/previous และการ validate วันที่)
+"""
+
+from datetime import date, timedelta
+
+from pydantic import ValidationError
+
+from models.schemas import LotteryCheckRequest
+from services.draw_calendar import DrawCalendar, draw_calendar
+
+
+def test_moved_and_cancelled_draws():
+    # 1 ม.ค. -> 30 ธ.ค., 16 ม.ค. -> 17 ม.ค., 1 พ.ค. -> 2 พ.ค.
+    assert draw_calendar.between('2024-12-01', '2025-05-31') == [
+        '2024-12-01', '2024-12-16', '2024-12-30', '2025-01-17', '2025-02-01', '2025-02-16',
+        '2025-03-01', '2025-03-16', '2025-04-01', '2025-04-16', '2025-05-02', '2025-05-16'
+    ]
+    assert draw_calendar.between('2020-03-01', '2020-06-01') == ['2020-03-01', '2020-03-16', '2020-05-16', '2020-06-01']
+    assert not draw_calendar.is_draw_date('2025-01-16')
+    assert draw_calendar.is_draw_date('2025-01-17')
+    assert draw_calendar.resolve('2025-01-01') == '2024-12-30'
+    assert draw_calendar.resolve('2020-04-16') is None
+    assert draw_calendar.resolve('2025-10-05') is None
+
+
+def test_current_next_previous():
+    assert draw_calendar.current('2025-10-18') == '2025-10-16'
+    assert draw_calendar.current('2025-10-16') == '2025-10-16'
+    assert draw_calendar.next('2025-10-16') == '2025-11-01'
+    assert draw_calendar.previous(1, '2025-10-18') == '2025-10-01'
+    assert draw_calendar.previous(0, '2025-10-18') == '2025-10-16'
+
+    # ข้ามปี: งวด 1 ม.ค. ออก 30 ธ.ค. ก่อนหน้า
+    assert draw_calendar.next('2024-12-20') == '2024-12-30'
+    assert draw_calendar.current('2025-01-10') == '2024-12-30'
+    assert draw_calendar.previous(2, '2025-01-20') == '2024-12-16'
+
+
+def test_recurring_moves_every_year():
+    """งวดที่เลื่อนทุกปีต้องถูกต้องถึงสิ้นปฏิทินและปีถัดไป ไม่ใช่แค่ปีที่อยู่ในตาราง"""
+    assert draw_calendar.end.year >= 2027
+    for year in range(2026, draw_calendar.end.year + 2):
+        assert draw_calendar.is_draw_date(f"{year - 1}-12-30"), year
+        assert not draw_calendar.is_draw_date(f"{year}-01-01"), year
+        assert draw_calendar.is_draw_date(f"{year}-01-17") and not draw_calendar.is_draw_date(f"{year}-01-16"), year
+        assert draw_calendar.is_draw_date(f"{year}-05-02") and not draw_calendar.is_draw_date(f"{year}-05-01"), year
+
+    assert draw_calendar.next('2026-12-20') == '2026-12-30'
+    assert draw_calendar.next('2026-12-30') == '2027-01-17'
+    assert draw_calendar.current('2027-01-05') == '2026-12-30'
+    assert draw_calendar.resolve('2027-01-01') == '2026-12-30'
+    assert draw_calendar.aliases('2026-12-30') == ['2026-12-30', '2027-01-01']
+
+    # ปีหลังสิ้นปฏิทิน (คำนวณนอกตาราง) ได้ผลเหมือนกัน
+    later = draw_calendar.end.year + 3
+    assert draw_calendar.next(f"{later - 1}-12-20") == f"{later - 1}-12-30"
+    assert draw_calendar.between(f"{later}-01-01", f"{later}-01-31") == [f"{later}-01-17"]
+
+
+def test_lookups_match_brute_force():
+    calendar = DrawCalendar('2019-01-01', '2021-12-31')
+    draws = [date.fromisoformat(draw) for draw in calendar.between('2018-11-01', '2022-02-28')]
+    day = calendar.start
+    while day <= calendar.end:
+        assert calendar.current(day) == max(draw for draw in draws if draw <= day).isoformat()
+        assert calendar.next(day) == min(draw for draw in draws if draw > day).isoformat()
+        assert calendar.is_draw_date(day) == (day in draws)
+        day += timedelta(days=1)
+
+    # นอกช่วงที่คำนวณไว้ยังได้ผลเหมือนกัน
+    assert calendar.current('2025-01-10') == '2024-12-30'
+    assert calendar.next('2025-01-01') == '2025-01-17'
+    assert calendar.previous(3, '2018-06-20') == '2018-05-01'
+    assert calendar.is_draw_date('2024-12-30') and not calendar.is_draw_date('2025-01-01')
+
+
+def test_stored_regular_date_aliases():
+    """ข้อมูลเก่าบันทึกงวดที่เลื่อนไว้ที่วันปกติ ค้นได้ทั้งสองวัน"""
+    assert draw_calendar.aliases('2024-12-30') == ['2024-12-30', '2025-01-01']
+    assert draw_calendar.aliases('2025-01-01') == ['2025-01-01', '2024-12-30']
+    assert draw_calendar.aliases('2025-10-16') == ['2025-10-16']
+    assert draw_calendar.aliases('2020-04-16') == ['2020-04-16']
+
+    # งวด 30 ธ.ค. อาจอยู่ที่ 1 ม.ค. นอกช่วงที่ขอ
+    assert draw_calendar.stored_range('2024-12-01', '2024-12-31') == ('2024-12-01', '2025-01-01')
+    assert draw_calendar.stored_range('2025-02-01', '2025-02-28') == ('2025-02-01', '2025-02-28')
+
+
+def test_validation_messages():
+    assert LotteryCheckRequest(number='123456', draw_date='2025-01-17').draw_date == '2025-01-17'
+    # วันปกติของงวดที่เลื่อนยังใช้ได้ (ข้อมูลเก่าบันทึกไว้ที่วันนั้น)
+    assert LotteryCheckRequest(number='123456', draw_date='2025-01-16').draw_date == '2025-01-16'
+
+    for draw_date, message in [('2020-04-16', 'งดออกรางวัล'),
+                               ('2025-10-05', 'ไม่ใช่วันที่ 5'),
+                               ('2025-13-01', 'รูปแบบวันที่ไม่ถูกต้อง')]:
+        try:
+            LotteryCheckRequest(number='123456', draw_date=draw_date)
+        except ValidationError as e:
+            assert message in str(e), str(e)
+        else:
+            raise AssertionError(f"{draw_date} ต้องไม่ผ่าน validation")
+
+
+if __name__ == "__main__":
+    test_moved_and_cancelled_draws()
+    test_current_next_previous()
+    test_recurring_moves_every_year()
+    test_lookups_match_brute_force()
+    test_stored_regular_date_aliases()
+    test_validation_messages()
+    print("✅ ทดสอบปฏิทินงวดผ่านทั้งหมด")
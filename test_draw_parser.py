@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ parser กลางของหน้าตรวจหวย (ลำดับ strategy, short-circuit และสถิติ) กับ sanook_page.html
+"""
+
+import contextlib
+import io
+import re
+
+from benchmark_html_parser import load_fixture
+from services.draw_parser import DrawPageParser, ParseStrategy, CssStrategy, TextStrategy
+from services.html_parser import load_page
+from services.prize_index import EXPECTED_PRIZE_ROWS
+from services.prize_rows import build_prize_rows
+from test_html_parser import EXPECTED_MAIN_PRIZES
+
+DRAW_DATE = '2025-10-01'
+
+# หน้าเดียวกันแต่ไม่มี JSON-LD (บังคับให้ใช้ strategy ถัดไป)
+WITHOUT_JSON_LD = re.sub(rb'<script[^>]*ld\+json[^>]*>.*?</script>', b'', load_fixture(), flags=re.DOTALL)
+
+# ไม่มีทั้ง JSON-LD และ class ของ column เหลือแต่ข้อความ
+TEXT_ONLY_HTML = """
+<div><h3>รางวัลที่ 1</h3><p>รางวัลละ 6,000,000 บาท</p><b>123456</b></div>
+<div><h3>เลขหน้า 3 ตัว</h3><p>2 รางวัลๆละ 4,000 บาท</p><b>111</b> <b>222</b></div>
+<div><h3>เลขท้าย 3 ตัว</h3><p>2 รางวัลๆละ 4,000 บาท</p><b>333</b> <b>444</b></div>
+<div><h3>เลขท้าย 2 ตัว</h3><p>1 รางวัลๆละ 2,000 บาท</p><b>55</b></div>
+"""
+
+
+def parse_quietly(parser, content):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser.parse(content, DRAW_DATE)
+
+
+def test_json_ld_short_circuits():
+    parser = DrawPageParser()
+    lottery_data = parse_quietly(parser, load_fixture())
+
+    assert lottery_data['draw_number'] == '1/2568'
+    assert len(build_prize_rows(lottery_data)) == EXPECTED_PRIZE_ROWS
+    metrics = parser.metrics()
+    assert metrics['json_ld']['hits'] == 1 and metrics['json_ld']['avg_ms'] is not None
+    assert metrics['css']['calls'] == 0 and metrics['text']['calls'] == 0
+
+
+def test_falls_back_to_css_then_stops():
+    parser = DrawPageParser()
+    lottery_data = parse_quietly(parser, WITHOUT_JSON_LD)
+
+    assert {key: lottery_data[key] for key in EXPECTED_MAIN_PRIZES} == EXPECTED_MAIN_PRIZES
+    metrics = parser.metrics()
+    assert metrics['json_ld'] == dict(metrics['json_ld'], calls=1, hits=0, hit_rate=0.0)
+    assert metrics['css']['hits'] == 1
+    assert metrics['text']['calls'] == 0
+
+
+def test_text_strategy_skips_amount_lines():
+    """บรรทัดเงินรางวัล (4,000 บาท) ต้องไม่ถูกนับเป็นเลขรางวัล"""
+    prizes = TextStrategy().extract(load_page(TEXT_ONLY_HTML))
+    assert prizes == {
+        'first_prize': '123456',
+        'second_prize_1': '111',
+        'second_prize_2': '222',
+        'third_prize_1': '333',
+        'third_prize_2': '444',
+        'fourth_prize_1': '55'
+    }
+
+    # ข้อความทั้งหน้าจริงได้ครบทุกรางวัลเหมือน JSON-LD
+    rows = build_prize_rows(dict(TextStrategy().extract(load_page(WITHOUT_JSON_LD)), draw_date=DRAW_DATE))
+    assert len(rows) == EXPECTED_PRIZE_ROWS
+
+
+def test_later_strategies_fill_missing_keys_and_errors_are_counted():
+    class Broken(ParseStrategy):
+        name = 'broken'
+
+        def extract(self, page):
+            raise ValueError("bad markup")
+
+    class FirstOnly(ParseStrategy):
+        name = 'first_only'
+
+        def extract(self, page):
+            return {'first_prize': '999999'}
+
+    parser = DrawPageParser([Broken(), FirstOnly(), CssStrategy(), TextStrategy()])
+    lottery_data = parse_quietly(parser, TEXT_ONLY_HTML)
+
+    # รางวัลที่ 1 จาก strategy ที่พบก่อน ส่วนที่เหลือเติมจาก text
+    assert lottery_data['first_prize'] == '999999'
+    assert lottery_data['fourth_prize_1'] == '55'
+    metrics = parser.metrics()
+    assert metrics['broken']['errors'] == 1
+    assert metrics['css']['hits'] == 0
+    assert metrics['text']['calls'] == 1
+
+
+def test_strategy_must_implement_extract():
+    class Unfinished(ParseStrategy):
+        name = 'unfinished'
+
+    try:
+        Unfinished()
+        raise AssertionError("ควร error เมื่อไม่ได้ override extract")
+    except TypeError:
+        pass
+
+
+def test_scraper_keeps_json_ld_fast_path():
+    """main.py หา link งวดล่าสุดจาก bytes จึงไม่สร้าง DOM เมื่อ JSON-LD มีรางวัลครบ"""
+    import main
+
+    scraper = main.LotteryScraper.__new__(main.LotteryScraper)
+    page = load_page(load_fixture())
+    with contextlib.redirect_stdout(io.StringIO()):
+        prizes = scraper._extract_prizes(page)
+
+    assert prizes['first_prize'] == EXPECTED_MAIN_PRIZES['first_prize']
+    assert page._dom is None
+
+
+def test_no_first_prize_returns_none():
+    assert parse_quietly(DrawPageParser(), b'<html><body>no result yet</body></html>') is None
+
+
+if __name__ == "__main__":
+    test_json_ld_short_circuits()
+    test_falls_back_to_css_then_stops()
+    test_text_strategy_skips_amount_lines()
+    test_later_strategies_fill_missing_keys_and_errors_are_counted()
+    test_strategy_must_implement_extract()
+    test_scraper_keeps_json_ld_fast_path()
+    test_no_first_prize_returns_none()
+    print("✅ ทดสอบ parser กลางผ่านทั้งหมด")
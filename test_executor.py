@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ thread pool สำหรับงาน I/O ที่ block (ไม่ต้องใช้ Supabase)
+"""
+
+import asyncio
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api.routes as routes
+from services.executor import BoundedExecutor, ExecutorOverloaded
+
+
+def test_blocking_calls_do_not_stall_event_loop():
+    """งาน sync ที่ช้าต้องรันพร้อมกันได้ และ event loop ยังตอบงานอื่นระหว่างรอ"""
+    executor = BoundedExecutor(max_workers=10, max_pending=20, name="test-io")
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        start = time.monotonic()
+        results = await asyncio.gather(*(executor.run(time.sleep, 0.2) for _ in range(10)))
+        elapsed = time.monotonic() - start
+        tick_task.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(main())
+    print(f"10 งาน x 0.2 วินาที ใช้เวลา {elapsed:.2f} วินาที, event loop ทำงาน {ticks} รอบ")
+    assert len(results) == 10
+    assert elapsed < 1.0
+    assert ticks > 5
+
+    metrics = executor.metrics()
+    print(f"metrics: {metrics}")
+    assert metrics["completed"] == 10
+    assert metrics["active"] == 0 and metrics["queued"] == 0
+    executor.shutdown()
+
+
+def test_rejects_when_full():
+    """เมื่องานค้างเต็มต้องปฏิเสธทันที ไม่ต่อคิวไม่จำกัด"""
+    executor = BoundedExecutor(max_workers=1, max_pending=2, name="test-full")
+
+    async def main():
+        tasks = [asyncio.create_task(executor.run(time.sleep, 0.2)) for _ in range(2)]
+        await asyncio.sleep(0)
+        try:
+            await executor.run(time.sleep, 0)
+            raise AssertionError("ควรถูกปฏิเสธ")
+        except ExecutorOverloaded:
+            pass
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert executor.metrics()["rejected"] == 1
+    executor.shutdown()
+
+
+def test_cancelled_waiters_still_count_until_done():
+    """ผู้รอที่ถูกยกเลิก (client ตัดการเชื่อมต่อ) ไม่ทำให้งานที่ยังรันอยู่หายจากการนับ"""
+    executor = BoundedExecutor(max_workers=1, max_pending=2, name="test-cancel")
+    release = threading.Event()
+
+    async def main():
+        tasks = [asyncio.create_task(executor.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # งานแรกยังรันอยู่ใน thread ต้องยังนับเป็นงานค้าง ส่วนงานที่ยังไม่เริ่มถูกยกเลิกได้จริงจึงไม่นับ
+        assert executor.metrics()["active"] == 1
+        with executor._lock:
+            assert executor._pending == 1
+        try:
+            executor.max_pending = 1
+            await executor.run(time.sleep, 0)
+            raise AssertionError("ควรถูกปฏิเสธ งานที่รันอยู่ยังใช้ที่ในคิว")
+        except ExecutorOverloaded:
+            pass
+
+        release.set()
+        await asyncio.sleep(0.05)
+        assert executor.metrics()["active"] == 0 and executor.metrics()["queued"] == 0
+        with executor._lock:
+            assert executor._pending == 0
+
+    asyncio.run(main())
+    executor.shutdown()
+
+
+def test_route_returns_503_when_overloaded():
+    """route ตอบ 503 พร้อม Retry-After เมื่อ executor เต็ม"""
+    app = FastAPI()
+    app.include_router(routes.router)
+    client = TestClient(app)
+
+    original = routes.io_executor.max_pending
+    routes.io_executor.max_pending = 0
+    try:
+        response = client.post("/lottery/check", json={"number": "123456", "draw_date": "2025-10-01"})
+    finally:
+        routes.io_executor.max_pending = original
+
+    print(f"status: {response.status_code}, {response.json()}")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+    metrics = client.get("/health/executor").json()
+    assert metrics["rejected"] >= 1
+
+
+if __name__ == "__main__":
+    test_blocking_calls_do_not_stall_event_loop()
+    test_rejects_when_full()
+    test_cancelled_waiters_still_count_until_done()
+    test_route_returns_503_when_overloaded()
+    print("✅ ทดสอบ executor ผ่านทั้งหมด")
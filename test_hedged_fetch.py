@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ hedged fetch หลายแหล่ง (แหล่งจำลองที่หน่วงเวลาไว้ ไม่ต้องใช้อินเทอร์เน็ต)
+"""
+
+import contextlib
+import io
+import time
+
+from services.hedged_fetch import HedgedFetcher, SourceStats
+
+
+def slow(result, delay):
+    def fetch():
+        time.sleep(delay)
+        return result
+    return fetch
+
+
+def failing(delay=0.0):
+    def fetch():
+        time.sleep(delay)
+        raise ConnectionError("down")
+    return fetch
+
+
+def fetch_quietly(fetcher, sources, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.monotonic()
+        result = fetcher.fetch(sources, **kwargs)
+        return result, time.monotonic() - start
+
+
+def test_percentile():
+    stats = SourceStats()
+    for latency in range(1, 101):
+        stats.record(latency / 100, True)
+    stats.record(9.0, False)
+    assert stats.percentile(0.5) == 0.5
+    assert stats.percentile(0.95) == 0.95
+    assert round(stats.success_rate, 3) == round(100 / 101, 3)
+
+
+def test_fast_primary_does_not_hedge():
+    fetcher = HedgedFetcher(default_delay=0.5)
+    calls = []
+    result, elapsed = fetch_quietly(fetcher, [
+        ('primary', slow('A', 0.05)),
+        ('backup', lambda: calls.append('backup') or 'B'),
+    ])
+    assert result == ('primary', 'A')
+    assert calls == []
+    assert elapsed < 0.3
+
+
+def test_slow_primary_is_hedged_by_backup():
+    """primary ช้ากว่า hedge delay ต้องได้ผลจาก backup โดยไม่ต้องรอ primary จบ"""
+    fetcher = HedgedFetcher(default_delay=0.1)
+    result, elapsed = fetch_quietly(fetcher, [
+        ('primary', slow('A', 1.0)),
+        ('backup', slow('B', 0.05)),
+    ])
+    assert result == ('backup', 'B')
+    assert elapsed < 0.5
+
+
+def test_invalid_and_failed_results_move_on_immediately():
+    fetcher = HedgedFetcher(default_delay=5)
+    result, elapsed = fetch_quietly(fetcher, [
+        ('api', slow({'first_prize': ''}, 0.01)),
+        ('primary', failing(0.01)),
+        ('backup', slow({'first_prize': '123456'}, 0.01)),
+    ], validate=lambda data: bool(data.get('first_prize')))
+    assert result == ('backup', {'first_prize': '123456'})
+    assert elapsed < 1
+
+    metrics = fetcher.metrics()
+    assert metrics['api']['success_rate'] == 0
+    assert metrics['primary']['success_rate'] == 0
+    assert metrics['backup']['success_rate'] == 1
+
+
+def test_all_sources_fail():
+    result, _ = fetch_quietly(HedgedFetcher(default_delay=0.05), [('primary', failing()), ('backup', lambda: None)])
+    assert result is None
+
+
+def test_stats_drive_hedge_delay():
+    fetcher = HedgedFetcher(min_delay=0.01, max_delay=1, default_delay=0.5)
+    assert fetcher.hedge_delay('primary') == 0.5
+
+    for _ in range(20):
+        fetch_quietly(fetcher, [('primary', slow('A', 0.02))])
+    assert 0.01 <= fetcher.hedge_delay('primary') < 0.1
+
+    # แหล่งที่ล้มเหลวบ่อย hedge ทันที
+    for _ in range(10):
+        fetch_quietly(fetcher, [('flaky', failing())])
+    assert fetcher.hedge_delay('flaky') == 0.0
+
+
+if __name__ == "__main__":
+    test_percentile()
+    test_fast_primary_does_not_hedge()
+    test_slow_primary_is_hedged_by_backup()
+    test_invalid_and_failed_results_move_on_immediately()
+    test_all_sources_fail()
+    test_stats_drive_hedge_delay()
+    print("✅ ทดสอบ hedged fetch ผ่านทั้งหมด")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ index ประวัติเลขรางวัลย้อนหลัง (ไม่ต้องใช้ Supabase)
+"""
+
+import time
+from types import SimpleNamespace
+
+import server
+from services.history_index import NumberHistoryIndex
+
+
+def make_prizes(first_prize, back_2):
+    """สร้างรางวัลตัวอย่างของหนึ่งงวด"""
+    return [
+        {'prize_type': 'first', 'prize_number': first_prize, 'position': 1, 'amount': 6000000},
+        {'prize_type': 'back_2', 'prize_number': back_2, 'position': 1, 'amount': 2000},
+    ]
+
+
+def test_lookup_sorted_by_latest_draw():
+    """ผลลัพธ์ต้องเรียงจากงวดล่าสุด"""
+    index = NumberHistoryIndex()
+    index.add_draw("2025-09-01", "1/2568", make_prizes("111111", "26"))
+    index.add_draw("2025-10-16", "16/2568", make_prizes("222222", "26"))
+    index.add_draw("2025-10-01", "1/2568", make_prizes("333333", "26"))
+
+    results = index.lookup("26")
+    print(f"ประวัติเลข 26: {results}")
+    assert [r['draw_date'] for r in results] == ["2025-10-16", "2025-10-01", "2025-09-01"]
+    assert results[0]['prizes'][0]['prize_name'] == 'เลขท้าย 2 ตัว'
+    assert index.lookup("999999") == []
+
+
+def test_resave_draw_replaces_entries():
+    """บันทึกงวดเดิมซ้ำต้องแทนที่ข้อมูลเก่า ไม่ใช่เพิ่มซ้ำ"""
+    index = NumberHistoryIndex()
+    index.add_draw("2025-10-16", "16/2568", make_prizes("222222", "26"))
+    index.add_draw("2025-10-16", "16/2568", make_prizes("444444", "26"))
+
+    assert index.lookup("222222") == []
+    assert len(index.lookup("26")[0]['prizes']) == 1
+
+
+def test_load_rows_from_join():
+    """โหลดแถวที่ join กับ lottery_draws"""
+    rows = [dict(prize, lottery_draws={'draw_date': "2025-10-16", 'draw_number': "16/2568"})
+            for prize in make_prizes("222222", "26")]
+
+    index = NumberHistoryIndex()
+    index.load_rows(rows)
+    assert index.loaded
+    assert index.lookup("222222")[0]['draw_number'] == "16/2568"
+
+
+def test_lookup_speed_with_many_draws():
+    """จำนวนงวดเพิ่มขึ้นแต่เวลาค้นหาต้องไม่ขึ้นกับจำนวนงวด"""
+    index = NumberHistoryIndex()
+    for i in range(480):  # ประมาณ 20 ปี
+        index.add_draw(f"draw-{i:04d}", str(i), make_prizes(f"{i:06d}", f"{i % 100:02d}"))
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        index.lookup("000123")
+    elapsed = (time.perf_counter() - start) / 1000
+    print(f"เวลาค้นหาเฉลี่ย: {elapsed * 1e6:.1f} µs")
+    assert len(index.lookup("26")) == 5
+
+
+class FakePrizeQuery:
+    """query ของ lottery_prizes แบบย่อ (select / gt / order / limit)"""
+
+    def __init__(self, db):
+        self.db = db
+        self.rows = list(db.rows)
+        self.count = None
+        self.ordered = False
+
+    def select(self, columns, count=None):
+        if count:
+            self.count = len(self.db.rows)
+        return self
+
+    def gt(self, column, value):
+        self.rows = [row for row in self.rows if row[column] > value]
+        return self
+
+    def order(self, column, desc=False):
+        self.ordered = True
+        self.rows.sort(key=lambda row: row[column], reverse=desc)
+        return self
+
+    def limit(self, n):
+        self.rows = self.rows[:n]
+        return self
+
+    def execute(self):
+        # ไม่มี order ฐานข้อมูลจริงคืนแถวลำดับใดก็ได้
+        assert self.ordered, "ต้องแบ่งหน้าตามลำดับ id"
+        self.db.queries += 1
+        return SimpleNamespace(data=self.rows, count=self.count)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.rows = []
+        self.queries = 0
+
+    def save_draw(self, draw_date, first_prize):
+        """แทนที่รางวัลของงวดด้วยแถวใหม่ (id ใหม่) เหมือน upsert_lottery_draw"""
+        self.rows = [row for row in self.rows if row['lottery_draws']['draw_date'] != draw_date]
+        next_id = max((row['id'] for row in self.rows), default=0) + 1
+        for offset, prize in enumerate(make_prizes(first_prize, first_prize[-2:])):
+            self.rows.append(dict(prize, id=next_id + offset,
+                                  lottery_draws={'draw_date': draw_date, 'draw_number': draw_date}))
+
+    def table(self, name):
+        assert name == 'lottery_prizes'
+        return FakePrizeQuery(self)
+
+
+def test_server_reloads_history_written_elsewhere():
+    """draw ที่ process อื่นบันทึกต้องเข้า index หลัง HISTORY_INDEX_TTL และโหลดครบทุกหน้า"""
+    db = FakeSupabase()
+    for i in range(5):
+        db.save_draw(f"2025-0{i + 1}-01", f"{i:06d}")
+
+    api = server.LotteryAPI.__new__(server.LotteryAPI)
+    api.supabase = db
+    original_index, original_ttl = server.history_index, server.HISTORY_INDEX_TTL
+    server.history_index = index = NumberHistoryIndex()
+    try:
+        api._ensure_history_loaded(page_size=3)
+        assert index.total_draws == 5 and index.lookup("000004")
+
+        # ภายใน TTL ไม่ query ซ้ำ
+        queries = db.queries
+        api._ensure_history_loaded(page_size=3)
+        assert db.queries == queries
+
+        # cron แก้งวดเดิมและเพิ่มงวดใหม่ หลัง TTL ต้องเห็นข้อมูลใหม่
+        db.save_draw("2025-01-01", "999999")
+        db.save_draw("2025-06-01", "555555")
+        server.HISTORY_INDEX_TTL = 0
+        api._ensure_history_loaded(page_size=3)
+        assert index.total_draws == 6
+        assert index.lookup("000000") == [] and index.lookup("999999")[0]['draw_date'] == "2025-01-01"
+
+        # ไม่มีการเปลี่ยนแปลง ตรวจแค่ signature ไม่โหลดทั้งหมดใหม่
+        queries = db.queries
+        api._ensure_history_loaded(page_size=3)
+        assert db.queries == queries + 1
+    finally:
+        server.history_index, server.HISTORY_INDEX_TTL = original_index, original_ttl
+
+
+if __name__ == "__main__":
+    test_lookup_sorted_by_latest_draw()
+    test_resave_draw_replaces_entries()
+    test_load_rows_from_join()
+    test_lookup_speed_with_many_draws()
+    test_server_reloads_history_written_elsewhere()
+    print("✅ ทดสอบ history index ผ่านทั้งหมด")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ HTML parser ทุก backend ให้ได้ผลเหมือนกัน (ใช้ sanook_page.html ไม่ต้องใช้อินเทอร์เน็ต)
+"""
+
+from benchmark_html_parser import load_fixture
+from services.html_parser import (
+    HtmlPage, available_backends, parse_html, load_page, resolve_backend, scan_json_ld_blocks, scan_hrefs,
+    extract_news_article, extract_main_prizes
+)
+
+EXPECTED_MAIN_PRIZES = {
+    'first_prize': '876978',
+    'second_prize_1': '843',
+    'second_prize_2': '532',
+    'third_prize_1': '280',
+    'third_prize_2': '605',
+    'fourth_prize_1': '77'
+}
+
+# โครงสร้างแบบชื่อ class เดิม (ขีดล่างตัวเดียว)
+LEGACY_HTML = """
+<div class="lottocheck_column"><strong class="lotto_number lotto_number--first">123456</strong></div>
+<div class="lottocheck_column"><span class="lotto_number">111</span><span class="lotto_number">222</span></div>
+<div class="lottocheck_column"><span class="lotto_number">333</span><span class="lotto_number">444</span></div>
+<div class="lottocheck_column"><span class="lotto_number">55</span></div>
+"""
+
+
+def test_backends_agree_on_sanook_page():
+    """ทุก backend ต้องได้ NewsArticle และรางวัลหลักเหมือนกัน"""
+    content = load_fixture()
+    articles = {}
+
+    for backend in available_backends():
+        page = parse_html(content, backend)
+        article = extract_news_article(page)
+        prizes = extract_main_prizes(page)
+        print(f"{backend}: {prizes}")
+
+        assert page.backend == backend
+        assert prizes == EXPECTED_MAIN_PRIZES, backend
+        articles[backend] = article['articleBody']
+
+    assert len(set(articles.values())) == 1
+
+
+def test_legacy_class_names():
+    """selector ต้องรองรับชื่อ class แบบเดิมด้วย"""
+    for backend in available_backends():
+        prizes = extract_main_prizes(parse_html(LEGACY_HTML, backend))
+        assert prizes == {
+            'first_prize': '123456',
+            'second_prize_1': '111',
+            'second_prize_2': '222',
+            'third_prize_1': '333',
+            'third_prize_2': '444',
+            'fourth_prize_1': '55'
+        }, backend
+
+
+def test_soup_fallback():
+    """โค้ดเดิมที่ต้องใช้ BeautifulSoup เรียก page.soup ได้ทุก backend"""
+    for backend in available_backends():
+        soup = parse_html(LEGACY_HTML, backend).soup
+        assert len(soup.find_all(class_='lotto_number')) == 6, backend
+
+
+def test_raw_json_ld_skips_dom():
+    """อ่าน NewsArticle จาก bytes ได้เหมือน DOM และไม่สร้าง DOM"""
+    content = load_fixture()
+    page = load_page(content)
+    article = extract_news_article(page)
+
+    assert article['articleBody'] == extract_news_article(parse_html(content))['articleBody']
+    assert page.backend == 'raw'
+    assert page._dom is None
+
+
+def test_raw_page_falls_back_to_dom():
+    """หน้าที่ไม่มี JSON-LD ต้องสร้าง DOM เมื่อเรียก selector"""
+    page = load_page(LEGACY_HTML)
+    assert extract_news_article(page) is None
+    assert page._dom is None
+
+    assert extract_main_prizes(page)['first_prize'] == '123456'
+    assert page.backend == resolve_backend()
+
+
+def test_scan_json_ld_variants():
+    """รองรับ attribute หลายแบบและ script ที่ไม่ใช่ JSON-LD ต้องไม่ถูกนับ"""
+    html = (b'<script src="a.js"></script><script>var x = 1;</script>'
+            b"<SCRIPT id=a type='application/ld+json'>{\"@type\": \"A\"}</SCRIPT>"
+            b'<script type=application/ld+json>{"@type": "NewsArticle"}</script >')
+    assert scan_json_ld_blocks(html) == ['{"@type": "A"}', '{"@type": "NewsArticle"}']
+    assert extract_news_article(load_page(html)) == {'@type': 'NewsArticle'}
+
+
+def test_scan_hrefs():
+    """หา link จาก bytes โดยไม่สร้าง DOM (รวม entity ใน href)"""
+    html = ('<a href="/a">x</a><A class=x HREF=\'/lotto/ตรวจหวย-งวด-ล่าสุด?a=1&amp;b=2\'>y</A>'
+            '<link href="/ตรวจหวย-งวด-ล่าสุด.css">').encode('utf-8')
+    assert scan_hrefs(html, r'ตรวจหวย.*งวด.*ล่าสุด') == ['/lotto/ตรวจหวย-งวด-ล่าสุด?a=1&b=2']
+    assert scan_hrefs(html.decode('utf-8'), r'^/a$') == ['/a']
+
+
+def test_backend_must_implement_all_methods():
+    """backend ที่ override ไม่ครบต้อง error ตอนสร้าง ไม่ใช่ตอน parse"""
+    class Partial(HtmlPage):
+        def select_texts(self, selector):
+            return []
+
+    try:
+        Partial('')
+        raise AssertionError("ควร error เมื่อ backend override ไม่ครบ")
+    except TypeError:
+        pass
+
+
+def test_resolve_backend():
+    assert resolve_backend('auto') == available_backends()[0]
+    assert resolve_backend('html.parser') == 'html.parser'
+    try:
+        resolve_backend('html5lib')
+        raise AssertionError("ควร error เมื่อไม่รู้จัก backend")
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_backends_agree_on_sanook_page()
+    test_legacy_class_names()
+    test_soup_fallback()
+    test_raw_json_ld_skips_dom()
+    test_raw_page_falls_back_to_dom()
+    test_scan_json_ld_variants()
+    test_scan_hrefs()
+    test_backend_must_implement_all_methods()
+    test_resolve_backend()
+    print("✅ ทดสอบ HTML parser ผ่านทั้งหมด")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ ETag / Cache-Control / 304 ของผลหวยแต่ละงวด (ไม่ต้องใช้ Supabase)
+"""
+
+import threading
+import time
+import urllib.request
+from datetime import date
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api.routes as routes
+from server import PooledHTTPServer, LotteryHandler
+from services.http_cache import DrawResponse, draw_responses, etag_matches, prize_set_etag
+from services.prize_rows import build_prize_rows
+from test_prize_rows import SAMPLE_LOTTERY_DATA
+
+
+def test_etag_and_cache_control():
+    """งวดที่ออกครบและผ่านไปแล้วเป็น immutable ส่วนงวดวันนี้ cache สั้นๆ"""
+    past = DrawResponse("2025-10-01", SAMPLE_LOTTERY_DATA, today=date(2025, 10, 16))
+    print(f"ETag: {past.etag}, Cache-Control: {past.cache_control}")
+    assert past.immutable
+    assert "immutable" in past.cache_control
+
+    today = DrawResponse("2025-10-01", SAMPLE_LOTTERY_DATA, today=date(2025, 10, 1))
+    assert not today.immutable
+    assert today.cache_control == "public, max-age=60"
+
+    # ข้อมูลยังไม่ครบ ETag ต้องเปลี่ยนเมื่อมีรางวัลเพิ่ม
+    partial = dict(SAMPLE_LOTTERY_DATA, fifth_prizes=[])
+    partial_response = DrawResponse("2025-10-01", partial, today=date(2025, 10, 16))
+    assert not partial_response.immutable
+    assert partial_response.etag != past.etag
+
+    # ETag เดียวกันไม่ว่าแถวรางวัลจากฐานข้อมูลจะเรียงแบบไหน
+    rows = build_prize_rows(SAMPLE_LOTTERY_DATA)
+    assert prize_set_etag(list(reversed(rows))) == past.etag
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches('*', '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+class FakeLotteryService:
+    def __init__(self):
+        self.loads = 0
+
+    def get_from_database(self, draw_date):
+        self.loads += 1
+        return dict(SAMPLE_LOTTERY_DATA, draw_date=draw_date)
+
+
+def test_route_returns_304():
+    """ส่ง If-None-Match ที่ตรงกันต้องได้ 304 และงวดที่ไม่เปลี่ยนแล้วไม่ต้องโหลดซ้ำ"""
+    draw_responses.invalidate("2025-10-01")
+    app = FastAPI()
+    app.include_router(routes.router)
+    client = TestClient(app)
+
+    original = routes.lottery_service
+    routes.lottery_service = FakeLotteryService()
+    try:
+        first = client.get("/lottery/2025-10-01")
+        assert first.status_code == 200
+        assert first.json()['first_prize'] == SAMPLE_LOTTERY_DATA['first_prize']
+        etag = first.headers["etag"]
+        print(f"200 ETag={etag} Cache-Control={first.headers['cache-control']}")
+
+        second = client.get("/lottery/2025-10-01", headers={"If-None-Match": etag})
+        print(f"ส่ง If-None-Match ได้ status {second.status_code}")
+        assert second.status_code == 304
+        assert second.content == b""
+        assert routes.lottery_service.loads == 1
+    finally:
+        routes.lottery_service = original
+        draw_responses.invalidate("2025-10-01")
+
+
+def test_server_etag_body_is_stable():
+    """server.py: response ที่มี strong ETag เดียวกันต้องมี body เหมือนกันทุก byte"""
+    draw_responses.invalidate("2025-10-01")
+    httpd = PooledHTTPServer(("127.0.0.1", 0), LotteryHandler, workers=2, api=FakeLotteryService())
+    port = httpd.server_address[1]
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    def get():
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/lottery?draw_date=2025-10-01", timeout=5) as response:
+            return response.headers["ETag"], response.read()
+
+    try:
+        first = get()
+        time.sleep(0.01)
+        second = get()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        draw_responses.invalidate("2025-10-01")
+
+    assert first == second
+    assert not first[0].startswith('W/') and b'"timestamp"' not in first[1]
+
+
+if __name__ == "__main__":
+    test_etag_and_cache_control()
+    test_etag_matches()
+    test_route_returns_304()
+    test_server_etag_body_is_stable()
+    print("✅ ทดสอบ HTTP cache ผ่านทั้งหมด")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ HTTP client กลาง: keep-alive, retry เมื่อได้ 5xx และ timeout (ใช้ server ในเครื่อง ไม่ต้องใช้อินเทอร์เน็ต)
+"""
+
+import http.server
+import threading
+import time
+
+import requests
+
+from services.http_client import create_session, http_client, interactive_client, DEFAULT_TIMEOUT, INTERACTIVE_TIMEOUT, USER_AGENT
+from services import page_cache, scraper
+from services.lottery_service import LotteryService
+
+
+class FlakyHandler(http.server.BaseHTTPRequestHandler):
+    """ตอบ 503 ตามจำนวนที่ตั้งไว้ก่อน แล้วค่อยตอบ 200 (HTTP/1.1 keep-alive)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.client_address[1])
+            server.user_agents.append(self.headers.get('User-Agent'))
+            fail = server.failures > 0
+            server.failures -= fail
+
+        if self.path == '/slow':
+            time.sleep(0.5)
+
+        body = b'error' if fail else b'ok'
+        self.send_response(503 if fail else 200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(failures=0):
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    httpd.lock = threading.Lock()
+    httpd.requests = []
+    httpd.user_agents = []
+    httpd.failures = failures
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+
+
+def test_reuses_connection():
+    """หลาย request ใช้ TCP connection เดิม (client port เดียวกัน)"""
+    httpd, base = start_server()
+    try:
+        session = create_session()
+        for _ in range(5):
+            assert session.get(f"{base}/").text == 'ok'
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert len(httpd.requests) == 5
+    assert len(set(httpd.requests)) == 1
+    assert httpd.user_agents == [USER_AGENT] * 5
+
+
+def test_retries_server_errors_with_backoff():
+    httpd, base = start_server(failures=2)
+    try:
+        response = create_session(retries=3, backoff=0.01).get(f"{base}/")
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert response.status_code == 200
+    assert len(httpd.requests) == 3
+
+
+def test_gives_up_after_retries():
+    httpd, base = start_server(failures=10)
+    try:
+        response = create_session(retries=1, backoff=0.01).get(f"{base}/")
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert response.status_code == 503
+    assert len(httpd.requests) == 2
+
+
+def test_default_read_timeout():
+    httpd, base = start_server()
+    try:
+        session = create_session(retries=0, timeout=(1, 0.1))
+        start = time.monotonic()
+        try:
+            session.get(f"{base}/slow")
+            raise AssertionError("ควร timeout")
+        except (requests.Timeout, requests.ConnectionError):
+            # เมื่อ mount Retry ไว้ requests จะห่อ read timeout เป็น ConnectionError
+            pass
+        assert time.monotonic() - start < 0.4
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_scrapers_share_one_client():
+    assert page_cache.http_client is http_client
+    assert scraper.http_client is http_client
+    assert DEFAULT_TIMEOUT[0] < DEFAULT_TIMEOUT[1]
+
+
+def test_interactive_client_does_not_retry():
+    """scrape-on-miss ใน request ของผู้ใช้ล้มเหลวทันที ไม่ retry และ timeout สั้นกว่างานเบื้องหลัง"""
+    httpd, base = start_server(failures=10)
+    try:
+        response = interactive_client.get(f"{base}/")
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert response.status_code == 503
+    assert len(httpd.requests) == 1
+    assert INTERACTIVE_TIMEOUT[1] < DEFAULT_TIMEOUT[1]
+
+
+class SessionRecordingService(LotteryService):
+    def __init__(self):
+        self.sessions = []
+
+    def fetch_draw_page(self, draw_date, session=None, throttle=None):
+        self.sessions.append(session)
+        return b''
+
+    def parse_draw_page(self, content, draw_date):
+        return {'draw_date': draw_date, 'first_prize': '123456'}
+
+
+def test_scrape_on_miss_uses_interactive_client():
+    service = SessionRecordingService()
+    service.get_lottery_by_date('2010-03-16')
+    assert service.sessions == [interactive_client]
+
+
+if __name__ == "__main__":
+    test_reuses_connection()
+    test_retries_server_errors_with_backoff()
+    test_gives_up_after_retries()
+    test_default_read_timeout()
+    test_scrapers_share_one_client()
+    test_interactive_client_does_not_retry()
+    test_scrape_on_miss_uses_interactive_client()
+    print("✅ ทดสอบ HTTP client ผ่านทั้งหมด")
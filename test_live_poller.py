@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ live polling วันหวยออก (หน้าเว็บและฐานข้อมูลจำลอง ไม่ต้องใช้อินเทอร์เน็ต)
+"""
+
+import contextlib
+import io
+from datetime import datetime, timedelta
+
+import requests
+
+from services.live_poller import LivePoller, BANGKOK_TZ, tier_counts, is_complete
+from services.prize_index import EXPECTED_PRIZE_ROWS
+from test_prize_rows import SAMPLE_LOTTERY_DATA
+
+DRAW_DATE = '2025-10-01'
+
+
+def partial(*keys):
+    """ข้อมูลงวดที่ออกแล้วเฉพาะ key ที่ระบุ"""
+    data = {'draw_date': DRAW_DATE, 'draw_number': '1/2568'}
+    data.update({key: SAMPLE_LOTTERY_DATA[key] for key in keys})
+    return data
+
+
+MAIN_KEYS = ('first_prize', 'second_prize_1', 'second_prize_2', 'third_prize_1', 'third_prize_2', 'fourth_prize_1')
+STAGES = [
+    None,                                                            # หน้ายังไม่มี (404)
+    partial('first_prize'),
+    partial('first_prize'),                                          # ไม่เปลี่ยน (304)
+    partial(*MAIN_KEYS, 'nearby_prizes'),
+    partial(*MAIN_KEYS, 'nearby_prizes', 'second_prizes', 'third_prizes'),
+    SAMPLE_LOTTERY_DATA,
+]
+
+
+class FakeClock:
+    def __init__(self, start):
+        self.current = start
+        self.sleeps = []
+
+    def now(self):
+        return self.current
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.current += timedelta(seconds=seconds)
+
+
+class FakeService:
+    """หน้าเว็บที่ทยอยออกรางวัลตาม STAGES ทีละครั้งที่ fetch"""
+
+    def __init__(self, stages=STAGES):
+        self.stages = list(stages)
+        self.fetches = 0
+        self.saves = []
+
+    def fetch_draw_page(self, draw_date, session=None, throttle=None):
+        stage = self.stages[min(self.fetches, len(self.stages) - 1)]
+        self.fetches += 1
+        if stage is None:
+            response = requests.Response()
+            response.status_code = 404
+            raise requests.HTTPError("404", response=response)
+        return stage
+
+    def parse_draw_page(self, content, draw_date):
+        return dict(content)
+
+    def save_to_database(self, lottery_data, status='active'):
+        self.saves.append((sum(tier_counts(lottery_data).values()), status))
+        return True
+
+
+def test_tier_counts():
+    counts = tier_counts(SAMPLE_LOTTERY_DATA)
+    assert counts['fifth_prize'] == 100
+    assert sum(counts.values()) == EXPECTED_PRIZE_ROWS
+    assert is_complete(counts)
+    assert not is_complete(tier_counts(partial(*MAIN_KEYS)))
+
+
+def test_saves_each_new_tier_until_complete():
+    clock = FakeClock(datetime(2025, 10, 1, 14, 30, tzinfo=BANGKOK_TZ))
+    service = FakeService()
+    poller = LivePoller(service, interval=5, now=clock.now, sleep=clock.sleep)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = poller.run()
+
+    print(result, service.saves)
+    assert result['status'] == 'complete'
+    assert result['draw_date'] == DRAW_DATE
+    assert result['polls'] == 6
+    # บันทึกเฉพาะครั้งที่มีรางวัลใหม่ งวดที่ยังไม่ครบเป็น partial
+    assert service.saves == [(1, 'partial'), (8, 'partial'), (23, 'partial'), (EXPECTED_PRIZE_ROWS, 'active')]
+    assert clock.sleeps == [5] * 5
+
+
+def test_waits_for_window_and_stops_when_it_closes():
+    clock = FakeClock(datetime(2025, 10, 16, 13, 0, tzinfo=BANGKOK_TZ))
+    service = FakeService([partial('first_prize')])
+    poller = LivePoller(service, interval=600, start='14:00', end='14:30', now=clock.now, sleep=clock.sleep)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = poller.run()
+
+    # รอถึง 14:00 แล้ว poll เวลา 14:00, 14:10, 14:20 (บันทึกครั้งเดียวเพราะไม่มีรางวัลใหม่)
+    assert result['status'] == 'window_closed'
+    assert clock.sleeps[0] == 3600
+    assert result['polls'] == 3
+    assert service.saves == [(1, 'partial')]
+
+
+def test_skips_non_draw_days():
+    clock = FakeClock(datetime(2025, 10, 2, 14, 30, tzinfo=BANGKOK_TZ))
+    service = FakeService()
+    result = LivePoller(service, now=clock.now, sleep=clock.sleep).run()
+    assert result == {'status': 'not_draw_day', 'date': '2025-10-02'}
+    assert service.fetches == 0
+
+
+if __name__ == "__main__":
+    test_tier_counts()
+    test_saves_each_new_tier_until_complete()
+    test_waits_for_window_and_stops_when_it_closes()
+    test_skips_non_draw_days()
+    print("✅ ทดสอบ live polling ผ่านทั้งหมด")
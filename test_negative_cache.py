@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ negative cache (งวดที่ยังไม่มีผลไม่ต้องดึงหน้า sanook ซ้ำ) ไม่ต้องใช้อินเทอร์เน็ต
+"""
+
+import contextlib
+import io
+from datetime import datetime, timedelta
+
+import requests
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import routes
+from services.live_poller import BANGKOK_TZ
+from services.lottery_service import LotteryService
+from services.negative_cache import (
+    NegativeCache, NEGATIVE_TTL_NOT_FOUND, NEGATIVE_TTL_NOT_PUBLISHED, negative_cache
+)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(str(status_code), response=response)
+
+
+def test_known_misses_without_fetch():
+    clock = Clock(datetime(2025, 10, 16, 9, 30, tzinfo=BANGKOK_TZ))
+    cache = NegativeCache(now=clock, draw_time='14:00')
+
+    future = cache.get('2025-10-16')
+    assert future.reason == 'future'
+    assert future.retry_after(clock.now) == 4.5 * 60 * 60
+    assert cache.get('2025-10-05').reason == 'not_draw_date'
+    assert cache.get('2025-10-01') is None
+
+    # ถึงเวลาออกรางวัลแล้วต้องให้ scrape ได้
+    clock.now = datetime(2025, 10, 16, 14, 0, tzinfo=BANGKOK_TZ)
+    assert cache.get('2025-10-16') is None
+    assert cache.metrics()['hits'] == 2 and cache.metrics()['misses'] == 2
+
+
+def test_reason_specific_ttls():
+    clock = Clock(datetime(2025, 10, 16, 15, 0, tzinfo=BANGKOK_TZ))
+    cache = NegativeCache(now=clock)
+
+    # งวดวันนี้ที่ยังไม่มีรางวัลบนหน้าเว็บ: ลองใหม่ในไม่กี่วินาที
+    assert cache.record_failure('2025-10-16').reason == 'not_published'
+    assert cache.peek('2025-10-16').retry_after(clock.now) == NEGATIVE_TTL_NOT_PUBLISHED
+
+    # งวดเก่าที่ไม่มีหน้า (404): จำหลายชั่วโมง
+    assert cache.record_failure('2010-03-16', http_error(404)).reason == 'not_found'
+    assert cache.peek('2010-03-16').retry_after(clock.now) == NEGATIVE_TTL_NOT_FOUND
+
+    # timeout / 5xx ไม่จำ
+    assert cache.record_failure('2010-04-01', http_error(503)) is None
+    assert cache.record_failure('2010-04-01', requests.Timeout("timed out")) is None
+    assert cache.peek('2010-04-01') is None
+
+    assert cache.metrics()['entries'] == {'not_published': 1, 'not_found': 1}
+
+    clock.now += timedelta(seconds=NEGATIVE_TTL_NOT_PUBLISHED)
+    assert cache.peek('2025-10-16') is None
+    assert cache.peek('2010-03-16').reason == 'not_found'
+
+    cache.invalidate('2010-03-16')
+    assert cache.peek('2010-03-16') is None
+
+
+def test_moved_draw_regular_date_follows_actual_draw():
+    """วันปกติของงวดที่เลื่อนผ่าน validation จึงต้องไม่ถูกจำว่า "ไม่ใช่วันหวยออก" แต่ใช้เวลาของวันที่ออกจริง"""
+    from services.draw_calendar import draw_calendar
+
+    assert draw_calendar.validation_error('2026-01-01') is None
+    clock = Clock(datetime(2025, 12, 30, 9, 0, tzinfo=BANGKOK_TZ))
+    cache = NegativeCache(now=clock, draw_time='14:00')
+
+    assert cache.peek('2026-01-01').reason == 'future'
+    assert cache.peek('2026-01-01').retry_after(clock.now) == 5 * 60 * 60
+    assert cache.peek('2020-04-16').reason == 'not_draw_date'
+
+    clock.now = datetime(2025, 12, 30, 15, 0, tzinfo=BANGKOK_TZ)
+    assert cache.peek('2026-01-01') is None
+
+    # ผลที่จำไว้ใช้ร่วมกันทั้งสองวันที่
+    cache.record_failure('2025-12-30')
+    assert cache.peek('2026-01-01').reason == 'not_published'
+    cache.invalidate('2026-01-01')
+    assert cache.peek('2025-12-30') is None
+
+
+class FakeDatabase:
+    supabase = None
+
+    def get_draw_prizes(self, draw_date):
+        return None
+
+    def get_lottery_data_from_db(self, draw_date):
+        return None
+
+    def acquire_scrape_lease(self, draw_date, owner, ttl_seconds):
+        return None
+
+
+class MissingPageService(LotteryService):
+    """ทุกงวดได้ 404 จาก sanook นับจำนวนครั้งที่ดึงหน้า"""
+
+    def __init__(self):
+        self.db = FakeDatabase()
+        self.lease_owner = 'test'
+        self.fetches = 0
+
+    def fetch_draw_page(self, draw_date, session=None, throttle=None):
+        self.fetches += 1
+        raise http_error(404)
+
+
+def test_repeated_misses_skip_scrape():
+    app = FastAPI()
+    app.include_router(routes.router)
+    client = TestClient(app)
+
+    original = routes.lottery_service
+    routes.lottery_service = service = MissingPageService()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            responses = [client.get("/lottery/2010-03-16") for _ in range(3)]
+        assert [response.status_code for response in responses] == [404, 404, 404]
+        assert service.fetches == 1
+        assert int(responses[-1].headers['retry-after']) > NEGATIVE_TTL_NOT_FOUND - 60
+
+        # งวดในอนาคตไม่ถูกดึงเลย และบอกให้ลองใหม่ตอนออกรางวัล
+        future = client.get("/lottery/2030-02-01")
+        assert future.status_code == 404 and future.json()['detail'] == "ยังไม่ถึงเวลาออกรางวัลของงวดนี้"
+        assert service.fetches == 1
+    finally:
+        routes.lottery_service = original
+        negative_cache.invalidate('2010-03-16')
+
+
+def test_regular_date_scrapes_actual_draw_page():
+    service = MissingPageService()
+    fetched = []
+    service.fetch_draw_page = lambda draw_date, session=None, throttle=None: fetched.append(draw_date) or b''
+    service.parse_draw_page = lambda content, draw_date: None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert service.scrape_and_save('2025-01-01') is None
+        assert fetched == ['2024-12-30']
+        assert negative_cache.peek('2025-01-01').reason == 'not_found'
+    finally:
+        negative_cache.invalidate('2024-12-30')
+
+
+if __name__ == "__main__":
+    test_known_misses_without_fetch()
+    test_reason_specific_ttls()
+    test_moved_draw_regular_date_follows_actual_draw()
+    test_repeated_misses_skip_scrape()
+    test_regular_date_scrapes_actual_draw_page()
+    print("✅ ทดสอบ negative cache ผ่านทั้งหมด")
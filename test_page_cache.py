@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ page cache บนดิสก์และ conditional GET (ใช้ session ปลอม ไม่ต้องใช้อินเทอร์เน็ต)
+"""
+
+import os
+import tempfile
+from datetime import date, timedelta
+
+import requests
+
+from services.page_cache import PageCache, PageCacheMiss
+
+URL = "https://news.sanook.com/lotto/check/01102568/"
+BODY = "<html>ผลสลากกินแบ่งรัฐบาล</html>".encode('utf-8') * 100
+
+
+class FakeSession:
+    """ตอบ 304 เมื่อ If-None-Match ตรงกับ ETag ปัจจุบัน"""
+
+    def __init__(self, body=BODY, etag='"v1"', status_code=200, last_modified='Wed, 01 Oct 2025 09:00:00 GMT'):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.status_code = status_code
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        headers = headers or {}
+        self.requests.append(headers)
+
+        response = requests.Response()
+        response.url = url
+        if self.etag and headers.get('If-None-Match') == self.etag:
+            response.status_code = 304
+            response._content = b''
+        else:
+            response.status_code = self.status_code
+            response._content = self.body
+            if self.etag:
+                response.headers['ETag'] = self.etag
+            if self.last_modified:
+                response.headers['Last-Modified'] = self.last_modified
+        return response
+
+
+def test_stores_compressed_and_revalidates_with_304():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PageCache(tmp)
+        session = FakeSession()
+        today = date.today()
+
+        # งวดวันนี้: ครั้งแรกดาวน์โหลด ครั้งต่อไป revalidate ได้ 304
+        assert cache.fetch(URL, session=session, stable_after=today) == BODY
+        assert cache.fetch(URL, session=session, stable_after=today) == BODY
+        assert cache.fetch(URL, session=session, stable_after=today) == BODY
+
+        assert len(session.requests) == 3
+        assert 'If-None-Match' not in session.requests[0]
+        assert session.requests[1]['If-None-Match'] == '"v1"'
+        assert session.requests[1]['If-Modified-Since'] == 'Wed, 01 Oct 2025 09:00:00 GMT'
+        assert cache.metrics()['downloaded'] == 1
+        assert cache.metrics()['not_modified'] == 2
+
+        # เก็บแบบบีบอัด
+        gz_files = [name for name in os.listdir(tmp) if name.endswith('.gz')]
+        assert len(gz_files) == 1
+        assert os.path.getsize(os.path.join(tmp, gz_files[0])) < len(BODY) / 5
+
+
+def test_no_if_modified_since_without_last_modified():
+    """ต้นทางไม่ส่ง Last-Modified ต้อง revalidate ด้วย If-None-Match อย่างเดียว"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PageCache(tmp)
+        session = FakeSession(last_modified=None)
+        cache.fetch(URL, session=session)
+        assert cache.fetch(URL, session=session) == BODY
+
+        assert session.requests[1]['If-None-Match'] == '"v1"'
+        assert 'If-Modified-Since' not in session.requests[1]
+        assert cache.metrics()['not_modified'] == 1
+
+
+def test_changed_page_is_replaced():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PageCache(tmp)
+        cache.fetch(URL, session=FakeSession(etag='"v1"'))
+
+        updated = BODY + b'<p>updated</p>'
+        assert cache.fetch(URL, session=FakeSession(body=updated, etag='"v2"')) == updated
+        assert cache.read_body(URL) == updated
+        assert cache.load(URL)['etag'] == '"v2"'
+
+
+def test_old_draws_cost_no_network():
+    """หน้าที่ดาวน์โหลดหลังวันออกรางวัลแล้วไม่ต้องเรียกเว็บอีก"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PageCache(tmp)
+        cache.fetch(URL, session=FakeSession())
+
+        session = FakeSession()
+        throttled = []
+        yesterday = date.today() - timedelta(days=1)
+        assert cache.fetch(URL, session=session, stable_after=yesterday, throttle=lambda: throttled.append(1)) == BODY
+        assert session.requests == []
+        assert throttled == []
+        assert cache.metrics()['hits'] == 1
+
+
+def test_offline_mode():
+    with tempfile.TemporaryDirectory() as tmp:
+        PageCache(tmp).fetch(URL, session=FakeSession())
+
+        offline = PageCache(tmp, offline=True)
+        session = FakeSession()
+        assert offline.fetch(URL, session=session, stable_after=date.today()) == BODY
+        assert session.requests == []
+
+        try:
+            offline.fetch(URL + "other/", session=session)
+            raise AssertionError("ควร error เมื่อไม่มีหน้าใน cache")
+        except PageCacheMiss:
+            pass
+        assert offline.metrics()['offline_misses'] == 1
+
+
+def test_http_errors_are_not_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PageCache(tmp)
+        try:
+            cache.fetch(URL, session=FakeSession(status_code=404, etag=None))
+            raise AssertionError("ควร error เมื่อได้ 404")
+        except requests.HTTPError:
+            pass
+        assert cache.load(URL) is None
+
+
+if __name__ == "__main__":
+    test_stores_compressed_and_revalidates_with_304()
+    test_no_if_modified_since_without_last_modified()
+    test_changed_page_is_replaced()
+    test_old_draws_cost_no_network()
+    test_offline_mode()
+    test_http_errors_are_not_cached()
+    print("✅ ทดสอบ page cache ผ่านทั้งหมด")
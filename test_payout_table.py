@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบตารางเงินรางวัลรายงวด (ไม่ต้องใช้ Supabase)
+"""
+
+import os
+import random
+import tempfile
+import time
+
+import services.lottery_service as lottery_service_module
+from services.lottery_service import LotteryService
+from services.payout_table import PayoutTable, PayoutTableStore, PRIZE_TYPE_BITS
+from services.prize_index import PrizeIndex, prize_index_cache
+from services.prize_rows import build_prize_rows
+from test_prize_index import SAMPLE_PRIZES
+from test_prize_rows import SAMPLE_LOTTERY_DATA
+
+
+def test_lookup_matches_prize_index():
+    """เงินรางวัลรวมจากตารางต้องตรงกับผลจาก PrizeIndex"""
+    table = PayoutTable.from_prizes("2025-10-01", SAMPLE_PRIZES)
+    index = PrizeIndex("2025-10-01", "1/2568", SAMPLE_PRIZES)
+
+    numbers = ["876978", "843000", "000078", "153393"] + [f"{random.randrange(1000000):06d}" for _ in range(1000)]
+    for number, (amount, mask) in zip(numbers, table.gather(numbers)):
+        matches = index.check(number)
+        assert amount == sum(m['amount'] for m in matches), number
+        assert bool(mask) == bool(matches), number
+
+    amount, mask = table.lookup("876978")
+    print(f"876978: {amount:,} บาท, prize_types={PayoutTable.prize_types(mask)}")
+    assert amount == 6000000 + 4000 + 2000
+    assert mask == PRIZE_TYPE_BITS['first_prize'] | PRIZE_TYPE_BITS['back_3'] | PRIZE_TYPE_BITS['back_2']
+
+
+def close_table(table):
+    table.amounts.release()
+    table.masks.release()
+    table._source.close()
+
+
+def test_save_and_mmap_load():
+    """บันทึกตารางลงไฟล์แล้วเปิดกลับแบบ memory-map"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = PayoutTableStore(directory)
+
+        start = time.time()
+        table = store.put("2025-10-01", SAMPLE_PRIZES)
+        print(f"สร้างและบันทึกตาราง: {time.time() - start:.3f} วินาที")
+        assert os.path.getsize(store.path_for("2025-10-01", table.version)) == 8 + 8 * 1_000_000
+        # put คืนตารางที่ memory-map จากไฟล์ ไม่เก็บ array ที่สร้างไว้ในหน่วยความจำ
+        assert table._source is not None
+
+        # store ใหม่ (เหมือน worker อื่น) ต้องเปิดไฟล์เดิมได้
+        version = PrizeIndex("2025-10-01", "1/2568", SAMPLE_PRIZES).version
+        assert version == table.version
+        loaded = PayoutTableStore(directory).get("2025-10-01", version)
+        assert loaded.lookup("876977") == (100000, PRIZE_TYPE_BITS['nearby'])
+        assert loaded.lookup("111111") == (0, 0)
+
+        close_table(loaded)
+        close_table(table)
+
+
+def test_stale_tables_are_not_trusted():
+    """ตารางของชุดรางวัลเก่า (ก่อนแก้ข้อมูล) ต้องไม่ถูกใช้ และ invalidate ลบทั้งไฟล์และ cache"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = PayoutTableStore(directory)
+        old = store.put("2025-10-01", SAMPLE_PRIZES)
+
+        # แก้รางวัลที่ 1 แล้ว version ของชุดรางวัลเปลี่ยน
+        corrected = [dict(prize, prize_number="111111") if prize['prize_type'] == 'first_prize' else prize
+                     for prize in SAMPLE_PRIZES]
+        version = PrizeIndex("2025-10-01", "1/2568", corrected).version
+        assert version != old.version
+        assert store.get("2025-10-01", version) is None
+        assert PayoutTableStore(directory).get("2025-10-01", version) is None
+
+        new = store.put("2025-10-01", corrected)
+        assert new.lookup("111111")[0] == 6000000
+        # ไฟล์ของ version เก่าถูกลบไปแล้ว
+        assert os.listdir(directory) == [os.path.basename(store.path_for("2025-10-01", version))]
+
+        store.invalidate("2025-10-01")
+        assert os.listdir(directory) == []
+        assert store.get("2025-10-01", version) is None
+
+        close_table(old)
+        close_table(new)
+
+
+def test_open_tables_are_bounded():
+    """ตารางที่เปิดค้างไว้ใน process มีไม่เกิน max_tables (ทิ้งตารางที่ใช้ล่าสุดนานที่สุด)"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = PayoutTableStore(directory, max_tables=2)
+        tables = [store.put(draw_date, SAMPLE_PRIZES) for draw_date in ("2025-09-01", "2025-09-16")]
+        store.get("2025-09-01", tables[0].version)
+        tables.append(store.put("2025-10-01", SAMPLE_PRIZES))
+
+        assert list(store._tables) == ["2025-09-01", "2025-10-01"]
+        # ตารางที่ถูกทิ้งยังเปิดจากไฟล์ได้ใหม่
+        reopened = store.get("2025-09-16", tables[1].version)
+        assert reopened is not None and reopened is not tables[1]
+
+        for table in tables + [reopened]:
+            close_table(table)
+
+
+def test_files_on_disk_are_bounded():
+    """ไฟล์บนดิสก์มีไม่เกิน max_files (ลบไฟล์ที่ใช้ล่าสุดนานที่สุด) ตารางที่เปิดอยู่ยังอ่านได้"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = PayoutTableStore(directory, max_files=3)
+        tables = []
+        for i, draw_date in enumerate(("2025-09-01", "2025-09-16", "2025-10-01")):
+            tables.append(store.put(draw_date, SAMPLE_PRIZES))
+            os.utime(store.path_for(draw_date, tables[-1].version), (1000 + i, 1000 + i))
+
+        # worker อื่นเปิดงวด 1 ก.ย. จากไฟล์ ไฟล์นั้นจึงเป็นไฟล์ที่ใช้ล่าสุด
+        tables.append(PayoutTableStore(directory).get("2025-09-01", tables[0].version))
+        tables.append(store.put("2025-10-16", SAMPLE_PRIZES))
+
+        version = tables[0].version
+        assert sorted(os.listdir(directory)) == sorted(
+            os.path.basename(store.path_for(draw_date, version)) for draw_date in ("2025-09-01", "2025-10-01", "2025-10-16")
+        )
+        # ตารางของไฟล์ที่ถูกลบยังเปิดอยู่และอ่านได้
+        assert tables[1].lookup("876978")[0] >= 6000000
+
+        for table in tables:
+            close_table(table)
+
+
+class BulkDatabase:
+    supabase = object()
+
+    def upsert_draws_bulk(self, draws):
+        return len(draws)
+
+
+class BulkSaveService(LotteryService):
+    def __init__(self):
+        self.db = BulkDatabase()
+
+
+def test_bulk_save_drops_payout_table():
+    """backfill (save_many_to_database) ต้องลบตารางเงินรางวัลของงวดที่บันทึกใหม่"""
+    draw_date = SAMPLE_LOTTERY_DATA['draw_date']
+    original = lottery_service_module.payout_tables
+    with tempfile.TemporaryDirectory() as directory:
+        lottery_service_module.payout_tables = store = PayoutTableStore(directory)
+        try:
+            table = store.put(draw_date, build_prize_rows(SAMPLE_LOTTERY_DATA))
+            assert BulkSaveService().save_many_to_database([SAMPLE_LOTTERY_DATA]) == [draw_date]
+            assert os.listdir(directory) == []
+            assert store.get(draw_date, table.version) is None
+            close_table(table)
+        finally:
+            lottery_service_module.payout_tables = original
+            prize_index_cache.invalidate(draw_date)
+
+
+if __name__ == "__main__":
+    test_lookup_matches_prize_index()
+    test_save_and_mmap_load()
+    test_stale_tables_are_not_trusted()
+    test_open_tables_are_bounded()
+    test_files_on_disk_are_bounded()
+    test_bulk_save_drops_payout_table()
+    print("✅ ทดสอบตารางเงินรางวัลผ่านทั้งหมด")
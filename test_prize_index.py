@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ index รางวัลในหน่วยความจำ (ไม่ต้องใช้ Supabase)
+"""
+
+from services.prize_index import PrizeIndex, PrizeIndexCache
+
+# ข้อมูลรางวัลตัวอย่าง (รูปแบบเดียวกับแถวใน lottery_prizes)
+SAMPLE_PRIZES = [
+    {'prize_type': 'first_prize', 'prize_number': '876978', 'position': 1, 'amount': 6000000},
+    {'prize_type': 'front_3', 'prize_number': '843', 'position': 1, 'amount': 4000},
+    {'prize_type': 'front_3', 'prize_number': '532', 'position': 2, 'amount': 4000},
+    {'prize_type': 'back_3', 'prize_number': '280', 'position': 1, 'amount': 4000},
+    {'prize_type': 'back_3', 'prize_number': '978', 'position': 2, 'amount': 4000},
+    {'prize_type': 'back_2', 'prize_number': '78', 'position': 1, 'amount': 2000},
+    {'prize_type': 'nearby', 'prize_number': '876977', 'position': 1, 'amount': 100000},
+    {'prize_type': 'second_prize', 'prize_number': '153393', 'position': 1, 'amount': 200000},
+]
+
+
+def test_check_first_prize():
+    """ทดสอบเลขที่ถูกหลายรางวัลพร้อมกัน"""
+    index = PrizeIndex("2025-10-01", "1/2568", SAMPLE_PRIZES)
+    matches = index.check("876978")
+
+    print(f"ผลการตรวจ 876978: {matches}")
+    assert [m['match_type'] for m in matches] == ["full_6_digits", "back_3_digits", "back_2_digits"]
+    assert matches[0]['prize_name'] == 'รางวัลที่ 1'
+    assert matches[0]['amount'] == 6000000
+
+
+def test_check_front_and_back_are_separate():
+    """เลขหน้า 3 ตัวต้องไม่ไปชนกับเลขท้าย 3 ตัว"""
+    index = PrizeIndex("2025-10-01", "1/2568", SAMPLE_PRIZES)
+
+    front = index.check("843000")
+    assert [m['prize_type'] for m in front] == ['front_3']
+
+    # 280 เป็นเลขท้าย 3 ตัว ถ้าอยู่ด้านหน้าต้องไม่ถูกรางวัล
+    assert index.check("280111") == []
+
+
+def test_cache_put_and_invalidate():
+    """ทดสอบ cache ของ index แต่ละงวด"""
+    cache = PrizeIndexCache()
+    assert cache.get("2025-10-01") is None
+
+    cache.put("2025-10-01", "1/2568", SAMPLE_PRIZES)
+    assert cache.get("2025-10-01").draw_number == "1/2568"
+
+    cache.invalidate("2025-10-01")
+    assert cache.get("2025-10-01") is None
+
+
+def test_incomplete_index_expires():
+    """งวดที่ข้อมูลยังไม่ครบต้องหมดอายุตาม TTL"""
+    cache = PrizeIndexCache(incomplete_ttl=0)
+    cache.put("2025-10-01", "1/2568", SAMPLE_PRIZES)
+    assert cache.get("2025-10-01") is None
+
+
+if __name__ == "__main__":
+    test_check_first_prize()
+    test_check_front_and_back_are_separate()
+    test_cache_put_and_invalidate()
+    test_incomplete_index_expires()
+    print("✅ ทดสอบ index รางวัลผ่านทั้งหมด")
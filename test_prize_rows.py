@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบการแปลงข้อมูลหวยเป็นแถวรางวัลและแปลงกลับ (ไม่ต้องใช้ Supabase)
+"""
+
+import contextlib
+import io
+import random
+
+from services.prize_rows import build_prize_rows, lottery_data_from_rows
+
+SAMPLE_LOTTERY_DATA = {
+    'draw_date': '2025-10-01',
+    'draw_number': '1/2568',
+    'first_prize': '876978',
+    'second_prize_1': '843',
+    'second_prize_2': '532',
+    'third_prize_1': '280',
+    'third_prize_2': '605',
+    'fourth_prize_1': '77',
+    'second_prizes': ['153393', '371258', '421381', '970384', '998363'],
+    'third_prizes': [f"{i:06d}" for i in range(10)],
+    'fourth_prizes': [f"{i:06d}" for i in range(100, 150)],
+    'fifth_prizes': [f"{i:06d}" for i in range(200, 300)],
+    'nearby_prizes': ['876977', '876979']
+}
+
+
+def test_round_trip():
+    """แปลงเป็นแถวแล้วแปลงกลับต้องได้ข้อมูลเดิม ไม่ว่าแถวจะเรียงแบบไหน"""
+    rows = build_prize_rows(SAMPLE_LOTTERY_DATA)
+    print(f"จำนวนแถวรางวัล: {len(rows)}")
+    assert len(rows) == 173
+
+    random.shuffle(rows)
+    rebuilt = lottery_data_from_rows('2025-10-01', '1/2568', rows)
+    assert rebuilt == SAMPLE_LOTTERY_DATA
+
+
+def test_server_prize_type_names():
+    """รองรับชื่อ prize_type แบบ server.py (first, second, ...)"""
+    rows = [
+        {'prize_type': 'first', 'prize_number': '876978', 'position': 1, 'amount': 6000000},
+        {'prize_type': 'fifth', 'prize_number': '000200', 'position': 1, 'amount': 20000},
+    ]
+    rebuilt = lottery_data_from_rows('2025-10-01', '1/2568', rows)
+    assert rebuilt['first_prize'] == '876978'
+    assert rebuilt['fifth_prizes'] == ['000200']
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.saved = []
+
+    def upsert_draw_with_prizes(self, draw_date, draw_number, prizes, status='active'):
+        self.saved.append((draw_date, draw_number, prizes, status))
+        return 1
+
+
+def test_server_saves_same_rows_as_services():
+    """server.py บันทึกผ่าน build_prize_rows / DatabaseService เดียวกัน จึงได้ prize_type แบบเดียวกัน"""
+    import server
+    from services.history_index import NumberHistoryIndex
+    from services.prize_index import prize_index_cache
+
+    api = server.LotteryAPI.__new__(server.LotteryAPI)
+    api.supabase = object()
+    api.db = FakeDatabase()
+    original_index = server.history_index
+    server.history_index = NumberHistoryIndex()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert api.save_to_database(SAMPLE_LOTTERY_DATA)
+    finally:
+        server.history_index = original_index
+        prize_index_cache.invalidate(SAMPLE_LOTTERY_DATA['draw_date'])
+
+    [(draw_date, draw_number, prizes, status)] = api.db.saved
+    assert (draw_date, draw_number, status) == ('2025-10-01', '1/2568', 'active')
+    assert prizes == build_prize_rows(SAMPLE_LOTTERY_DATA)
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_server_prize_type_names()
+    test_server_saves_same_rows_as_services()
+    print("✅ ทดสอบการแปลงแถวรางวัลผ่านทั้งหมด")
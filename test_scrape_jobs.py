@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ scrape เบื้องหลัง (POST /lottery/check ตอบ 202 แล้วดูสถานะที่ GET /jobs/{id}) ไม่ต้องใช้อินเทอร์เน็ต
+"""
+
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import routes
+from services.lottery_service import LotteryService
+from services.prize_index import EXPECTED_PRIZE_ROWS, prize_index_cache
+from services.prize_rows import build_prize_rows
+from services.scrape_jobs import ScrapeJobQueue
+from test_prize_rows import SAMPLE_LOTTERY_DATA
+
+DRAW_DATE = SAMPLE_LOTTERY_DATA['draw_date']
+WINNING_NUMBER = SAMPLE_LOTTERY_DATA['first_prize']
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "รอนานเกินไป"
+        time.sleep(0.01)
+
+
+def test_queue_coalesces_and_expires():
+    release = threading.Event()
+    calls = []
+
+    def scrape(draw_date):
+        calls.append(draw_date)
+        release.wait(5)
+        return SAMPLE_LOTTERY_DATA
+
+    queue = ScrapeJobQueue(workers=2, ttl=60)
+    first = queue.submit(DRAW_DATE, scrape)
+    # งวดเดียวกันที่ยังไม่เสร็จใช้งานเดิม
+    assert queue.submit(DRAW_DATE, scrape) is first
+    assert first.pending
+
+    release.set()
+    wait_until(lambda: not first.pending)
+    assert first.status == 'done' and first.total_prizes == EXPECTED_PRIZE_ROWS
+    assert calls == [DRAW_DATE]
+
+    # เสร็จแล้วขอใหม่ได้งานใหม่ และงานเก่าหมดอายุตาม ttl
+    failed = queue.submit(DRAW_DATE, lambda draw_date: None)
+    assert failed is not first
+    wait_until(lambda: not failed.pending)
+    assert failed.status == 'failed' and failed.error
+
+    queue.ttl = 0
+    assert queue.get(first.id) is None
+
+
+class FakeDatabase:
+    supabase = object()
+
+    def get_draw_prizes(self, draw_date):
+        return None
+
+
+class SlowScrapeService(LotteryService):
+    """ยังไม่มีงวดในฐานข้อมูล scrape ใช้เวลาจนกว่าจะ release"""
+
+    def __init__(self):
+        self.db = FakeDatabase()
+        self.release = threading.Event()
+        self.scrapes = 0
+
+    def scrape_and_save(self, draw_date):
+        self.scrapes += 1
+        self.release.wait(5)
+        rows = build_prize_rows(SAMPLE_LOTTERY_DATA)
+        prize_index_cache.put(draw_date, SAMPLE_LOTTERY_DATA['draw_number'], rows)
+        return SAMPLE_LOTTERY_DATA
+
+
+def test_check_returns_202_then_result():
+    app = FastAPI()
+    app.include_router(routes.router)
+    client = TestClient(app)
+
+    prize_index_cache.invalidate(DRAW_DATE)
+    original = routes.lottery_service
+    routes.lottery_service = service = SlowScrapeService()
+    try:
+        payload = {'number': WINNING_NUMBER, 'draw_date': DRAW_DATE}
+        accepted = client.post("/lottery/check", params={'async_scrape': 'true'}, json=payload)
+        assert accepted.status_code == 202
+        assert int(accepted.headers['retry-after']) > 0
+        job = accepted.json()
+        assert accepted.headers['location'] == job['status_url'] == f"/jobs/{job['job_id']}"
+
+        # request ซ้ำระหว่างรอได้งานเดิม
+        again = client.post("/lottery/check", params={'async_scrape': 'true'}, json=payload)
+        assert again.status_code == 202 and again.json()['job_id'] == job['job_id']
+
+        pending = client.get(job['status_url'])
+        assert pending.json()['status'] in ('queued', 'running') and 'retry-after' in pending.headers
+
+        service.release.set()
+        wait_until(lambda: client.get(job['status_url']).json()['status'] == 'done')
+        done = client.get(job['status_url'])
+        assert done.json()['total_prizes'] == EXPECTED_PRIZE_ROWS and 'retry-after' not in done.headers
+
+        # scrape เสร็จแล้ว ตรวจเลขได้ทันที
+        checked = client.post("/lottery/check", params={'async_scrape': 'true'}, json=payload)
+        assert checked.status_code == 200 and checked.json()['total_matches'] >= 1
+        assert service.scrapes == 1
+
+        assert client.get("/jobs/unknown").status_code == 404
+    finally:
+        routes.lottery_service = original
+        prize_index_cache.invalidate(DRAW_DATE)
+
+
+def test_serverless_checks_without_background_job():
+    """บน serverless ไม่ตอบ 202 (thread ของคิวไม่รอดหลังส่ง response) แต่ scrape รอผลใน request"""
+    app = FastAPI()
+    app.include_router(routes.router)
+    client = TestClient(app)
+
+    prize_index_cache.invalidate(DRAW_DATE)
+    original, original_serverless = routes.lottery_service, routes.SERVERLESS
+    routes.lottery_service = service = SlowScrapeService()
+    routes.SERVERLESS = True
+    service.release.set()
+    try:
+        payload = {'number': WINNING_NUMBER, 'draw_date': DRAW_DATE}
+        checked = client.post("/lottery/check", params={'async_scrape': 'true'}, json=payload)
+        assert checked.status_code == 200 and checked.json()['total_matches'] >= 1
+        assert service.scrapes == 1
+    finally:
+        routes.lottery_service, routes.SERVERLESS = original, original_serverless
+        prize_index_cache.invalidate(DRAW_DATE)
+
+
+if __name__ == "__main__":
+    test_queue_coalesces_and_expires()
+    test_check_returns_202_then_result()
+    test_serverless_checks_without_background_job()
+    print("✅ ทดสอบ scrape เบื้องหลังผ่านทั้งหมด")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบ server.py แบบหลาย worker (ไม่ต้องใช้ Supabase / อินเทอร์เน็ต)
+"""
+
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from server import PooledHTTPServer, LotteryHandler
+
+
+class SlowAPI:
+    """LotteryAPI จำลองที่ตรวจเลขช้า (เหมือนต้อง scrape)"""
+
+    def __init__(self):
+        self.threads = set()
+
+    def check_number_complete(self, number, draw_date):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(0.3)
+        return {"number": number, "draw_date": draw_date, "results": [], "message": "ไม่ถูกรางวัล"}
+
+
+def post_check(port, number):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/api/lottery/check",
+        data=json.dumps({"number": number, "draw_date": "2025-10-01"}).encode('utf-8'),
+        headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def test_requests_are_served_concurrently():
+    """8 request ที่ใช้เวลา 0.3 วินาที ต้องเสร็จพร้อมกัน ไม่ต่อคิวทีละตัว"""
+    api = SlowAPI()
+    httpd = PooledHTTPServer(("127.0.0.1", 0), LotteryHandler, workers=8, api=api)
+    port = httpd.server_address[1]
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    try:
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(lambda i: post_check(port, f"{i:06d}"), range(8)))
+        elapsed = time.monotonic() - start
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    print(f"8 request ใช้เวลา {elapsed:.2f} วินาที ด้วย {len(api.threads)} worker")
+    assert all(response["status"] == "success" for response in responses)
+    assert elapsed < 1.5
+    assert len(api.threads) > 1
+
+
+if __name__ == "__main__":
+    test_requests_are_served_concurrently()
+    print("✅ ทดสอบ server หลาย worker ผ่านทั้งหมด")
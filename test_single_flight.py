@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+ไฟล์ทดสอบการรวม scrape งวดเดียวกันที่เกิดพร้อมกัน (ไม่ต้องใช้ Supabase)
+"""
+
+import threading
+import time
+
+from services import lottery_service as lottery_service_module
+from services.lottery_service import LotteryService
+from services.prize_index import prize_index_cache
+from services.single_flight import SingleFlight
+from test_prize_rows import SAMPLE_LOTTERY_DATA
+
+
+class FakeDatabase:
+    """ฐานข้อมูลจำลอง: เก็บงวดที่บันทึกแล้ว และ lease ที่ใช้ร่วมกันระหว่าง "instance" """
+
+    def __init__(self):
+        self.supabase = True
+        self.draws = {}
+        self.leases = {}
+        self.lock = threading.Lock()
+
+    def get_draw_prizes(self, draw_date):
+        with self.lock:
+            return self.draws.get(draw_date)
+
+    def acquire_scrape_lease(self, draw_date, owner, ttl_seconds):
+        with self.lock:
+            holder = self.leases.get(draw_date)
+            if holder and holder != owner:
+                return False
+            self.leases[draw_date] = owner
+            return True
+
+    def release_scrape_lease(self, draw_date, owner):
+        with self.lock:
+            if self.leases.get(draw_date) == owner:
+                del self.leases[draw_date]
+
+    def upsert_draw_with_prizes(self, draw_date, draw_number, prizes, status="active"):
+        with self.lock:
+            self.draws[draw_date] = {'id': 1, 'draw_number': draw_number, 'lottery_prizes': list(prizes)}
+        return 1
+
+
+def make_service(db, scrape_calls):
+    service = LotteryService()
+    service.db = db
+
+    def get_lottery_by_date(draw_date):
+        scrape_calls.append(draw_date)
+        time.sleep(0.2)
+        return dict(SAMPLE_LOTTERY_DATA, draw_date=draw_date)
+
+    service.get_lottery_by_date = get_lottery_by_date
+    return service
+
+
+def run_concurrently(count, fn):
+    results = [None] * count
+
+    def worker(i):
+        results[i] = fn(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_single_flight_shares_result():
+    """เรียกพร้อมกัน 20 ครั้ง ต้องทำงานจริงครั้งเดียวและได้ผลเดียวกัน"""
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"value": 42}
+
+    results = run_concurrently(20, lambda i: flight.do("2025-10-01", work))
+    print(f"ทำงานจริง {len(calls)} ครั้ง จาก 20 request")
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.in_flight() == {}
+
+
+def test_single_flight_propagates_error():
+    """ถ้างานล้มเหลว ผู้รอทุกคนต้องได้ error เดียวกัน และเรียกใหม่ได้"""
+    flight = SingleFlight()
+
+    def fail():
+        time.sleep(0.1)
+        raise ValueError("scrape failed")
+
+    errors = run_concurrently(5, lambda i: _capture(lambda: flight.do("k", fail)))
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert flight.do("k", lambda: "ok") == "ok"
+
+
+def _capture(fn):
+    try:
+        fn()
+    except Exception as e:
+        return e
+
+
+def test_scrape_once_across_instances():
+    """สอง "instance" ที่ใช้ฐานข้อมูลเดียวกัน ต้อง scrape งวดเดียวกันเพียงครั้งเดียว"""
+    prize_index_cache.clear()
+    lottery_service_module.SCRAPE_LEASE_POLL = 0.05
+
+    db = FakeDatabase()
+    scrape_calls = []
+    service_a = make_service(db, scrape_calls)
+    service_b = make_service(db, scrape_calls)
+
+    # instance อื่นมี owner คนละชื่อ และไม่ได้ใช้ single-flight ตัวเดียวกัน (เรียกผ่าน lease อย่างเดียว)
+    service_b.lease_owner = service_a.lease_owner + ":b"
+
+    def request(i):
+        if i % 2:
+            return service_b._scrape_and_save_with_lease("2025-10-01")
+        return service_a.scrape_and_save("2025-10-01")
+
+    results = run_concurrently(20, request)
+
+    print(f"scrape จริง {len(scrape_calls)} ครั้ง")
+    assert scrape_calls == ["2025-10-01"]
+    assert all(result['first_prize'] == SAMPLE_LOTTERY_DATA['first_prize'] for result in results)
+    assert db.leases == {}
+    assert prize_index_cache.get("2025-10-01") is not None
+
+
+if __name__ == "__main__":
+    test_single_flight_shares_result()
+    test_single_flight_propagates_error()
+    test_scrape_once_across_instances()
+    print("✅ ทดสอบ single-flight ผ่านทั้งหมด")